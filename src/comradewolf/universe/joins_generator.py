@@ -1,144 +1,184 @@
-from copy import deepcopy
+import os
+import pickle
+from functools import partial
+from heapq import heappop, heappush
 
-from comradewolf.universe.possible_joins import AllPossibleJoins
+from comradewolf.universe.possible_joins import AllPossibleJoins, JOIN_WEIGHTS, copy_joins
 from comradewolf.utils.data_types import AllJoins, AllTables
+from comradewolf.utils.utils import map_in_processes
+
+
+def find_shortest_joins(start_table: str, direct_joins: dict, join_weights: dict[str, int]) -> dict:
+    """
+    Finds the shortest joins from start table to all tables that can be joined
+    Iterative Dijkstra algorithm with heap. direct_joins is only read
+    Defined on module level to be used in process pool
+    :param start_table: from part of join
+    :param direct_joins: direct joins from StructureGenerator.get_joins()
+    :param join_weights: {how: weight of join}
+    :return: {end_table: {join_number: join}}
+    """
+    # {table: number of steps to get to table}
+    steps_to_table: dict[str, int] = {start_table: 0}
+    # {table: {join_number: join}}
+    join_of_start_table: dict[str, dict] = {}
+    visited: set[str] = set()
+
+    # Steps are compared first, table name makes order of equal steps stable
+    heap: list[tuple[int, str]] = [(0, start_table)]
+
+    while len(heap) > 0:
+        steps, table = heappop(heap)
+
+        if table in visited:
+            continue
+
+        visited.add(table)
+
+        for next_table, join in direct_joins.get(table, {}).items():
+            if next_table in visited:
+                continue
+
+            next_steps: int = steps + join_weights[join["how"]]
+
+            if next_steps >= steps_to_table.get(next_table, next_steps + 1):
+                continue
+
+            steps_to_table[next_table] = next_steps
+
+            # Path to previous table plus one more join
+            path_of_joins: dict = join_of_start_table[table].copy() if table != start_table else {}
+            path_of_joins[len(path_of_joins)] = {"table": next_table, **join}
+            join_of_start_table[next_table] = path_of_joins
+
+            heappush(heap, (next_steps, next_table))
+
+    return join_of_start_table
 
 
 class GenerateJoins:
     """
     Implementation of Dijkstra algorithm to get all possible shortest joins
+    Every instance builds its own AllPossibleJoins (self.get_joins()), so many structures can be used in one process
     """
-    all_tables = set()
-    direct_joins = set()
 
-    __join_weights = {"left": 2, "right": 3, "inner": 1}
+    __join_weights = JOIN_WEIGHTS
+
+    # Version of cache format. Caches with other version are ignored
+    CACHE_VERSION: int = 1
 
-    def __init__(self, direct_joins: AllJoins, all_tables: AllTables) -> None:
+    def __init__(self, direct_joins: AllJoins, all_tables: AllTables, cache_path: str | None = None,
+                 source_hash: str | None = None, workers: int | None = None, lazy: bool = False,
+                 max_start_tables: int | None = None) -> None:
         """
         :param direct_joins: direct joins are coming from StructureGenerator.get_joins()
         :param all_tables: all tables coming from StructureGenerator.get_tables()
+        :param cache_path: path to file with computed joins. If cache was written for the same source_hash, joins are
+        loaded from it. Otherwise, joins are computed and cache is written
+        :param source_hash: hash of joins toml files from StructureGenerator.get_joins_hash(). Cache is not used if None
+        :param workers: number of processes to compute joins. None or 1 to compute in current process
+        :param lazy: compute joins of start table on first request instead of computing all joins. cache_path and
+        workers are not used in lazy mode
+        :param max_start_tables: max number of start tables to keep joins for in lazy mode. None for no limit
         """
-        # Singleton with the shortest joins
+        # The shortest joins of this structure. Frozen after they are built
         self.joins: AllPossibleJoins = AllPossibleJoins()
-        self.direct_joins = direct_joins
+        # Should not be changed after GenerateJoins is created, lazy mode reads it on request
+        self.direct_joins: AllJoins = direct_joins
+        self.all_tables: set[str] = set(all_tables)
+        self.lazy: bool = lazy
 
-        for table in all_tables:
-            self.all_tables.add(table)
+        if lazy:
+            self.joins.set_lazy(self.find_joins, max_start_tables)
+            self.joins.freeze()
+            return
 
-        for join_start_table in self.direct_joins:
-            self.best_joins_for_start(join_start_table)
+        if (cache_path is not None) and (source_hash is not None) and self.__load_cache(cache_path, source_hash):
+            self.joins.freeze()
+            return
 
-    def return_join(self, start_table: str, end_table: str) -> bool | dict:
-        """
-        Returns join if exists
-        Returns false if does not exist
-        :param start_table: from part of join
-        :param end_table: join part of join
-        :return:
-        """
-        if not self.joins.has_join(start_table, end_table):
-            self.best_joins_for_start(start_table)
+        start_tables: list[str] = list(self.direct_joins.keys())
+        find_joins = partial(find_shortest_joins, direct_joins=self.direct_joins, join_weights=self.__join_weights)
 
-        return self.joins.get_join(start_table, end_table)
+        joins_by_start: dict = dict(zip(start_tables, map_in_processes(find_joins, start_tables, workers)))
+        self.joins.all_joins_by_starting_table(joins_by_start)
+
+        self.joins.freeze()
 
-    def best_joins_for_start(self, start_table: str) -> None:
+        if (cache_path is not None) and (source_hash is not None):
+            self.write_cache(cache_path, source_hash, joins_by_start)
+
+    def get_joins(self) -> AllPossibleJoins:
         """
-        Generates all possible joins for start table
-        :param start_table:
-        :return:
+        Returns the shortest joins of this structure
+        :return: frozen AllPossibleJoins
         """
-        # Something like +∞ in Dijkstra algorithm
-        max_no = 1e7
-        min_node_count = 1e7
-        min_node: str | None = None
-
-        join_dict = {}
-        joins_by_table = deepcopy(self.direct_joins)
-
-        all_tables = self.all_tables.copy()
-        all_tables.remove(start_table)
-
-        # Step 0. Create all connections
-        for table in all_tables:
-
-            join_dict[table] = {}
-            if table in joins_by_table[start_table]:
-                steps: int = self.__join_weights[joins_by_table[start_table][table]["how"]]
-                join_dict[table]["steps"] = steps
-                join_dict[table][0] = {}
-                join_dict[table][0]["table"] = table
-                for key in joins_by_table[start_table][table]:
-                    join_dict[table][0][key] = joins_by_table[start_table][table][key]
-                if (steps < min_node_count) & (table in joins_by_table):
-                    min_node = table
-                    min_node_count = steps
-            else:
-                join_dict[table]["steps"] = max_no
-
-        # Remove visited connections
-        del joins_by_table[start_table]
-
-        join_of_start_table = self.__recursive_joins(join_dict, joins_by_table, set(joins_by_table.keys()), min_node)
-
-        key_list = list(join_of_start_table.keys())
-
-        # Remove not possible joins
-        for key in key_list:
-            if join_of_start_table[key]["steps"] == max_no:
-                del join_of_start_table[key]
-
-        # Remove steps key. We don't need it anymore
-        for key in join_of_start_table.keys():
-            del join_of_start_table[key]["steps"]
-
-        self.joins.all_joins_by_starting_table({start_table: join_of_start_table})
-
-    def __recursive_joins(self,
-                          created_joins: dict,
-                          all_joins: AllJoins,
-                          all_tables: set,
-                          next_node: str | None) -> dict:
+        return self.joins
+
+    def write_cache(self, cache_path: str, source_hash: str, joins_by_start: dict | None = None) -> None:
         """
-        Recursive way to generate connections using Dijkstra algorithm
-        :param created_joins: created joins on previous step
-        :param all_joins: copy of self.direct_joins with removed visited branches
-        :param all_tables: copy of self.all_tables of with removed visited branches
-        :param next_node: next node if exists
+        Writes computed joins to file. File is replaced atomically
+        :param cache_path: path to cache file
+        :param source_hash: hash of joins toml files from StructureGenerator.get_joins_hash()
+        :param joins_by_start: {start_table: joins of start table}. Joins of all start tables of self.direct_joins if
+        None
         :return:
         """
-        if next_node is None:
-            return created_joins
+        if joins_by_start is None:
+            joins_by_start = {start_table: copy_joins(self.joins[start_table]) for start_table in self.direct_joins
+                              if self.joins.has_table_with_joins(start_table)}
 
-        all_tables.remove(next_node)
+        cache: dict = {"version": self.CACHE_VERSION, "source_hash": source_hash, "joins": joins_by_start}
 
-        for table in all_joins[next_node]:
-            # Ignore existing nodes
-            if table not in all_tables:
-                continue
-            steps: int = self.__join_weights[all_joins[next_node][table]["how"]]
+        temp_cache_path: str = f"{cache_path}.{os.getpid()}.tmp"
+
+        with open(temp_cache_path, "wb") as cache_file:
+            pickle.dump(cache, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
 
-            if created_joins[next_node]["steps"] + steps < created_joins[table]["steps"]:
+        os.replace(temp_cache_path, cache_path)
+
+    def __load_cache(self, cache_path: str, source_hash: str) -> bool:
+        """
+        Loads joins from cache if it was written for the same joins toml files
+        Cache is a pickle file. Load only caches you have created yourself
+        :param cache_path: path to cache file
+        :param source_hash: hash of joins toml files
+        :return: True if joins were loaded
+        """
+        if not os.path.isfile(cache_path):
+            return False
 
-                inner_dict_with_joins = created_joins[next_node].copy()
+        try:
+            with open(cache_path, "rb") as cache_file:
+                cache: dict = pickle.load(cache_file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+            return False
 
-                all_keys = list(inner_dict_with_joins.keys())
-                all_keys.remove("steps")
+        if (not isinstance(cache, dict)) or (cache.get("version") != self.CACHE_VERSION) \
+                or (cache.get("source_hash") != source_hash):
+            return False
 
-                next_key = max(all_keys) + 1
-                inner_dict_with_joins[next_key] = {}
-                inner_dict_with_joins[next_key]["table"] = table
-                inner_dict_with_joins["steps"] = created_joins[next_node]["steps"] + steps
-                for key in all_joins[next_node][table]:
-                    inner_dict_with_joins[next_key][key] = all_joins[next_node][table][key]
+        self.joins.all_joins_by_starting_table(cache["joins"])
 
-                created_joins[table] = inner_dict_with_joins
+        return True
 
-        max_no = 1e7
-        min_node: str | None = None
+    def return_join(self, start_table: str, end_table: str) -> bool | dict:
+        """
+        Returns join if exists
+        Returns false if does not exist
+        :param start_table: from part of join
+        :param end_table: join part of join
+        :return:
+        """
+        return self.joins.get_join(start_table, end_table)
 
-        for table in all_tables:
-            if created_joins[table]["steps"] < max_no:
-                max_no = created_joins[table]["steps"]
-                min_node = table
+    def find_joins(self, start_table: str) -> dict | None:
+        """
+        Computes joins for start table. Used by AllPossibleJoins in lazy mode
+        :param start_table:
+        :return: {end_table: {join_number: join}} or None if start table has no direct joins
+        """
+        if start_table not in self.direct_joins:
+            return None
 
-        return self.__recursive_joins(created_joins, all_joins, all_tables, min_node)
+        return find_shortest_joins(start_table, self.direct_joins, self.__join_weights)
@@ -0,0 +1,113 @@
+from comradewolf.utils.exceptions import OlapException
+from comradewolf.utils.olap_data_types import OlapTableStatistics, SelectCollection
+
+# Average row width in bytes if statistics has row count, but no width
+DEFAULT_AVG_ROW_WIDTH: int = 100
+
+
+class OlapAggregateNavigator:
+    """
+    Ranks tables of SelectCollection by cost and picks the cheapest one
+
+    Cost of a query is estimated as bytes to read: row_count * avg_row_width of fact table plus the same
+    for every joined table
+    If any table of query has no statistics, cost is unknown and query is ranked after all queries with known cost
+    by number of not selected fields
+    """
+
+    def __init__(self, table_statistics: OlapTableStatistics, join_cost_multiplier: float = 1.0) -> None:
+        """
+        :param table_statistics: OlapTableStatistics from OlapStructureGenerator
+        :param join_cost_multiplier: multiplier of cost for joined tables
+        """
+        self.table_statistics = table_statistics
+        self.join_cost_multiplier = join_cost_multiplier
+
+    def get_table_cost(self, table_name: str) -> float | None:
+        """
+        Returns cost to scan table
+        :param table_name: table name in style of db.schema.table
+        :return: cost or None if no statistics
+        """
+        row_count: int | None = self.table_statistics.get_row_count(table_name)
+
+        if row_count is None:
+            return None
+
+        avg_row_width: int | None = self.table_statistics.get_avg_row_width(table_name)
+
+        if avg_row_width is None:
+            avg_row_width = DEFAULT_AVG_ROW_WIDTH
+
+        return float(row_count * avg_row_width)
+
+    def get_query_cost(self, select_collection: SelectCollection, table_name: str) -> float | None:
+        """
+        Returns cost of query for table from SelectCollection
+        :param select_collection: SelectCollection from OlapService.select_data()
+        :param table_name: fact table name
+        :return: cost or None if any table of query has no statistics
+        """
+        cost: float | None = self.get_table_cost(table_name)
+
+        if cost is None:
+            return None
+
+        for joined_table in select_collection.get_joined_tables(table_name):
+            join_cost: float | None = self.get_table_cost(joined_table)
+
+            if join_cost is None:
+                return None
+
+            cost += join_cost * self.join_cost_multiplier
+
+        return cost
+
+    def rank_tables(self, select_collection: SelectCollection) -> list[str]:
+        """
+        Returns table names of SelectCollection from the cheapest to the most expensive
+        :param select_collection: SelectCollection from OlapService.select_data()
+        :return: list of table names
+        """
+        ranking: list[tuple] = []
+
+        for table_name in select_collection:
+            cost: float | None = self.get_query_cost(select_collection, table_name)
+
+            ranking.append((cost is None,
+                            0.0 if cost is None else cost,
+                            select_collection.get_not_selected_fields_no(table_name),
+                            len(select_collection.get_joined_tables(table_name)),
+                            table_name))
+
+        ranking.sort()
+
+        return [item[-1] for item in ranking]
+
+    def get_best_table(self, select_collection: SelectCollection) -> str:
+        """
+        Returns the cheapest table name
+        :param select_collection: SelectCollection from OlapService.select_data()
+        :return: table name
+        """
+        if len(select_collection) == 0:
+            raise OlapException("No tables in select collection")
+
+        return self.rank_tables(select_collection)[0]
+
+    def get_best_select(self, select_collection: SelectCollection) -> SelectCollection:
+        """
+        Returns SelectCollection only with the cheapest query
+        :param select_collection: SelectCollection from OlapService.select_data()
+        :return: SelectCollection with one table
+        """
+        table_name: str = self.get_best_table(select_collection)
+
+        best_select: SelectCollection = SelectCollection()
+        best_select.add_table(table_name, select_collection.get_sql(table_name),
+                              select_collection.get_not_selected_fields_no(table_name),
+                              select_collection.get_has_group_by(table_name),
+                              select_collection.get_joined_tables(table_name),
+                              select_collection.get_params(table_name))
+
+        return best_select
@@ -0,0 +1,481 @@
+import logging
+import os
+import pickle
+import threading
+import time
+from typing import Callable
+
+from comradewolf.universe.olap_aggregate_navigator import OlapAggregateNavigator
+from comradewolf.universe.olap_service import OlapService
+from comradewolf.universe.olap_structure_generator import OlapStructureGenerator
+from comradewolf.universe.olap_value_dictionary import OlapSortedValuesDictionary
+from comradewolf.utils.enums_and_field_dicts import FilterTypes, OlapFieldTypes
+from comradewolf.utils.olap_data_types import OlapFilterFrontend, OlapTablesCollection, SelectFilter, \
+    OlapTableStatistics
+
+logger = logging.getLogger(__name__)
+
+# Seconds since checked_at of table statistics to use them for max-min filters by default
+DEFAULT_MAX_STATISTICS_AGE: float = 24 * 60 * 60
+
+
+class OlapFilterValuesCache:
+    """
+    Cache of values for frontend filters from OlapService.select_filter_for_frontend()
+
+    Values are cached by everything that changes select of filter: field alias, select type (FilterTypes), prefix,
+    page size and after. Values can be refreshed in background thread.
+    Values of low-cardinality dimension fields can be precomputed and saved to file
+
+    Prefix filters (FilterTypes.PREFIX) are not cached. They are served from OlapSortedValuesDictionary of field if it
+    was added with self.add_value_dictionary(), otherwise select is executed. Filters restricted by where of other
+    filters are not cached too
+
+    Max-min filters (FilterTypes.MAX_MIN) are answered from min_value and max_value of column statistics if they are
+    fresh enough and table is known to be unchanged since statistics were checked, so fact tables are not scanned
+    """
+
+    FILE_VERSION: int = 2
+
+    def __init__(self, olap_service: OlapService, execute: Callable[[str, list], list], ttl: float | None = None,
+                 aggregate_navigator: OlapAggregateNavigator | None = None,
+                 table_statistics: OlapTableStatistics | None = None,
+                 max_statistics_age: float | None = DEFAULT_MAX_STATISTICS_AGE,
+                 get_row_count: Callable[[str], int | None] | None = None,
+                 get_loaded_at: Callable[[str], float | None] | None = None,
+                 structure_generator: OlapStructureGenerator | None = None) -> None:
+        """
+        :param olap_service: OlapService to create select for filter
+        :param execute: function(sql, params) that returns rows from database. params is a list of bind parameters
+        in order of placeholders in sql, empty list if select has no bind parameters
+        :param ttl: seconds to keep values. Values are kept until refresh if None
+        :param aggregate_navigator: OlapAggregateNavigator to pick the smallest table by statistics. Table with the
+        least number of fields is picked if None
+        :param table_statistics: OlapTableStatistics with min_value and max_value of columns for max-min filters.
+        Max-min filters are always selected from database if None
+        :param max_statistics_age: seconds since checked_at of table statistics to use them for max-min filters.
+        Statistics without checked_at are not used. Pass None explicitly to use statistics of any age without check of
+        table, e.g. if they are collected on every load of data
+        :param get_row_count: function(table_name) that returns current row count of table cheaply, e.g. from catalog
+        of database. Statistics are used only if row count is equal to row count of statistics
+        :param get_loaded_at: function(table_name) that returns unix timestamp of last load of data into table.
+        Statistics are used only if table was not loaded after checked_at of statistics
+        If max_statistics_age is not None and both functions are None, max-min filters are always selected from
+        database, as it is unknown if tables were changed
+        :param structure_generator: OlapStructureGenerator to take current tables collection on every refresh, so
+        values are loaded for new structure after OlapStructureGenerator.reload(). Collection of last
+        self.get_values() is used if None
+        """
+        self.olap_service = olap_service
+        self.execute = execute
+        self.ttl = ttl
+        self.aggregate_navigator = aggregate_navigator
+        self.table_statistics = table_statistics
+        self.max_statistics_age = max_statistics_age
+        self.get_row_count = get_row_count
+        self.get_loaded_at = get_loaded_at
+        self.structure_generator = structure_generator
+
+        # {(field_alias, select_type, prefix, page_size, after): {"values": rows, "loaded_at": unix timestamp}}
+        self.__values: dict[tuple, dict] = {}
+        # Values are bound to collection they were loaded for
+        self.__tables_collection: OlapTablesCollection | None = None
+        # {field_alias: OlapSortedValuesDictionary}
+        self.__value_dictionaries: dict[str, OlapSortedValuesDictionary] = {}
+        self.__lock: threading.Lock = threading.Lock()
+
+        self.__refresh_thread: threading.Thread | None = None
+        self.__stop_refresh: threading.Event = threading.Event()
+
+        self.__statistics: dict = {
+            "hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "statistics_hits": 0,
+            "refresh_failures": 0,
+        }
+
+    def get_values(self, frontend_data: OlapFilterFrontend, tables_collection: OlapTablesCollection) -> list:
+        """
+        Returns values for filter
+        :param frontend_data: OlapFilterFrontend with data from frontend
+        :param tables_collection: OlapTablesCollection from OlapStructureGenerator
+        :return: rows from execute
+        """
+        if len(frontend_data.get_where()) > 0:
+            with self.__lock:
+                self.__statistics["misses"] += 1
+
+            return self.__execute(frontend_data, tables_collection)
+
+        if frontend_data.get_select_type() == FilterTypes.PREFIX.value:
+            return self.__search_prefix(frontend_data, tables_collection)
+
+        if frontend_data.get_select_type() == FilterTypes.MAX_MIN.value:
+            max_min: tuple | None = self.get_max_min_from_statistics(frontend_data.get_field_alias_name(),
+                                                                     tables_collection)
+
+            if max_min is not None:
+                with self.__lock:
+                    self.__statistics["statistics_hits"] += 1
+
+                return [max_min]
+
+        key: tuple = self.get_key(frontend_data)
+
+        with self.__lock:
+            if self.__tables_collection is not tables_collection:
+                self.__values.clear()
+                self.__tables_collection = tables_collection
+
+            entry: dict | None = self.__values.get(key)
+
+            if (entry is not None) and ((self.ttl is None) or (time.time() - entry["loaded_at"] < self.ttl)):
+                self.__statistics["hits"] += 1
+                return entry["values"]
+
+            self.__statistics["misses"] += 1
+
+        return self.__load(key, tables_collection)
+
+    @staticmethod
+    def get_key(frontend_data: OlapFilterFrontend) -> tuple:
+        """
+        Creates key of filter values from all fields that change select of filter
+        Where of other filters is not in key, such filters are not cached
+        :param frontend_data: OlapFilterFrontend
+        :return: (field_alias, select_type, prefix, page_size, after)
+        """
+        return (frontend_data.get_field_alias_name(), frontend_data.get_select_type(), frontend_data.get_prefix(),
+                frontend_data.get_page_size(), frontend_data.get_after())
+
+    def get_max_min_from_statistics(self, field_alias: str, tables_collection: OlapTablesCollection) \
+            -> tuple | None:
+        """
+        Returns min and max values of field from fresh column statistics of tables containing field
+        If statistics of many tables are fresh, the widest range is returned
+        :param field_alias: alias of field
+        :param tables_collection: OlapTablesCollection from OlapStructureGenerator
+        :return: (min_value, max_value) or None if there are no fresh statistics
+        """
+        if self.table_statistics is None:
+            return None
+
+        min_values: list = []
+        max_values: list = []
+
+        tables: list[str] = self.olap_service.get_tables_with_field(field_alias, tables_collection)
+
+        for table in self.olap_service.get_tables_for_filter(field_alias, tables, tables_collection):
+            table_name: str = table.get_table_name()
+
+            if not self.__is_statistics_fresh(table_name):
+                continue
+
+            column: dict | None = self.table_statistics.get_column(
+                table_name, tables_collection.get_backend_field_name(table_name, field_alias))
+
+            if (column is None) or (column["min_value"] is None) or (column["max_value"] is None):
+                continue
+
+            min_values.append(column["min_value"])
+            max_values.append(column["max_value"])
+
+        if len(min_values) == 0:
+            return None
+
+        return min(min_values), max(max_values)
+
+    def __is_statistics_fresh(self, table_name: str) -> bool:
+        """
+        Checks if statistics of table are not older than self.max_statistics_age and table was not changed since
+        statistics were checked by row count (self.get_row_count) and time of load (self.get_loaded_at)
+        :param table_name: table name in style of db.schema.table
+        :return:
+        """
+        if self.max_statistics_age is None:
+            return True
+
+        if (self.get_row_count is None) and (self.get_loaded_at is None):
+            return False
+
+        checked_at: float | None = self.table_statistics.get_checked_at(table_name)
+
+        if (checked_at is None) or (time.time() - checked_at > self.max_statistics_age):
+            return False
+
+        if self.get_row_count is not None:
+            row_count: int | None = self.get_row_count(table_name)
+
+            if (row_count is None) or (row_count != self.table_statistics.get_row_count(table_name)):
+                return False
+
+        if self.get_loaded_at is not None:
+            loaded_at: float | None = self.get_loaded_at(table_name)
+
+            if (loaded_at is None) or (loaded_at > checked_at):
+                return False
+
+        return True
+
+    def add_value_dictionary(self, field_alias: str, value_dictionary: OlapSortedValuesDictionary) -> None:
+        """
+        Adds local dictionary of values for prefix filters of field
+        :param field_alias: alias of field
+        :param value_dictionary: OlapSortedValuesDictionary
+        :return:
+        """
+        with self.__lock:
+            self.__value_dictionaries[field_alias] = value_dictionary
+
+    def __search_prefix(self, frontend_data: OlapFilterFrontend, tables_collection: OlapTablesCollection) -> list:
+        """
+        Returns page of prefix filter from local dictionary or from database
+        :param frontend_data: OlapFilterFrontend with FilterTypes.PREFIX
+        :param tables_collection: OlapTablesCollection from OlapStructureGenerator
+        :return: rows
+        """
+        with self.__lock:
+            value_dictionary: OlapSortedValuesDictionary | None = \
+                self.__value_dictionaries.get(frontend_data.get_field_alias_name())
+
+        if value_dictionary is not None:
+            with self.__lock:
+                self.__statistics["hits"] += 1
+
+            return [(value,) for value in value_dictionary.search(frontend_data.get_prefix(),
+                                                                  frontend_data.get_page_size(),
+                                                                  frontend_data.get_after())]
+
+        with self.__lock:
+            self.__statistics["misses"] += 1
+
+        return self.__execute(frontend_data, tables_collection)
+
+    def __execute(self, frontend_data: OlapFilterFrontend, tables_collection: OlapTablesCollection) -> list:
+        """
+        Executes select for filter on the smallest table without cache
+        :param frontend_data: OlapFilterFrontend
+        :param tables_collection: OlapTablesCollection from OlapStructureGenerator
+        :return: rows
+        """
+        select_filter: SelectFilter = self.olap_service.select_filter_for_frontend(frontend_data, tables_collection,
+                                                                                     self.aggregate_navigator)
+        table_name: str = select_filter.get_best_table()
+
+        return self.execute(select_filter.get_sql(table_name), select_filter.get_params(table_name))
+
+    def __load(self, key: tuple, tables_collection: OlapTablesCollection) -> list:
+        """
+        Executes select for filter and saves values
+        :param key: key from self.get_key()
+        :param tables_collection: OlapTablesCollection from OlapStructureGenerator
+        :return: rows from execute
+        """
+        field_alias, select_type, prefix, page_size, after = key
+        frontend_data: OlapFilterFrontend = OlapFilterFrontend({"SELECT_DISTINCT": {"field_name": field_alias,
+                                                                                     "type": select_type,
+                                                                                     "prefix": prefix,
+                                                                                     "page_size": page_size,
+                                                                                     "after": after}})
+
+        select_filter: SelectFilter = self.olap_service.select_filter_for_frontend(frontend_data, tables_collection,
+                                                                                     self.aggregate_navigator)
+
+        table_name: str = select_filter.get_best_table()
+        values: list = self.execute(select_filter.get_sql(table_name), select_filter.get_params(table_name))
+
+        with self.__lock:
+            if self.__tables_collection is tables_collection:
+                self.__values[key] = {"values": values, "loaded_at": time.time()}
+
+        return values
+
+    def refresh(self) -> None:
+        """
+        Loads values of all cached filters again
+        If self.structure_generator was reloaded, values are loaded for its current tables collection, filters of
+        removed fields are dropped
+        :return:
+        """
+        with self.__lock:
+            keys: list[tuple] = list(self.__values.keys())
+            tables_collection: OlapTablesCollection | None = self.__tables_collection
+
+            if self.structure_generator is not None:
+                current_collection: OlapTablesCollection = self.structure_generator.get_state().tables_collection
+
+                if current_collection is not tables_collection:
+                    self.__values.clear()
+                    self.__tables_collection = current_collection
+                    tables_collection = current_collection
+                    keys = [key for key in keys if self.__has_field(key[0], current_collection)]
+
+        for key in keys:
+            self.__load(key, tables_collection)
+
+        with self.__lock:
+            self.__statistics["refreshes"] += 1
+
+    @staticmethod
+    def __has_field(field_alias: str, tables_collection: OlapTablesCollection) -> bool:
+        """
+        Checks if field exists in any table of collection
+        :param field_alias: alias of field
+        :param tables_collection: OlapTablesCollection
+        :return:
+        """
+        if tables_collection.get_dimension_table_with_field(field_alias) is not None:
+            return True
+
+        return bool(tables_collection.get_data_tables_with_field(field_alias))
+
+    def start_background_refresh(self, interval: float) -> None:
+        """
+        Starts daemon thread that calls self.refresh() every interval seconds
+        Failed refresh is logged and counted in "refresh_failures" of self.get_statistics(), thread keeps running
+        :param interval: seconds between refreshes
+        :return:
+        """
+        if (self.__refresh_thread is not None) and self.__refresh_thread.is_alive():
+            return
+
+        self.__stop_refresh.clear()
+
+        def refresh_loop() -> None:
+            while not self.__stop_refresh.wait(interval):
+                try:
+                    self.refresh()
+                except Exception:
+                    logger.exception("Refresh of filter values failed")
+
+                    with self.__lock:
+                        self.__statistics["refresh_failures"] += 1
+
+        self.__refresh_thread = threading.Thread(target=refresh_loop, name="OlapFilterValuesCacheRefresh",
+                                                 daemon=True)
+        self.__refresh_thread.start()
+
+    def stop_background_refresh(self) -> None:
+        """
+        Stops thread started with self.start_background_refresh()
+        :return:
+        """
+        self.__stop_refresh.set()
+
+        if self.__refresh_thread is not None:
+            self.__refresh_thread.join()
+            self.__refresh_thread = None
+
+    def precompute(self, tables_collection: OlapTablesCollection, table_statistics: OlapTableStatistics,
+                   max_cardinality: int) -> list[str]:
+        """
+        Loads all values of dimension fields with number of distinct values (ndv from statistics.toml) not bigger than
+        max_cardinality. Fields without ndv are skipped
+        :param tables_collection: OlapTablesCollection from OlapStructureGenerator
+        :param table_statistics: OlapTableStatistics from OlapStructureGenerator
+        :param max_cardinality: max number of distinct values
+        :return: list of precomputed field aliases
+        """
+        precomputed_fields: list[str] = []
+
+        for table_name in tables_collection.get_dimension_table_names():
+            fields: dict = tables_collection["dimension_tables"][table_name]["fields"]
+
+            for field_alias in fields:
+                if fields[field_alias]["field_type"] == OlapFieldTypes.SERVICE_KEY.value:
+                    continue
+
+                column: dict | None = table_statistics.get_column(table_name, fields[field_alias]["field_name"])
+
+                if (column is None) or (column.get("ndv") is None) or (column["ndv"] > max_cardinality):
+                    continue
+
+                self.get_values(OlapFilterFrontend({"SELECT_DISTINCT": {"field_name": field_alias,
+                                                                        "type": FilterTypes.ALL.value}}),
+                                tables_collection)
+                precomputed_fields.append(field_alias)
+
+        return precomputed_fields
+
+    def write_values(self, path: str, source_hash: str | None = None) -> None:
+        """
+        Saves cached values to file. File is replaced atomically
+        Hash of tables collection of values is saved too, so file is read only for collection with the same tables
+        :param path: path to file
+        :param source_hash: OlapStructureGenerator.source_hash. File is read only for the same structure
+        :return:
+        """
+        with self.__lock:
+            tables_collection: OlapTablesCollection | None = self.__tables_collection
+            values: dict = {"version": self.FILE_VERSION, "source_hash": source_hash, "values": dict(self.__values)}
+
+        values["tables_hash"] = tables_collection.get_content_hash() if tables_collection is not None else None
+
+        temp_path: str = f"{path}.{os.getpid()}.tmp"
+
+        with open(temp_path, "wb") as values_file:
+            pickle.dump(values, values_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(temp_path, path)
+
+    def read_values(self, path: str, tables_collection: OlapTablesCollection, source_hash: str | None = None) -> bool:
+        """
+        Reads values from file created with self.write_values()
+        File is a pickle file. Read only files you have created yourself
+        :param path: path to file
+        :param tables_collection: OlapTablesCollection values are used for. Values are read only if file was written
+        for collection with the same tables
+        :param source_hash: OlapStructureGenerator.source_hash
+        :return: True if values were read
+        """
+        if not os.path.isfile(path):
+            return False
+
+        try:
+            with open(path, "rb") as values_file:
+                values: dict = pickle.load(values_file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+            return False
+
+        if (not isinstance(values, dict)) or (values.get("version") != self.FILE_VERSION) \
+                or (values.get("source_hash") != source_hash):
+            return False
+
+        if values.get("tables_hash") != tables_collection.get_content_hash():
+            return False
+
+        with self.__lock:
+            self.__tables_collection = tables_collection
+            self.__values = dict(values["values"])
+
+        return True
+
+    def load_or_precompute(self, path: str, tables_collection: OlapTablesCollection,
+                           table_statistics: OlapTableStatistics, max_cardinality: int,
+                           source_hash: str | None = None) -> None:
+        """
+        Reads values from file or precomputes them and writes file. Should be called after structure is loaded
+        :param path: path to file
+        :param tables_collection: OlapTablesCollection from OlapStructureGenerator
+        :param table_statistics: OlapTableStatistics from OlapStructureGenerator
+        :param max_cardinality: max number of distinct values of precomputed field
+        :param source_hash: OlapStructureGenerator.source_hash
+        :return:
+        """
+        if self.read_values(path, tables_collection, source_hash):
+            return
+
+        self.precompute(tables_collection, table_statistics, max_cardinality)
+        self.write_values(path, source_hash)
+
+    def get_statistics(self) -> dict:
+        """
+        Returns counters of cache
+        :return: {"hits": int, "misses": int, "refreshes": int, "statistics_hits": int, "refresh_failures": int,
+        "size": int}
+        """
+        with self.__lock:
+            statistics: dict = dict(self.__statistics)
+            statistics["size"] = len(self.__values)
+            return statistics
@@ -1,10 +1,11 @@
+import re
 from abc import ABC, abstractmethod
 
 from comradewolf.utils.enums_and_field_dicts import OlapDataType, WhereConditionType, OlapCalculations
 from comradewolf.utils.exceptions import OlapException
 from comradewolf.utils.olap_data_types import ShortTablesCollectionForSelect, OlapFrontendToBackend, \
     OlapTablesCollection, OlapFrontend
-from comradewolf.utils.utils import create_field_with_calculation
+from comradewolf.utils.utils import create_field_with_calculation, get_prefix_successor
 
 FIELD_NAME_WITH_ALIAS = '{} as "{}"'
 
@@ -14,6 +15,13 @@ GROUP_BY = "GROUP BY"
 INNER_JOIN = "INNER_JOIN"
 FROM = "FROM"
 
+# Alias of GROUPING() column in merged queries
+GROUPING_COLUMN = "grouping_id"
+
+# Marks bind parameter in SQL until it is replaced with placeholder of database driver
+PARAMETER_MARKER = "\x01{}\x01"
+PARAMETER_MARKER_PATTERN = re.compile("\x01(\\d+)\x01")
+
 MANY_DIMENSION_TABLES_ERR = ("Two or more dimension tables are without fact table are in query. There is no way to "
                              "join them")
 
@@ -21,8 +29,20 @@ MANY_DIMENSION_TABLES_ERR = ("Two or more dimension tables are without fact tabl
 class OlapSelectBuilder(ABC):
     """
     Base abstract class to create select query
+
+    If parameterized is True, where literals are not put into SQL. SQL has bind placeholders and parameters are
+    returned in separate list
     """
 
+    # Bind placeholder of database driver
+    BIND_PLACEHOLDER: str = "?"
+
+    def __init__(self, parameterized: bool = False) -> None:
+        """
+        :param parameterized: create SQL with bind placeholders instead of literals
+        """
+        self.parameterized = parameterized
+
     @abstractmethod
     def generate_select_query(self, select_list: list, select_for_group_by: list, joins: dict, where: list,
                               has_calculation: bool, table_name: str, order_by: list[str], not_selected_fields_no: int,
@@ -81,6 +101,63 @@ class OlapSelectBuilder(ABC):
         """
         pass
 
+    def generate_where_condition_with_params(self, field_alias: str, type_of_where: str,
+                                             front_condition: list | str | float | int, data_type: str,
+                                             first_param_index: int) -> tuple[str, list]:
+        """
+        Same as self.generate_where_condition(), but literals are replaced with parameter markers
+        :param field_alias:
+        :param type_of_where:
+        :param front_condition:
+        :param data_type:
+        :param first_param_index: index of first parameter in list of all parameters of query
+        :return: condition with markers and list of parameters
+        """
+        pass
+
+    def generate_grouping_sets_query(self, table_name: str, joins: dict, where: list[str],
+                                     select_lists: list[list[str]], group_by_lists: list[list[str]]) \
+            -> tuple[str, list[int | None]]:
+        """
+        Merges queries with the same table, joins and where into one query with GROUP BY GROUPING SETS
+        :param table_name: table name for FROM
+        :param joins: tables to be joined
+        :param where: list of where conditions
+        :param select_lists: list of select pieces of every query
+        :param group_by_lists: list of group by pieces of every query
+        :return: select statement and value of GROUPING_COLUMN for rows of every query
+        """
+        pass
+
+    @staticmethod
+    def escape_sql_text(sql: str) -> str:
+        """
+        Escapes SQL text between bind placeholders if driver needs it
+        :param sql: piece of SQL
+        :return:
+        """
+        return sql
+
+    def bind_parameters(self, sql: str, params: list) -> tuple[str, list]:
+        """
+        Replaces parameter markers with self.BIND_PLACEHOLDER
+        :param sql: SQL with parameter markers
+        :param params: all parameters of query, indexes are in markers
+        :return: SQL for driver and parameters in order of placeholders
+        """
+        sql_parts: list[str] = PARAMETER_MARKER_PATTERN.split(sql)
+        bound_sql: list[str] = []
+        bound_params: list = []
+
+        for part_index, part in enumerate(sql_parts):
+            if part_index % 2 == 0:
+                bound_sql.append(self.escape_sql_text(part))
+            else:
+                bound_sql.append(self.BIND_PLACEHOLDER)
+                bound_params.append(params[int(part)])
+
+        return "".join(bound_sql), bound_params
+
     @staticmethod
     def get_select_fiter_all(backend_name: str, table_name: str, limit: int | None) -> str:
         """
@@ -102,6 +179,29 @@ class OlapSelectBuilder(ABC):
         """
         pass
 
+    def get_select_fiter_prefix(self, backend_name: str, table_name: str, prefix: str, page_size: int,
+                                after: str | None, first_param_index: int = 0) -> tuple[str, list]:
+        """
+        Returns select for one page of distinct values starting with prefix
+        :param backend_name: field name
+        :param table_name: name of table
+        :param prefix: search prefix
+        :param page_size: max number of values
+        :param after: last value of previous page or None for first page
+        :param first_param_index: index of first parameter in list of all parameters of query
+        :return: select statement (with parameter markers if self.parameterized) and parameters
+        """
+        pass
+
+    @staticmethod
+    def get_filter_subquery(sql: str) -> str:
+        """
+        Returns select to use in FROM of filter select
+        :param sql: select statement
+        :return:
+        """
+        pass
+
     @staticmethod
     def generate_calculation(calculation_type: str, backend_field_name: str) -> str:
         """
@@ -114,6 +214,9 @@ class OlapSelectBuilder(ABC):
 
 
 class OlapPostgresSelectBuilder(OlapSelectBuilder):
+    # psycopg format paramstyle
+    BIND_PLACEHOLDER: str = "%s"
+
     def generate_structure_for_dimension_table(self, frontend_fields: OlapFrontendToBackend,
                                                tables_collection: OlapTablesCollection) \
             -> tuple[str, list[str], list[str], list[str], bool, list[str]]:
@@ -358,22 +461,9 @@ class OlapPostgresSelectBuilder(OlapSelectBuilder):
         :param front_condition:
         :return:
         """
-        condition = ""
-
-        type_of_where = type_of_where.upper()
-
-        all_where_types = [e.value for e in WhereConditionType]
-
-        if type_of_where not in all_where_types:
-            raise OlapException(f"Check your where condition. {type_of_where} not in {','.join(all_where_types)}")
-
-        current_placeholder: str
-
         string_placeholder = r"'{}'"
         date_placeholder = r"'{}'"
-        in_placeholder = "({})"
         number_placeholder = "{}"
-        and_placeholder = "{} AND {}"
 
         if data_type == OlapDataType.DATE.value:
             current_placeholder = date_placeholder
@@ -386,6 +476,54 @@ class OlapPostgresSelectBuilder(OlapSelectBuilder):
         else:
             raise OlapException(f"Field type {data_type} is unknown")
 
+        return self.__generate_condition(type_of_where, front_condition, current_placeholder.format)
+
+    def generate_where_condition_with_params(self, field_alias: str, type_of_where: str,
+                                             front_condition: list | str | float | int, data_type: str,
+                                             first_param_index: int) -> tuple[str, list]:
+        """
+        Same as self.generate_where_condition(), but literals are replaced with parameter markers
+        :param field_alias:
+        :param type_of_where:
+        :param front_condition:
+        :param data_type:
+        :param first_param_index: index of first parameter in list of all parameters of query
+        :return: condition with markers and list of parameters
+        """
+        if data_type not in [e.value for e in OlapDataType]:
+            raise OlapException(f"Field type {data_type} is unknown")
+
+        params: list = []
+
+        def add_param(value) -> str:
+            params.append(value)
+            return PARAMETER_MARKER.format(first_param_index + len(params) - 1)
+
+        condition: str = self.__generate_condition(type_of_where, front_condition, add_param)
+
+        return condition, params
+
+    @staticmethod
+    def __generate_condition(type_of_where: str, front_condition: list | str | float | int, format_literal) -> str:
+        """
+        Generates condition after operator
+        :param type_of_where:
+        :param front_condition:
+        :param format_literal: function that turns literal into piece of SQL
+        :return:
+        """
+        condition = ""
+
+        type_of_where = type_of_where.upper()
+
+        all_where_types = [e.value for e in WhereConditionType]
+
+        if type_of_where not in all_where_types:
+            raise OlapException(f"Check your where condition. {type_of_where} not in {','.join(all_where_types)}")
+
+        in_placeholder = "({})"
+        and_placeholder = "{} AND {}"
+
         if type_of_where == WhereConditionType.BETWEEN.value:
             if not isinstance(front_condition, list):
                 raise OlapException("front_condition should be list")
@@ -393,23 +531,87 @@ class OlapPostgresSelectBuilder(OlapSelectBuilder):
             if len(front_condition) != 2:
                 raise OlapException("front_condition should have 2 elements")
 
-            condition = and_placeholder.format(current_placeholder.format(front_condition[0]),
-                                               current_placeholder.format(front_condition[1]))
+            condition = and_placeholder.format(format_literal(front_condition[0]), format_literal(front_condition[1]))
         elif type_of_where in [WhereConditionType.IN.value, WhereConditionType.NOT_IN.value]:
             if isinstance(front_condition, list):
                 temp_condition = []
                 for item in front_condition:
-                    temp_condition.append(current_placeholder.format(item))
+                    temp_condition.append(format_literal(item))
                 condition = in_placeholder.format(",".join(temp_condition))
             else:
                 OlapException("IN front_condition should be in a list")
         else:
             if isinstance(front_condition, list):
                 OlapException("List instead of str or int or float")
-            condition = current_placeholder.format(front_condition)
+            condition = format_literal(front_condition)
 
         return condition
 
+    def generate_grouping_sets_query(self, table_name: str, joins: dict, where: list[str],
+                                     select_lists: list[list[str]], group_by_lists: list[list[str]]) \
+            -> tuple[str, list[int | None]]:
+        """
+        Merges queries with the same table, joins and where into one query with GROUP BY GROUPING SETS
+        :param table_name: table name for FROM
+        :param joins: tables to be joined
+        :param where: list of where conditions
+        :param select_lists: list of select pieces of every query
+        :param group_by_lists: list of group by pieces of every query
+        :return: select statement and value of GROUPING_COLUMN for rows of every query
+        """
+        select_list: list[str] = []
+        group_by_columns: list[str] = []
+        grouping_sets: list[tuple[str, ...]] = []
+
+        for query_select_list, query_group_by in zip(select_lists, group_by_lists):
+            for select_item in query_select_list:
+                if select_item not in select_list:
+                    select_list.append(select_item)
+
+            for group_by_item in query_group_by:
+                if group_by_item not in group_by_columns:
+                    group_by_columns.append(group_by_item)
+
+        for query_group_by in group_by_lists:
+            grouping_set: tuple[str, ...] = tuple(column for column in group_by_columns if column in query_group_by)
+            if grouping_set not in grouping_sets:
+                grouping_sets.append(grouping_set)
+
+        # Only totals. Every query gets the only row
+        if len(group_by_columns) == 0:
+            sql, _ = self.generate_select_query(select_list, [], joins, where, True, table_name, [], 0, False)
+            return sql, [None] * len(select_lists)
+
+        # Bit of GROUPING() is 1 if column is not in grouping set. First column is the highest bit
+        grouping_ids: list[int | None] = []
+
+        for query_group_by in group_by_lists:
+            grouping_id: int = 0
+            for column_index, column in enumerate(group_by_columns):
+                if column not in query_group_by:
+                    grouping_id |= 1 << (len(group_by_columns) - 1 - column_index)
+            grouping_ids.append(grouping_id)
+
+        select_list.append(FIELD_NAME_WITH_ALIAS.format("GROUPING({})".format(", ".join(group_by_columns)),
+                                                        GROUPING_COLUMN))
+
+        sql, _ = self.generate_select_query(select_list, [], joins, where, True, table_name, [], 0, False)
+
+        grouping_sets_string: str = "\n\t,".join("({})".format(", ".join(grouping_set))
+                                                  for grouping_set in grouping_sets)
+        sql += f"\n{GROUP_BY} GROUPING SETS (\n\t {grouping_sets_string}\n)"
+
+        return sql, grouping_ids
+
+    @staticmethod
+    def escape_sql_text(sql: str) -> str:
+        """
+        Escapes percent sign for format paramstyle
+        :param sql: piece of SQL
+        :return:
+        """
+        return sql.replace("%", "%%")
+
     @staticmethod
     def get_select_fiter_all(backend_name: str, table_name: str, limit: int | None) -> str:
         """
@@ -436,6 +638,60 @@ class OlapPostgresSelectBuilder(OlapSelectBuilder):
         """
         return f"SELECT MIN({backend_name}) as min_value, MAX({backend_name}) as max_value FROM {table_name}"
 
+    def get_select_fiter_prefix(self, backend_name: str, table_name: str, prefix: str, page_size: int,
+                                after: str | None, first_param_index: int = 0) -> tuple[str, list]:
+        """
+        Returns select for one page of distinct values starting with prefix
+        Prefix is searched with range (>= prefix AND < successor of prefix), so btree index is used. Index should be
+        created with COLLATE "C" or text_pattern_ops. Pages are taken by last value of previous page (keyset
+        pagination), not by OFFSET
+        :param backend_name: field name
+        :param table_name: name of table
+        :param prefix: search prefix
+        :param page_size: max number of values
+        :param after: last value of previous page or None for first page
+        :param first_param_index: index of first parameter in list of all parameters of query
+        :return: select statement (with parameter markers if self.parameterized) and parameters
+        """
+        params: list = []
+
+        def format_literal(value: str) -> str:
+            if self.parameterized:
+                params.append(value)
+                return PARAMETER_MARKER.format(first_param_index + len(params) - 1)
+
+            return "'{}'".format(str(value).replace("'", "''"))
+
+        where: list[str] = []
+        prefix_successor: str | None = get_prefix_successor(prefix)
+
+        if prefix != "":
+            where.append(f"{backend_name} >= {format_literal(prefix)}")
+
+        if prefix_successor is not None:
+            where.append(f"{backend_name} < {format_literal(prefix_successor)}")
+
+        if after is not None:
+            where.append(f"{backend_name} > {format_literal(after)}")
+
+        sql: str = f"SELECT DISTINCT {backend_name} FROM {table_name}"
+
+        if len(where) > 0:
+            sql += "\nWHERE " + "\nAND ".join(where)
+
+        sql += f"\nORDER BY {backend_name}\nLIMIT {int(page_size)}"
+
+        return sql, params
+
+    @staticmethod
+    def get_filter_subquery(sql: str) -> str:
+        """
+        Returns select to use in FROM of filter select
+        :param sql: select statement
+        :return:
+        """
+        return f"(\n{sql}\n) AS filter_values"
+
     @staticmethod
     def generate_calculation(calculation_type: str, backend_field_name: str) -> str:
         if calculation_type==OlapCalculations.COUNT_DISTINCT.value:
@@ -0,0 +1,212 @@
+import re
+import threading
+from collections import OrderedDict
+
+from comradewolf.utils.olap_data_types import OlapFrontendToBackend, OlapTablesCollection, SelectCollection
+
+# Where condition is replaced with this placeholder while plan is created
+WHERE_PLACEHOLDER = "\x00{}\x00"
+WHERE_PLACEHOLDER_PATTERN = re.compile("\x00(\\d+)\x00")
+
+
+class OlapPlanCache:
+    """
+    LRU cache of query plans for OlapService.select_data()
+
+    Key is a shape of request: select fields, calculations and for where fields only field name, operator and number
+    of literals, all in order of request. Order is kept, because it defines order of columns, ORDER BY and WHERE of
+    SQL. Two requests that differ only in where literals have the same plan, so on cache hit literals are put into SQL
+    templates and table search is not made again
+
+    Plan is bound to OlapTablesCollection it was created for. OlapStructureGenerator.reload() replaces collection, so
+    plans of old collection are not used after reload
+
+    Plan structure:
+    {
+        table_name: {
+            "sql_parts": [sql_text, where_index, sql_text, ...],
+            "not_selected_fields_no": int,
+            "has_group_by": bool,
+            "joined_tables": [joined_table_name, ...],
+        }
+    }
+    """
+
+    def __init__(self, max_size: int = 1000) -> None:
+        """
+        :param max_size: max number of plans in cache
+        """
+        self.max_size = max_size
+
+        # {key: (tables_collection, plan)}. Last item is the most recently used
+        self.__plans: OrderedDict[tuple, tuple[OlapTablesCollection, dict]] = OrderedDict()
+        self.__lock: threading.Lock = threading.Lock()
+
+        self.__statistics: dict = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    @staticmethod
+    def get_where_arity(where_field: dict) -> int:
+        """
+        Returns number of literals in where condition
+        :param where_field: where field of OlapFrontendToBackend
+        :return:
+        """
+        if "params" in where_field:
+            return len(where_field["params"])
+
+        if isinstance(where_field["condition"], (list, tuple)):
+            return len(where_field["condition"])
+
+        return 1
+
+    @classmethod
+    def get_key(cls, frontend_data: OlapFrontendToBackend, tables_collection: OlapTablesCollection,
+                add_order_by: bool) -> tuple:
+        """
+        Creates key of request shape
+        :param frontend_data: OlapFrontendToBackend
+        :param tables_collection: OlapTablesCollection
+        :param add_order_by: add order by to fact query or not
+        :return:
+        """
+        select_fields: tuple = tuple(field["field_name"] for field in frontend_data.get_select())
+        calculations: tuple = tuple((field["field_name"], field["calculation"])
+                                    for field in frontend_data.get_calculation())
+        where_fields: tuple = tuple((field["field_name"], field["where"].upper(), cls.get_where_arity(field))
+                                    for field in frontend_data.get_where())
+
+        return id(tables_collection), add_order_by, select_fields, calculations, where_fields
+
+    @staticmethod
+    def create_template_request(frontend_data: OlapFrontendToBackend) -> OlapFrontendToBackend:
+        """
+        Creates copy of request with placeholders instead of where conditions
+        :param frontend_data: OlapFrontendToBackend
+        :return: OlapFrontendToBackend
+        """
+        template_request: OlapFrontendToBackend = OlapFrontendToBackend()
+        template_request.add_select([dict(field) for field in frontend_data.get_select()])
+        template_request.add_calculation([dict(field) for field in frontend_data.get_calculation()])
+
+        where: list[dict] = []
+
+        for where_index, where_field in enumerate(frontend_data.get_where()):
+            template_where: dict = dict(where_field)
+            template_where["condition"] = WHERE_PLACEHOLDER.format(where_index)
+            where.append(template_where)
+
+        template_request.add_where(where)
+
+        return template_request
+
+    @staticmethod
+    def create_plan(select_collection: SelectCollection) -> dict:
+        """
+        Creates plan from selects of template request
+        :param select_collection: SelectCollection created with self.create_template_request()
+        :return: plan
+        """
+        plan: dict = {}
+
+        for table_name in select_collection:
+            sql_parts: list = WHERE_PLACEHOLDER_PATTERN.split(select_collection.get_sql(table_name))
+
+            for part_index in range(1, len(sql_parts), 2):
+                sql_parts[part_index] = int(sql_parts[part_index])
+
+            plan[table_name] = {
+                "sql_parts": sql_parts,
+                "not_selected_fields_no": select_collection.get_not_selected_fields_no(table_name),
+                "has_group_by": select_collection.get_has_group_by(table_name),
+                "joined_tables": select_collection.get_joined_tables(table_name),
+            }
+
+        return plan
+
+    @staticmethod
+    def bind(plan: dict, frontend_data: OlapFrontendToBackend) -> SelectCollection:
+        """
+        Puts where conditions of request into plan
+        :param plan: plan from self.create_plan()
+        :param frontend_data: OlapFrontendToBackend with the same key as plan
+        :return: SelectCollection
+        """
+        conditions: list = [where_field["condition"] for where_field in frontend_data.get_where()]
+
+        select_collection: SelectCollection = SelectCollection()
+
+        for table_name in plan:
+            sql: str = "".join(str(conditions[part]) if isinstance(part, int) else part
+                               for part in plan[table_name]["sql_parts"])
+
+            select_collection.add_table(table_name, sql, plan[table_name]["not_selected_fields_no"],
+                                        plan[table_name]["has_group_by"], list(plan[table_name]["joined_tables"]))
+
+        return select_collection
+
+    def get(self, key: tuple, tables_collection: OlapTablesCollection) -> dict | None:
+        """
+        Returns plan or None
+        :param key: key from self.get_key()
+        :param tables_collection: OlapTablesCollection of request
+        :return:
+        """
+        with self.__lock:
+            if key in self.__plans:
+                plan_tables_collection, plan = self.__plans[key]
+
+                if plan_tables_collection is tables_collection:
+                    self.__statistics["hits"] += 1
+                    self.__plans.move_to_end(key)
+                    return plan
+
+                # id() of new collection is the same as of old one
+                del self.__plans[key]
+                self.__statistics["invalidations"] += 1
+
+            self.__statistics["misses"] += 1
+
+            return None
+
+    def put(self, key: tuple, tables_collection: OlapTablesCollection, plan: dict) -> None:
+        """
+        Puts plan into cache and evicts least recently used plans
+        :param key: key from self.get_key()
+        :param tables_collection: OlapTablesCollection of request
+        :param plan: plan from self.create_plan()
+        :return:
+        """
+        with self.__lock:
+            self.__plans[key] = (tables_collection, plan)
+            self.__plans.move_to_end(key)
+
+            while len(self.__plans) > self.max_size:
+                self.__plans.popitem(last=False)
+                self.__statistics["evictions"] += 1
+
+    def invalidate(self, tables_collection: OlapTablesCollection | None = None) -> None:
+        """
+        Removes plans from cache
+        :param tables_collection: remove only plans of this collection. All plans if None
+        :return:
+        """
+        with self.__lock:
+            for key in list(self.__plans.keys()):
+                if (tables_collection is None) or (self.__plans[key][0] is tables_collection):
+                    del self.__plans[key]
+                    self.__statistics["invalidations"] += 1
+
+    def get_statistics(self) -> dict:
+        """
+        Returns counters of cache
+        :return: {"hits": int, "misses": int, "evictions": int, "invalidations": int, "size": int}
+        """
+        with self.__lock:
+            statistics: dict = dict(self.__statistics)
+            statistics["size"] = len(self.__plans)
+            return statistics
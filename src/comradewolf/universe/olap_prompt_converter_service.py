@@ -1,5 +1,5 @@
 from comradewolf.universe.olap_language_select_builders import OlapSelectBuilder
-from comradewolf.utils.olap_data_types import OlapFrontendToBackend, OlapFrontend
+from comradewolf.utils.olap_data_types import OlapFrontendToBackend, OlapFrontend, OlapFilterFrontend
 
 
 class OlapPromptConverterService:
@@ -28,17 +28,60 @@ class OlapPromptConverterService:
             frontend_to_backend.add_calculation(frontend_dictionary["CALCULATION"])
 
         backend_where: list[dict] = []
+        params: list = []
 
         if "WHERE" in frontend_dictionary.keys():
-            for item in frontend_dictionary["WHERE"]:
-                field_alias: str = item["field_name"]
-                type_of_where: str = item["where"]
-                front_condition: list | str | float | int = item["condition"]
-                field_type: str = all_fields.get_data_type(field_alias)
-                condition: str = self.olap_select_builder.generate_where_condition(field_alias, type_of_where,
-                                                                                   front_condition, field_type)
-                backend_where.append({"field_name": field_alias, "where": type_of_where, 'condition': condition})
+            backend_where, params = self.__convert_where(frontend_dictionary["WHERE"], all_fields)
 
         frontend_to_backend.add_where(backend_where)
 
+        if self.olap_select_builder.parameterized:
+            frontend_to_backend.add_params(params)
+
         return frontend_to_backend
+
+    def create_filter_frontend(self, frontend_dictionary: dict, all_fields: OlapFrontend) -> OlapFilterFrontend:
+        """
+        Generates filter structure from frontend data. WHERE of frontend data restricts values of filter
+        :param frontend_dictionary: frontend data with SELECT_DISTINCT and optional WHERE
+        :param all_fields: all fields with data types
+        :return: OlapFilterFrontend
+        """
+        filter_frontend: OlapFilterFrontend = OlapFilterFrontend(frontend_dictionary)
+
+        if "WHERE" in frontend_dictionary.keys():
+            backend_where, params = self.__convert_where(frontend_dictionary["WHERE"], all_fields)
+            filter_frontend.add_where(backend_where, params)
+
+        return filter_frontend
+
+    def __convert_where(self, frontend_where: list[dict], all_fields: OlapFrontend) -> tuple[list[dict], list]:
+        """
+        Converts where fields of frontend data
+        :param frontend_where: where fields of frontend data
+        :param all_fields: all fields with data types
+        :return: where fields for backend and bind parameters
+        """
+        backend_where: list[dict] = []
+        params: list = []
+
+        for item in frontend_where:
+            field_alias: str = item["field_name"]
+            type_of_where: str = item["where"]
+            front_condition: list | str | float | int = item["condition"]
+            field_type: str = all_fields.get_data_type(field_alias)
+
+            if self.olap_select_builder.parameterized:
+                condition, where_params = self.olap_select_builder \
+                    .generate_where_condition_with_params(field_alias, type_of_where, front_condition, field_type,
+                                                          len(params))
+                params.extend(where_params)
+                backend_where.append({"field_name": field_alias, "where": type_of_where, 'condition': condition,
+                                      "params": where_params})
+                continue
+
+            condition: str = self.olap_select_builder.generate_where_condition(field_alias, type_of_where,
+                                                                               front_condition, field_type)
+            backend_where.append({"field_name": field_alias, "where": type_of_where, 'condition': condition})
+
+        return backend_where, params
@@ -0,0 +1,501 @@
+import copy
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable
+
+from comradewolf.utils.olap_data_types import SelectCollection
+
+RESULT_FILE_EXTENSION = ".result"
+DATA_VERSION_FILE_EXTENSION = ".version"
+# Share of max_size left after eviction of disk backend, so directory is not scanned on every set
+DISK_EVICTION_LOW_WATERMARK = 0.9
+
+
+class OlapResultCacheBackend(ABC):
+    """
+    Storage of cached results
+
+    Entry structure:
+    {
+        "rows": rows returned by database,
+        "tables": [table_name, ...], # tables used in query
+        "expires_at": unix timestamp or None,
+    }
+
+    Backend also keeps data versions of tables, so every OlapResultCache with the same storage sees the same versions
+    Data version is a tuple (data_version, invalidation)
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> dict | None:
+        """
+        Returns entry or None
+        :param key: cache key
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key: str, entry: dict) -> None:
+        """
+        Saves entry
+        :param key: cache key
+        :param entry: entry
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Deletes entry if it exists
+        :param key: cache key
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def keys(self) -> list[str]:
+        """
+        Returns all keys
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def get_data_version(self, table_name: str) -> tuple[str, str] | None:
+        """
+        Returns data version of table or None if it was never set
+        :param table_name: table name in style of db.schema.table
+        :return: (data_version, invalidation)
+        """
+        pass
+
+    @abstractmethod
+    def set_data_version(self, table_name: str, data_version: tuple[str, str]) -> None:
+        """
+        Saves data version of table
+        :param table_name: table name in style of db.schema.table
+        :param data_version: (data_version, invalidation)
+        :return:
+        """
+        pass
+
+    def clear(self) -> None:
+        """
+        Deletes all entries. Data versions are kept
+        :return:
+        """
+        for key in self.keys():
+            self.delete(key)
+
+
+class OlapMemoryResultCacheBackend(OlapResultCacheBackend):
+    """
+    LRU of entries in memory of current process
+    Rows are copied on set and get, so changes of returned rows do not change cache
+    """
+
+    def __init__(self, max_size: int = 1000) -> None:
+        """
+        :param max_size: max number of entries
+        """
+        self.max_size = max_size
+
+        # Last item is the most recently used
+        self.__entries: OrderedDict[str, dict] = OrderedDict()
+        # {table_name: (data_version, invalidation)}
+        self.__data_versions: dict[str, tuple[str, str]] = {}
+        self.__lock: threading.Lock = threading.Lock()
+
+    def get(self, key: str) -> dict | None:
+        with self.__lock:
+            if key not in self.__entries:
+                return None
+
+            self.__entries.move_to_end(key)
+            entry: dict = self.__entries[key]
+
+        return {**entry, "rows": copy.deepcopy(entry["rows"])}
+
+    def set(self, key: str, entry: dict) -> None:
+        entry = {**entry, "rows": copy.deepcopy(entry["rows"])}
+
+        with self.__lock:
+            self.__entries[key] = entry
+            self.__entries.move_to_end(key)
+
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def keys(self) -> list[str]:
+        with self.__lock:
+            return list(self.__entries.keys())
+
+    def get_data_version(self, table_name: str) -> tuple[str, str] | None:
+        with self.__lock:
+            return self.__data_versions.get(table_name)
+
+    def set_data_version(self, table_name: str, data_version: tuple[str, str]) -> None:
+        with self.__lock:
+            self.__data_versions[table_name] = data_version
+
+
+class OlapDiskResultCacheBackend(OlapResultCacheBackend):
+    """
+    Entries in pickle files in local directory. Can be shared between processes
+    Files are pickle files, use only directory you write to yourself
+
+    Number of files is counted in memory, directory is scanned only when count is bigger than max_size. Count does
+    not see files of other processes, it is corrected on every scan
+
+    Data version of every table is kept in its own file and is read on every key creation, so
+    OlapResultCache.invalidate_table() and OlapResultCache.set_data_version() in one process are seen by all processes
+    """
+
+    def __init__(self, directory: str, max_size: int | None = None) -> None:
+        """
+        :param directory: directory for result files. Is created if it does not exist
+        :param max_size: max number of files. Least recently used files are deleted. No limit if None
+        """
+        self.directory = directory
+        self.max_size = max_size
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.__lock: threading.Lock = threading.Lock()
+        self.__file_count: int = len(self.keys())
+
+    def __get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + RESULT_FILE_EXTENSION)
+
+    def __get_data_version_path(self, table_name: str) -> str:
+        return os.path.join(self.directory,
+                            hashlib.sha256(table_name.encode("utf-8")).hexdigest() + DATA_VERSION_FILE_EXTENSION)
+
+    def __write_file(self, path: str, value) -> None:
+        """
+        Writes pickle to temporary file and replaces path with it, so other processes never read half-written file
+        :param path: path of file
+        :param value: value to pickle
+        :return:
+        """
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(file_descriptor, "wb") as temp_file:
+                pickle.dump(value, temp_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def get(self, key: str) -> dict | None:
+        path: str = self.__get_path(key)
+
+        try:
+            with open(path, "rb") as result_file:
+                entry: dict = pickle.load(result_file)
+            # mtime is used as last access time for LRU
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        return entry
+
+    def set(self, key: str, entry: dict) -> None:
+        path: str = self.__get_path(key)
+        is_new: bool = not os.path.exists(path)
+
+        self.__write_file(path, entry)
+
+        with self.__lock:
+            if is_new:
+                self.__file_count += 1
+
+            if (self.max_size is None) or (self.__file_count <= self.max_size):
+                return
+
+            self.__evict()
+
+    def __evict(self) -> None:
+        """
+        Deletes least recently used files till DISK_EVICTION_LOW_WATERMARK of self.max_size files are left
+        Should be called under self.__lock
+        :return:
+        """
+        access_times: dict[str, float] = {}
+        for key in self.keys():
+            path: str = self.__get_path(key)
+            try:
+                access_times[path] = os.path.getmtime(path)
+            except OSError:
+                continue
+
+        files_to_keep: int = int(self.max_size * DISK_EVICTION_LOW_WATERMARK)
+        self.__file_count = len(access_times)
+
+        for path in sorted(access_times, key=access_times.get)[:max(len(access_times) - files_to_keep, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+            self.__file_count -= 1
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.__get_path(key))
+        except FileNotFoundError:
+            return
+
+        with self.__lock:
+            self.__file_count -= 1
+
+    def keys(self) -> list[str]:
+        return [file_name[:-len(RESULT_FILE_EXTENSION)] for file_name in os.listdir(self.directory)
+                if file_name.endswith(RESULT_FILE_EXTENSION)]
+
+    def get_data_version(self, table_name: str) -> tuple[str, str] | None:
+        try:
+            with open(self.__get_data_version_path(table_name), "rb") as version_file:
+                return pickle.load(version_file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def set_data_version(self, table_name: str, data_version: tuple[str, str]) -> None:
+        self.__write_file(self.__get_data_version_path(table_name), data_version)
+
+
+class OlapResultCache:
+    """
+    Cache of query results
+
+    Key is SQL, bind parameters and data version of every table in query. When aggregate is refreshed, call
+    self.invalidate_table() or set new data version with self.set_data_version(), and cached results of old data are
+    not used. Data versions are kept in backend, so they are shared by all processes using the same backend storage
+
+    Keys of results saved by this object are indexed by table, so results of old data version are deleted without
+    reading of backend. Results saved by other processes are not in index, they are not found because of new data
+    version and are evicted by backend
+    """
+
+    def __init__(self, backend: OlapResultCacheBackend, ttl: float | None = None) -> None:
+        """
+        :param backend: OlapMemoryResultCacheBackend, OlapDiskResultCacheBackend or your own backend
+        :param ttl: seconds to keep result. Results are kept until eviction or invalidation if None
+        """
+        self.backend = backend
+        self.ttl = ttl
+
+        # {table_name: {key, ...}}. Keys of results saved with self.set()
+        self.__table_keys: dict[str, set[str]] = {}
+        # {key: {table_name, ...}}
+        self.__key_tables: dict[str, set[str]] = {}
+        self.__lock: threading.Lock = threading.Lock()
+
+        self.__statistics: dict = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "invalidations": 0,
+        }
+
+    def set_data_version(self, table_name: str, data_version: str) -> None:
+        """
+        Sets data version of table, e.g. time of last load of aggregate. Results of old data version are removed
+        :param table_name: table name in style of db.schema.table
+        :param data_version: any string
+        :return:
+        """
+        current_version: tuple[str, str] = self.backend.get_data_version(table_name) or ("", "")
+
+        if current_version[0] == str(data_version):
+            return
+
+        self.backend.set_data_version(table_name, (str(data_version), current_version[1]))
+
+        self.__delete_table_keys(table_name)
+
+    def get_data_version(self, table_name: str) -> str:
+        return "{}:{}".format(*(self.backend.get_data_version(table_name) or ("", "")))
+
+    def get_key(self, sql: str, params: list | None, tables: list[str]) -> str:
+        """
+        Creates cache key
+        :param sql: SQL
+        :param params: bind parameters
+        :param tables: tables used in query
+        :return: sha256 hex digest
+        """
+        key_hash = hashlib.sha256()
+        key_hash.update(sql.encode("utf-8"))
+        key_hash.update(b"\x00")
+        key_hash.update(repr(list(params or [])).encode("utf-8"))
+
+        for table_name in sorted(set(tables)):
+            key_hash.update(b"\x00")
+            key_hash.update(f"{table_name}={self.get_data_version(table_name)}".encode("utf-8"))
+
+        return key_hash.hexdigest()
+
+    def get(self, sql: str, params: list | None, tables: list[str]):
+        """
+        Returns cached rows or None
+        :param sql: SQL
+        :param params: bind parameters
+        :param tables: tables used in query
+        :return:
+        """
+        key: str = self.get_key(sql, params, tables)
+        entry: dict | None = self.backend.get(key)
+
+        if (entry is not None) and (entry["expires_at"] is not None) and (entry["expires_at"] <= time.time()):
+            self.backend.delete(key)
+            entry = None
+            self.__add_statistics("expired")
+
+        if entry is None:
+            self.__add_statistics("misses")
+            with self.__lock:
+                self.__unindex_key(key)
+            return None
+
+        self.__add_statistics("hits")
+
+        return entry["rows"]
+
+    def set(self, sql: str, params: list | None, tables: list[str], rows, ttl: float | None = None) -> None:
+        """
+        Saves rows
+        :param sql: SQL
+        :param params: bind parameters
+        :param tables: tables used in query
+        :param rows: rows returned by database
+        :param ttl: seconds to keep rows. self.ttl is used if None
+        :return:
+        """
+        if ttl is None:
+            ttl = self.ttl
+
+        expires_at: float | None = None
+        if ttl is not None:
+            expires_at = time.time() + ttl
+
+        key: str = self.get_key(sql, params, tables)
+        self.backend.set(key, {"rows": rows, "tables": sorted(set(tables)), "expires_at": expires_at})
+
+        with self.__lock:
+            self.__key_tables[key] = set(tables)
+
+            for table_name in self.__key_tables[key]:
+                self.__table_keys.setdefault(table_name, set()).add(key)
+
+    def get_or_execute(self, sql: str, params: list | None, tables: list[str], execute: Callable,
+                       ttl: float | None = None):
+        """
+        Returns cached rows or executes query and caches its rows
+        :param sql: SQL
+        :param params: bind parameters
+        :param tables: tables used in query
+        :param execute: function(sql, params) that returns rows
+        :param ttl: seconds to keep rows. self.ttl is used if None
+        :return: rows
+        """
+        rows = self.get(sql, params, tables)
+
+        if rows is None:
+            rows = execute(sql, params)
+            self.set(sql, params, tables, rows, ttl)
+
+        return rows
+
+    def get_or_execute_select(self, select_collection: SelectCollection, table_name: str, execute: Callable,
+                              ttl: float | None = None):
+        """
+        Same as self.get_or_execute() for query from SelectCollection
+        :param select_collection: SelectCollection from OlapService
+        :param table_name: table of select_collection
+        :param execute: function(sql, params) that returns rows
+        :param ttl: seconds to keep rows. self.ttl is used if None
+        :return: rows
+        """
+        tables: list[str] = [table_name] + select_collection.get_joined_tables(table_name)
+
+        return self.get_or_execute(select_collection.get_sql(table_name), select_collection.get_params(table_name),
+                                   tables, execute, ttl)
+
+    def invalidate_table(self, table_name: str) -> None:
+        """
+        Removes results of queries with table. Changes data version of table
+        :param table_name: table name in style of db.schema.table
+        :return:
+        """
+        current_version: tuple[str, str] = self.backend.get_data_version(table_name) or ("", "")
+        # Random invalidation, so concurrent invalidations in different processes never produce the same version
+        self.backend.set_data_version(table_name, (current_version[0], uuid.uuid4().hex))
+
+        self.__delete_table_keys(table_name)
+
+    def __delete_table_keys(self, table_name: str) -> None:
+        """
+        Deletes results with table from index
+        :param table_name: table name in style of db.schema.table
+        :return:
+        """
+        with self.__lock:
+            keys: set[str] = set(self.__table_keys.get(table_name, set()))
+
+            for key in keys:
+                self.__unindex_key(key)
+
+        for key in keys:
+            self.backend.delete(key)
+            self.__add_statistics("invalidations")
+
+    def __unindex_key(self, key: str) -> None:
+        """
+        Removes key from index of all its tables. Should be called under self.__lock
+        :param key: cache key
+        :return:
+        """
+        for table_name in self.__key_tables.pop(key, set()):
+            self.__table_keys[table_name].discard(key)
+
+            if len(self.__table_keys[table_name]) == 0:
+                del self.__table_keys[table_name]
+
+    def clear(self) -> None:
+        """
+        Removes all results
+        :return:
+        """
+        self.backend.clear()
+
+        with self.__lock:
+            self.__table_keys.clear()
+            self.__key_tables.clear()
+
+    def __add_statistics(self, counter: str) -> None:
+        with self.__lock:
+            self.__statistics[counter] += 1
+
+    def get_statistics(self) -> dict:
+        """
+        Returns counters of cache
+        :return: {"hits": int, "misses": int, "expired": int, "invalidations": int}
+        """
+        with self.__lock:
+            return dict(self.__statistics)
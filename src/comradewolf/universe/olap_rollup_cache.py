@@ -0,0 +1,372 @@
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+from comradewolf.utils.enums_and_field_dicts import OlapCalculations
+from comradewolf.utils.olap_data_types import OlapFrontendToBackend, OlapTablesCollection
+from comradewolf.utils.utils import create_field_with_calculation
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# {calculation of request: calculation to merge rows of finer result}
+MERGEABLE_CALCULATIONS: dict[str, str] = {
+    OlapCalculations.SUM.value: OlapCalculations.SUM.value,
+    OlapCalculations.COUNT.value: OlapCalculations.SUM.value,
+    OlapCalculations.MIN.value: OlapCalculations.MIN.value,
+    OlapCalculations.MAX.value: OlapCalculations.MAX.value,
+}
+
+# Integers with absolute value from this limit do not fit into numpy.int64
+INT64_LIMIT: int = 2 ** 63
+
+
+class OlapRollupCache:
+    """
+    Cache of results of requests with calculations
+
+    Every result is saved with its grain: select fields (group by), calculations and where. Request with the same where,
+    fewer select fields and the same or fewer calculations is answered by aggregation of cached rows. Only sum, count,
+    min and max can be aggregated again. For other calculations self.get() returns None and query should be sent to
+    database
+
+    Rows are lists of dictionaries {alias: value}. Calculated fields have alias with calculation, e.g. "pcs__sum"
+    Aggregation uses numpy if it is installed
+    """
+
+    def __init__(self, max_size: int = 100, use_numpy: bool = True) -> None:
+        """
+        :param max_size: max number of results in cache
+        :param use_numpy: use numpy for aggregation if it is installed
+        """
+        self.max_size = max_size
+        self.use_numpy = use_numpy and (numpy is not None)
+
+        # {grain: (tables_collection, rows)}. Last item is the most recently used
+        self.__results: OrderedDict[tuple, tuple[OlapTablesCollection, list[dict]]] = OrderedDict()
+        self.__lock: threading.Lock = threading.Lock()
+
+        self.__statistics: dict = {
+            "hits": 0,
+            "rollups": 0,
+            "misses": 0,
+        }
+
+    @staticmethod
+    def get_grain(frontend_data: OlapFrontendToBackend) -> tuple | None:
+        """
+        Returns grain of request or None if request has no calculations
+        :param frontend_data: OlapFrontendToBackend
+        :return: (where, group_by, calculations)
+        """
+        if len(frontend_data.get_calculation()) == 0:
+            return None
+
+        where: list[tuple] = []
+
+        for where_field in frontend_data.get_where():
+            condition = where_field["condition"]
+
+            # Parameter markers have different indexes in different requests
+            if "params" in where_field:
+                condition = tuple(where_field["params"])
+            elif isinstance(condition, list):
+                condition = tuple(condition)
+
+            where.append((where_field["field_name"], where_field["where"].upper(), condition))
+
+        group_by: frozenset = frozenset(field["field_name"] for field in frontend_data.get_select())
+        calculations: frozenset = frozenset((field["field_name"], field["calculation"])
+                                            for field in frontend_data.get_calculation())
+
+        return frozenset(where), group_by, calculations
+
+    def put(self, frontend_data: OlapFrontendToBackend, tables_collection: OlapTablesCollection,
+            rows: list[dict]) -> None:
+        """
+        Saves rows of request
+        :param frontend_data: OlapFrontendToBackend
+        :param tables_collection: OlapTablesCollection of request
+        :param rows: rows of request
+        :return:
+        """
+        grain: tuple | None = self.get_grain(frontend_data)
+
+        if grain is None:
+            return
+
+        with self.__lock:
+            self.__results[grain] = (tables_collection, rows)
+            self.__results.move_to_end(grain)
+
+            while len(self.__results) > self.max_size:
+                self.__results.popitem(last=False)
+
+    def get(self, frontend_data: OlapFrontendToBackend, tables_collection: OlapTablesCollection) -> list[dict] | None:
+        """
+        Returns rows of request from cache or None
+        :param frontend_data: OlapFrontendToBackend
+        :param tables_collection: OlapTablesCollection of request
+        :return:
+        """
+        grain: tuple | None = self.get_grain(frontend_data)
+
+        if grain is None:
+            return None
+
+        where, group_by, calculations = grain
+
+        with self.__lock:
+            if (grain in self.__results) and (self.__results[grain][0] is tables_collection):
+                self.__results.move_to_end(grain)
+                self.__statistics["hits"] += 1
+                return self.__results[grain][1]
+
+            finer_rows: list[dict] | None = None
+
+            for (result_where, result_group_by, result_calculations), (result_tables_collection, rows) \
+                    in self.__results.items():
+                if (result_tables_collection is not tables_collection) or (result_where != where):
+                    continue
+
+                if not (group_by <= result_group_by) or not (calculations <= result_calculations):
+                    continue
+
+                if any(calculation not in MERGEABLE_CALCULATIONS for _, calculation in calculations):
+                    continue
+
+                # The smallest result is the cheapest to aggregate
+                if (finer_rows is None) or (len(rows) < len(finer_rows)):
+                    finer_rows = rows
+
+            if finer_rows is None:
+                self.__statistics["misses"] += 1
+                return None
+
+            self.__statistics["rollups"] += 1
+
+        return self.rollup(finer_rows, [field["field_name"] for field in frontend_data.get_select()],
+                           [(field["field_name"], field["calculation"]) for field in frontend_data.get_calculation()])
+
+    def get_or_execute(self, frontend_data: OlapFrontendToBackend, tables_collection: OlapTablesCollection,
+                       execute: Callable[[], list[dict]]) -> list[dict]:
+        """
+        Returns rows from cache or executes query and saves its rows
+        :param frontend_data: OlapFrontendToBackend
+        :param tables_collection: OlapTablesCollection of request
+        :param execute: function without arguments that returns rows of request from database
+        :return: rows
+        """
+        rows: list[dict] | None = self.get(frontend_data, tables_collection)
+
+        if rows is None:
+            rows = execute()
+            self.put(frontend_data, tables_collection, rows)
+
+        return rows
+
+    def rollup(self, rows: list[dict], group_by: list[str], calculations: list[tuple[str, str]]) -> list[dict]:
+        """
+        Aggregates rows by group_by fields
+        Without group_by fields one row is returned even for empty rows, as in SQL
+        :param rows: finer rows
+        :param group_by: aliases of select fields
+        :param calculations: [(alias, calculation), ...] with calculations from MERGEABLE_CALCULATIONS
+        :return: aggregated rows in order of first row of every group
+        """
+        if (len(rows) == 0) and (len(group_by) == 0):
+            return [{create_field_with_calculation(field_alias, calculation):
+                     0 if calculation == OlapCalculations.COUNT.value else None
+                     for field_alias, calculation in calculations}]
+
+        if self.use_numpy and (len(rows) > 0):
+            group_index, first_rows = self.__group_numpy(rows, group_by)
+        else:
+            group_index, first_rows = self.__group_python(rows, group_by)
+
+        aggregated_columns: dict[str, list] = {}
+
+        for field_alias, calculation in calculations:
+            column: str = create_field_with_calculation(field_alias, calculation)
+            values: list = [row[column] for row in rows]
+            merge_calculation: str = MERGEABLE_CALCULATIONS[calculation]
+
+            if self.use_numpy and self.__is_numpy_safe(values, merge_calculation):
+                aggregated_columns[column] = self.__aggregate_numpy(values, group_index, len(first_rows),
+                                                                    merge_calculation)
+            else:
+                aggregated_columns[column] = self.__aggregate_python(values, group_index, len(first_rows),
+                                                                     merge_calculation)
+
+        result: list[dict] = []
+
+        for group_number, row_number in enumerate(first_rows):
+            result_row: dict = {field: rows[row_number][field] for field in group_by}
+
+            for column in aggregated_columns:
+                result_row[column] = aggregated_columns[column][group_number]
+
+            result.append(result_row)
+
+        return result
+
+    @staticmethod
+    def __group_python(rows: list[dict], group_by: list[str]) -> tuple[list[int], list[int]]:
+        """
+        Numbers groups in order of their first row
+        :param rows: finer rows
+        :param group_by: aliases of select fields
+        :return: group number of every row, number of first row of every group
+        """
+        # {group_by values: group number}
+        groups: dict[tuple, int] = {}
+        group_index: list[int] = []
+        first_rows: list[int] = []
+
+        for row_number, row in enumerate(rows):
+            group_number: int = groups.setdefault(tuple(row[field] for field in group_by), len(groups))
+
+            if group_number == len(first_rows):
+                first_rows.append(row_number)
+
+            group_index.append(group_number)
+
+        return group_index, first_rows
+
+    @classmethod
+    def __group_numpy(cls, rows: list[dict], group_by: list[str]) -> tuple[list[int], list[int]]:
+        """
+        Same as self.__group_python() with numpy.unique()
+        Columns with NULL values or values of different types are numbered in python
+        :param rows: finer rows
+        :param group_by: aliases of select fields
+        :return: group number of every row, number of first row of every group
+        """
+        column_codes: list = [numpy.zeros(len(rows), dtype=numpy.int64)]
+
+        for field in group_by:
+            values: list = [row[field] for row in rows]
+            value_types: set = {type(value) for value in values}
+
+            if (len(value_types) == 1) and (value_types.pop() in (int, float, str)):
+                values_array = numpy.asarray(values)
+
+                if values_array.dtype != object:
+                    column_codes.append(numpy.unique(values_array, return_inverse=True)[1].reshape(-1))
+                    continue
+
+            column_codes.append(numpy.asarray(cls.__group_python(rows, [field])[0], dtype=numpy.int64))
+
+        _, first_rows, inverse = numpy.unique(numpy.stack(column_codes, axis=1), axis=0, return_index=True,
+                                              return_inverse=True)
+
+        # numpy.unique() sorts groups, groups are renumbered in order of their first row
+        order = numpy.argsort(first_rows)
+        group_numbers = numpy.empty(len(order), dtype=numpy.int64)
+        group_numbers[order] = numpy.arange(len(order))
+
+        return group_numbers[inverse.reshape(-1)].tolist(), first_rows[order].tolist()
+
+    @staticmethod
+    def __is_numpy_safe(values: list, calculation: str) -> bool:
+        """
+        Checks if values can be aggregated with numpy: all values are numbers and integer result can not overflow
+        int64. Python int has no limit, so other values are aggregated in python
+        :param values: values of column
+        :param calculation: sum, min or max
+        :return:
+        """
+        if (len(values) == 0) or \
+                not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+            return False
+
+        integers: list[int] = [value for value in values if isinstance(value, int)]
+
+        if len(integers) == 0:
+            return True
+
+        limit: int = max(-min(integers), max(integers))
+
+        if calculation == OlapCalculations.SUM.value:
+            limit *= len(integers)
+
+        return limit < INT64_LIMIT
+
+    @staticmethod
+    def __aggregate_numpy(values: list, group_index: list[int], groups_no: int, calculation: str) -> list:
+        """
+        Aggregates numeric values by groups with numpy
+        Use only for values checked with self.__is_numpy_safe()
+        :param values: values of column
+        :param group_index: group number of every value
+        :param groups_no: number of groups
+        :param calculation: sum, min or max
+        :return: value of every group
+        """
+        values_array = numpy.asarray(values)
+        index_array = numpy.asarray(group_index, dtype=numpy.int64)
+
+        if calculation == OlapCalculations.SUM.value:
+            aggregated = numpy.zeros(groups_no, dtype=values_array.dtype)
+            numpy.add.at(aggregated, index_array, values_array)
+            return aggregated.tolist()
+
+        # Start with the first value of every group
+        aggregated = numpy.empty(groups_no, dtype=values_array.dtype)
+        aggregated[index_array[::-1]] = values_array[::-1]
+
+        if calculation == OlapCalculations.MIN.value:
+            numpy.minimum.at(aggregated, index_array, values_array)
+        else:
+            numpy.maximum.at(aggregated, index_array, values_array)
+
+        return aggregated.tolist()
+
+    @staticmethod
+    def __aggregate_python(values: list, group_index: list[int], groups_no: int, calculation: str) -> list:
+        """
+        Aggregates values by groups. NULL values are skipped as in SQL
+        :param values: values of column
+        :param group_index: group number of every value
+        :param groups_no: number of groups
+        :param calculation: sum, min or max
+        :return: value of every group
+        """
+        aggregated: list = [None] * groups_no
+
+        for value, group_number in zip(values, group_index):
+            if value is None:
+                continue
+
+            current = aggregated[group_number]
+
+            if current is None:
+                aggregated[group_number] = value
+            elif calculation == OlapCalculations.SUM.value:
+                aggregated[group_number] = current + value
+            elif calculation == OlapCalculations.MIN.value:
+                aggregated[group_number] = min(current, value)
+            else:
+                aggregated[group_number] = max(current, value)
+
+        return aggregated
+
+    def invalidate(self) -> None:
+        """
+        Removes all results
+        :return:
+        """
+        with self.__lock:
+            self.__results.clear()
+
+    def get_statistics(self) -> dict:
+        """
+        Returns counters of cache
+        :return: {"hits": int, "rollups": int, "misses": int, "size": int}
+        """
+        with self.__lock:
+            statistics: dict = dict(self.__statistics)
+            statistics["size"] = len(self.__results)
+            return statistics
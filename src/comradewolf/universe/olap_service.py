@@ -1,10 +1,13 @@
 from select import select
 
-from comradewolf.universe.olap_language_select_builders import OlapSelectBuilder
+from comradewolf.universe.olap_aggregate_navigator import OlapAggregateNavigator
+from comradewolf.universe.olap_language_select_builders import OlapSelectBuilder, GROUPING_COLUMN
+from comradewolf.universe.olap_plan_cache import OlapPlanCache
 from comradewolf.utils.enums_and_field_dicts import OlapCalculations, OlapFollowingCalculations, FilterTypes
 from comradewolf.utils.exceptions import OlapException
 from comradewolf.utils.olap_data_types import OlapFrontendToBackend, OlapTablesCollection, \
-    ShortTablesCollectionForSelect, TableForFilter, SelectFilter, OlapFilterFrontend, SelectCollection
+    ShortTablesCollectionForSelect, TableForFilter, SelectFilter, OlapFilterFrontend, SelectCollection, \
+    MergedSelectCollection, OlapTableStatistics, DEFAULT_FILTER_PAGE_SIZE
 from comradewolf.utils.utils import create_field_with_calculation
 
 NO_FACT_TABLES = "No fact tables"
@@ -16,8 +19,13 @@ class OlapService:
     Receives data from frontend and returns SQL-script
     """
 
-    def __init__(self, olap_select_builder: OlapSelectBuilder):
+    def __init__(self, olap_select_builder: OlapSelectBuilder, plan_cache: OlapPlanCache | None = None):
+        """
+        :param olap_select_builder: OlapSelectBuilder for SQL dialect
+        :param plan_cache: OlapPlanCache for self.select_data(). Plans are not cached if None
+        """
         self.olap_select_builder = olap_select_builder
+        self.plan_cache = plan_cache
 
     @staticmethod
     def fact_table_in_query(frontend_fields: OlapFrontendToBackend, tables_collection: OlapTablesCollection) -> bool:
@@ -28,24 +36,16 @@ class OlapService:
         :return:
         """
 
-        all_fact_fields: list[str] = []
-
-        fact_tables = tables_collection.get_fact_tables_collection()
-
-        for fact_table in fact_tables:
-            for field in fact_tables[fact_table]["fields"]:
-                all_fact_fields.append(field)
-
         for field in frontend_fields.get_select():
-            if field["field_name"] in all_fact_fields:
+            if tables_collection.get_data_tables_with_field(field["field_name"]) is not None:
                 return True
 
         for field in frontend_fields.get_calculation():
-            if field["field_name"] in all_fact_fields:
+            if tables_collection.get_data_tables_with_field(field["field_name"]) is not None:
                 return True
 
         for field in frontend_fields.get_where():
-            if field["field_name"] in all_fact_fields:
+            if tables_collection.get_data_tables_with_field(field["field_name"]) is not None:
                 return True
 
         return False
@@ -69,8 +69,10 @@ class OlapService:
 
         short_tables_collection: ShortTablesCollectionForSelect = ShortTablesCollectionForSelect()
 
-        # Filling ShortTablesCollectionForSelect with data
-        short_tables_collection.generate_complete_structure(tables_collection.get_fact_tables_collection())
+        # Filling ShortTablesCollectionForSelect with data only for tables that can satisfy query
+        short_tables_collection.generate_complete_structure(tables_collection.get_fact_tables_collection(),
+                                                            self.get_candidate_data_tables(frontend_fields,
+                                                                                           tables_collection))
 
         # Exclude tables than don't have necessary fields and rebuild structure
         short_tables_collection = \
@@ -88,6 +90,48 @@ class OlapService:
 
         return short_tables_collection
 
+    @staticmethod
+    def get_candidate_data_tables(frontend_fields: OlapFrontendToBackend, tables_collection: OlapTablesCollection) \
+            -> list[str]:
+        """
+        Fast pre-filter of fact tables with bitmasks from OlapTablesCollection
+        Table is a candidate if every field could be found in it directly or through service key of dimension table
+        Final decision is still made in add_*_to_short_tables_collection
+        :param frontend_fields: OlapFrontendToBackend
+        :param tables_collection: OlapTablesCollection
+        :return: list of fact table names
+        """
+        candidates: int = tables_collection.get_all_data_tables_mask()
+
+        for front_field_dict in frontend_fields.get_select() + frontend_fields.get_where():
+            current_field: str = front_field_dict["field_name"]
+
+            field_mask: int = tables_collection.get_data_tables_mask(current_field)
+
+            dimension_table_and_service_key: list | None = \
+                tables_collection.get_dimension_table_with_field(current_field)
+
+            if dimension_table_and_service_key is not None:
+                field_mask |= tables_collection.get_data_tables_mask(dimension_table_and_service_key[1])
+
+            candidates &= field_mask
+
+        for calculation_field in frontend_fields.get_calculation():
+            current_field: str = calculation_field["field_name"]
+
+            dimension_table_and_service_key: list | None = \
+                tables_collection.get_dimension_table_with_field(current_field)
+
+            # Dimension field can only be calculated through service key
+            if dimension_table_and_service_key is not None:
+                candidates &= tables_collection.get_data_tables_mask(dimension_table_and_service_key[1])
+                continue
+
+            candidates &= tables_collection.get_data_tables_mask(current_field) | \
+                tables_collection.get_data_tables_mask(current_field, calculation_field["calculation"])
+
+        return tables_collection.get_data_table_names_by_mask(candidates)
+
     def add_calculation_fields_to_short_tables_collection(self, short_tables_collection: ShortTablesCollectionForSelect,
                                                           calculations: list,
                                                           tables_collection: OlapTablesCollection) \
@@ -412,7 +456,7 @@ class OlapService:
                                                            has_calculation, table, order_by, not_selected_fields_no,
                                                            add_order_by)
 
-            temp_structure.add_table(table, sql, not_selected_fields_no, has_group_by)
+            temp_structure.add_table(table, sql, not_selected_fields_no, has_group_by, list(joins.keys()))
 
         return temp_structure
 
@@ -528,13 +572,16 @@ class OlapService:
             return data_tables
 
     @staticmethod
-    def get_tables_for_filter(alias_field_name: str, tables: list[str], tables_collection: OlapTablesCollection) \
-            -> list[TableForFilter]:
+    def get_tables_for_filter(alias_field_name: str, tables: list[str], tables_collection: OlapTablesCollection,
+                              aggregate_navigator: OlapAggregateNavigator | None = None) -> list[TableForFilter]:
         """
-
+        Returns tables to select filter values from. Fact tables are ordered from the smallest to the biggest one by
+        size estimate of aggregate_navigator. Tables without statistics go last and are ordered by number of fields
         :param tables_collection:
         :param alias_field_name:
         :param tables:
+        :param aggregate_navigator: OlapAggregateNavigator with statistics of tables_collection. Tables are ordered
+        only by number of fields if None
         :return:
         """
 
@@ -542,31 +589,43 @@ class OlapService:
 
         for table in tables:
             is_distinct: bool = False
+            size_estimate: float | None = None
+
+            if aggregate_navigator is not None:
+                size_estimate = aggregate_navigator.get_table_cost(table)
 
             if table in tables_collection.get_dimension_table_names():
                 is_distinct = True
-                return [TableForFilter(table, alias_field_name, is_distinct, 0)]
+                return [TableForFilter(table, alias_field_name, is_distinct, 0, size_estimate)]
 
             if tables_collection.get_data_table_calculation(table, alias_field_name) == \
                     OlapCalculations.DISTINCT.value:
                 is_distinct = True
-                return [TableForFilter(table, alias_field_name, is_distinct, 0)]
+                return [TableForFilter(table, alias_field_name, is_distinct, 0, size_estimate)]
 
             if tables_collection.get_data_table_calculation(table, alias_field_name) is None:
                 tables_filter.append(TableForFilter(table, alias_field_name, is_distinct,
-                                                    tables_collection.get_number_of_fields(table)))
+                                                    tables_collection.get_number_of_fields(table), size_estimate))
+
+        tables_filter.sort(key=lambda table_for_filter: (table_for_filter.get_size_estimate() is None,
+                                                         table_for_filter.get_size_estimate() or 0.0,
+                                                         table_for_filter.get_number_of_fields(),
+                                                         table_for_filter.get_table_name()))
 
         return tables_filter
 
     def generate_filter_select(self, tables: list[TableForFilter], field_alias: str, select_type: str,
-                               tables_collection: OlapTablesCollection, limit: int | None = None) -> SelectFilter:
+                               tables_collection: OlapTablesCollection, limit: int | None = None,
+                               prefix: str | None = None, after: str | None = None) -> SelectFilter:
         """
         Generates select for frontend filters
-        :param limit:
+        :param limit: limits results if needed. Page size for prefix filter
         :param tables_collection:
         :param tables:
         :param field_alias:
         :param select_type:
+        :param prefix: search prefix for prefix filter
+        :param after: last value of previous page for prefix filter
         :return:
         """
 
@@ -579,21 +638,83 @@ class OlapService:
 
             backend_field = tables_collection.get_backend_field_name(table_name, field_alias)
 
-            select_statement: str
+            select_statement, params = self.__generate_filter_statement(backend_field, table_name, select_type, limit,
+                                                                        prefix, after, [])
+
+            sql, params = self.__bind_sql(select_statement, params)
+
+            select_filter.add_table(table_name, sql, number_of_fields, params, table.get_size_estimate())
+
+
+        return select_filter
+
+    def __generate_filter_statement(self, backend_field: str, table_name: str, select_type: str, limit: int | None,
+                                    prefix: str | None, after: str | None, params: list) -> tuple[str, list]:
+        """
+        Generates select for frontend filter of one table
+        :param backend_field: field name
+        :param table_name: table name or subquery for FROM
+        :param select_type: FilterTypes
+        :param limit: limits results if needed. Page size for prefix filter
+        :param prefix: search prefix for prefix filter
+        :param after: last value of previous page for prefix filter
+        :param params: parameters of table_name subquery
+        :return: select statement with parameter markers and all parameters
+        """
+        if select_type == FilterTypes.ALL.value:
+            return self.olap_select_builder.get_select_fiter_all(backend_field, table_name, limit), params
+
+        if select_type == FilterTypes.MAX_MIN.value:
+            return self.olap_select_builder.get_select_fiter_max_min(backend_field, table_name), params
+
+        if select_type == FilterTypes.PREFIX.value:
+            sql, prefix_params = self.olap_select_builder.get_select_fiter_prefix(
+                backend_field, table_name, prefix or "", limit or DEFAULT_FILTER_PAGE_SIZE, after, len(params))
+            return sql, params + prefix_params
+
+        raise OlapException(f"Wrong type of select_type: {select_type}")
+
+    def generate_cascading_filter_select(self, frontend_data: OlapFilterFrontend,
+                                         tables_collection: OlapTablesCollection,
+                                         aggregate_navigator: OlapAggregateNavigator | None = None) -> SelectFilter:
+        """
+        Generates select for frontend filter restricted by where of frontend_data
+        Tables are chosen as in self.select_data() for request with filter field in select and where of frontend_data,
+        and its query is used in FROM of filter select. Where of filter field itself is not used, so user can see other
+        values of this field
+        :param frontend_data: OlapFilterFrontend with where
+        :param tables_collection: OlapTablesCollection from OlapStructureGenerator
+        :param aggregate_navigator: OlapAggregateNavigator to estimate size of queries. No estimates if None
+        :return: selects in form of SelectFilter.class
+        """
+        field_alias: str = frontend_data.get_field_alias_name()
 
-            if select_type == FilterTypes.ALL.value:
-                select_statement = self.olap_select_builder.get_select_fiter_all(backend_field, table_name, limit)
-            elif select_type == FilterTypes.MAX_MIN.value:
-                select_statement = self.olap_select_builder.get_select_fiter_max_min(backend_field, table_name)
-            else:
-                raise OlapException(f"Wrong type of select_type: {select_type}")
+        request: OlapFrontendToBackend = OlapFrontendToBackend()
+        request.add_select([{"field_name": field_alias}])
+        # Select generation changes where fields, so they are copied
+        request.add_where([dict(where_field) for where_field in frontend_data.get_where()
+                           if where_field["field_name"] != field_alias])
+        request.add_params(frontend_data.get_params())
 
+        select_collection: SelectCollection = self.__select_data_with_markers(request, tables_collection, False)
 
+        select_filter: SelectFilter = SelectFilter()
 
-            sql = select_statement
+        for table_name in select_collection:
+            select_statement, params = self.__generate_filter_statement(
+                f'"{field_alias}"', self.olap_select_builder.get_filter_subquery(select_collection.get_sql(table_name)),
+                frontend_data.get_select_type(), frontend_data.get_page_size(), frontend_data.get_prefix(),
+                frontend_data.get_after(), list(request.get_params()))
 
-            select_filter.add_table(table_name, sql, number_of_fields)
+            sql, params = self.__bind_sql(select_statement, params)
 
+            size_estimate: float | None = None
+
+            if aggregate_navigator is not None:
+                size_estimate = aggregate_navigator.get_query_cost(select_collection, table_name)
+
+            select_filter.add_table(table_name, sql, select_collection.get_not_selected_fields_no(table_name), params,
+                                    size_estimate)
 
         return select_filter
 
@@ -619,6 +740,238 @@ class OlapService:
         :param add_order_by: add order by to fact query or not
         :return: selects in form of SelectCollection.class
         """
+        select_collection: SelectCollection = self.__select_data_with_markers(frontend_data, tables_collection,
+                                                                             add_order_by)
+
+        if self.olap_select_builder.parameterized:
+            select_collection = self.bind_parameters(select_collection, frontend_data.get_params())
+
+        return select_collection
+
+    def __select_data_with_markers(self, frontend_data: OlapFrontendToBackend, tables_collection: OlapTablesCollection,
+                                   add_order_by: bool) -> SelectCollection:
+        """
+        Same as self.select_data(), but parameter markers are not replaced with bind placeholders
+        :param frontend_data: OlapFrontendToBackend
+        :param tables_collection: OlapTablesCollection from OlapStructureGenerator
+        :param add_order_by: add order by to fact query or not
+        :return: selects in form of SelectCollection.class
+        """
+        if self.plan_cache is None:
+            return self.generate_select_collection(frontend_data, tables_collection, add_order_by)
+
+        key: tuple = self.plan_cache.get_key(frontend_data, tables_collection, add_order_by)
+        plan: dict = self.__get_plan(key, frontend_data, tables_collection, add_order_by, self.plan_cache)
+
+        return self.plan_cache.bind(plan, frontend_data)
+
+    def select_data_many(self, frontend_data_list: list[OlapFrontendToBackend],
+                         tables_collection: OlapTablesCollection, add_order_by: bool = False) -> list[SelectCollection]:
+        """
+        Same as self.select_data() for many requests, e.g. for all widgets of dashboard. Every result is the same as
+        self.select_data() of this request
+        Requests that are equal are generated once. If service has plan cache, requests with the same shape (see
+        OlapPlanCache) are planned once, other requests of batch only put their where conditions into this plan.
+        Without plan cache only equal requests are shared
+        :param frontend_data_list: list of OlapFrontendToBackend
+        :param tables_collection: OlapTablesCollection from OlapStructureGenerator
+        :param add_order_by: add order by to fact query or not
+        :return: list of SelectCollection in order of frontend_data_list
+        """
+        # {key: plan}. Plan cache can evict plan while batch is not finished
+        batch_plans: dict[tuple, dict] = {}
+        select_collections: list[SelectCollection] = []
+
+        for frontend_data in frontend_data_list:
+            key: tuple = OlapPlanCache.get_key(frontend_data, tables_collection, add_order_by)
+
+            if self.plan_cache is None:
+                # Without plan cache plan has no placeholders, so it is shared only by equal requests
+                key = key + (repr(frontend_data.get_where()),)
+
+                if key not in batch_plans:
+                    batch_plans[key] = OlapPlanCache.create_plan(
+                        self.generate_select_collection(frontend_data, tables_collection, add_order_by))
+
+            elif key not in batch_plans:
+                batch_plans[key] = self.__get_plan(key, frontend_data, tables_collection, add_order_by,
+                                                   self.plan_cache)
+
+            select_collection: SelectCollection = OlapPlanCache.bind(batch_plans[key], frontend_data)
+
+            if self.olap_select_builder.parameterized:
+                select_collection = self.bind_parameters(select_collection, frontend_data.get_params())
+
+            select_collections.append(select_collection)
+
+        return select_collections
+
+    def select_data_grouping_sets(self, frontend_data_list: list[OlapFrontendToBackend],
+                                  tables_collection: OlapTablesCollection,
+                                  aggregate_navigator: OlapAggregateNavigator | None = None) -> MergedSelectCollection:
+        """
+        Creates queries for many requests. Every request gets the cheapest table. Requests with calculations on the
+        same table with the same joins and where are merged into one query with GROUP BY GROUPING SETS
+        Use MergedSelectCollection.demultiplex() to get rows of every request
+        :param frontend_data_list: list of OlapFrontendToBackend
+        :param tables_collection: OlapTablesCollection from OlapStructureGenerator
+        :param aggregate_navigator: OlapAggregateNavigator to choose table. Table with the least number of not selected
+        fields is chosen if None
+        :return: MergedSelectCollection
+        """
+        if aggregate_navigator is None:
+            aggregate_navigator = OlapAggregateNavigator(OlapTableStatistics())
+
+        # {(table_name, joins, where): {"aliases": {alias: select_item}, "requests": [request, ...]}}
+        merge_groups: dict[tuple, dict] = {}
+        # [request_index, table_name, sql, params, fields]
+        single_requests: list[tuple[int, str, str, list, list[str] | None]] = []
+
+        for request_index, frontend_data in enumerate(frontend_data_list):
+
+            if not self.fact_table_in_query(frontend_data, tables_collection):
+                select_collection: SelectCollection = self.select_data(frontend_data, tables_collection)
+                table_name: str = list(select_collection.keys())[0]
+                single_requests.append((request_index, table_name, select_collection.get_sql(table_name),
+                                        select_collection.get_params(table_name), None))
+                continue
+
+            short_tables_collection: ShortTablesCollectionForSelect = \
+                self.generate_pre_select_collection(frontend_data, tables_collection)
+
+            if len(short_tables_collection) == 0:
+                raise OlapException(NO_FACT_TABLES)
+
+            select_collection: SelectCollection = self.generate_selects_from_collection(short_tables_collection,
+                                                                                        False)
+            table_name: str = aggregate_navigator.get_best_table(select_collection)
+
+            select_list, select_for_group_by, joins, where, _, has_calculation = self \
+                .generate_structure_for_each_piece_of_join(short_tables_collection, table_name)
+
+            fields: list[str] = [select_item.rsplit(" as ", 1)[1].strip('"') for select_item in select_list]
+            sql, params = self.__bind_sql(select_collection.get_sql(table_name), frontend_data.get_params())
+
+            if not has_calculation:
+                single_requests.append((request_index, table_name, sql, params, fields))
+                continue
+
+            bound_where: list[tuple[str, tuple]] = []
+            for where_item in where:
+                where_sql, where_params = self.__bind_sql(where_item, frontend_data.get_params())
+                bound_where.append((where_sql, tuple(where_params)))
+
+            key: tuple = (table_name, tuple(sorted(joins.items())), tuple(sorted(bound_where)))
+
+            merge_group: dict = merge_groups.setdefault(key, {"aliases": {}, "requests": []})
+
+            # The same alias with other expression can not be in one query
+            if any(merge_group["aliases"].get(field, select_item) != select_item
+                   for field, select_item in zip(fields, select_list)):
+                single_requests.append((request_index, table_name, sql, params, fields))
+                continue
+
+            merge_group["aliases"].update(zip(fields, select_list))
+            merge_group["requests"].append((request_index, select_list, select_for_group_by, joins, where, sql,
+                                            params, fields))
+
+        merged_select_collection: MergedSelectCollection = MergedSelectCollection()
+        # {request_index: (query_index, grouping_id, fields)}
+        requests: dict[int, tuple[int, int | None, list[str] | None]] = {}
+
+        for request_index, table_name, sql, params, fields in single_requests:
+            requests[request_index] = (merged_select_collection.add_query(table_name, sql, params), None, fields)
+
+        for (table_name, _, _), merge_group in merge_groups.items():
+            group_requests: list = merge_group["requests"]
+
+            if len(group_requests) == 1:
+                request_index, _, _, _, _, sql, params, fields = group_requests[0]
+                requests[request_index] = (merged_select_collection.add_query(table_name, sql, params), None, fields)
+                continue
+
+            _, _, _, joins, where, _, _, _ = group_requests[0]
+
+            sql, grouping_ids = self.olap_select_builder \
+                .generate_grouping_sets_query(table_name, joins, where,
+                                              [group_request[1] for group_request in group_requests],
+                                              [group_request[2] for group_request in group_requests])
+
+            # Where of the first request is used, all requests of group have the same bound where
+            sql, params = self.__bind_sql(sql, frontend_data_list[group_requests[0][0]].get_params())
+
+            grouping_column: str | None = GROUPING_COLUMN if grouping_ids[0] is not None else None
+            query_index: int = merged_select_collection.add_query(table_name, sql, params, grouping_column)
+
+            for group_request, grouping_id in zip(group_requests, grouping_ids):
+                requests[group_request[0]] = (query_index, grouping_id, group_request[7])
+
+        for request_index in range(len(frontend_data_list)):
+            merged_select_collection.add_request(*requests[request_index])
+
+        return merged_select_collection
+
+    def __bind_sql(self, sql: str, params: list) -> tuple[str, list]:
+        """
+        Replaces parameter markers if OlapSelectBuilder is parameterized
+        :param sql: SQL with parameter markers
+        :param params: all parameters of request
+        :return: SQL and parameters in order of placeholders
+        """
+        if not self.olap_select_builder.parameterized:
+            return sql, []
+
+        return self.olap_select_builder.bind_parameters(sql, params)
+
+    def __get_plan(self, key: tuple, frontend_data: OlapFrontendToBackend, tables_collection: OlapTablesCollection,
+                   add_order_by: bool, plan_cache: OlapPlanCache) -> dict:
+        """
+        Returns plan from plan_cache. Creates plan and puts it into plan_cache if there is no plan
+        :param key: key from plan_cache.get_key()
+        :param frontend_data: OlapFrontendToBackend
+        :param tables_collection: OlapTablesCollection from OlapStructureGenerator
+        :param add_order_by: add order by to fact query or not
+        :param plan_cache: OlapPlanCache
+        :return: plan
+        """
+        plan: dict | None = plan_cache.get(key, tables_collection)
+
+        if plan is None:
+            template_request: OlapFrontendToBackend = plan_cache.create_template_request(frontend_data)
+            plan = plan_cache.create_plan(self.generate_select_collection(template_request, tables_collection,
+                                                                          add_order_by))
+            plan_cache.put(key, tables_collection, plan)
+
+        return plan
+
+    def bind_parameters(self, select_collection: SelectCollection, params: list) -> SelectCollection:
+        """
+        Replaces parameter markers in SQL with bind placeholders of OlapSelectBuilder
+        :param select_collection: SelectCollection with parameter markers in SQL
+        :param params: all parameters of request from OlapFrontendToBackend.get_params()
+        :return: SelectCollection with parameters of every query
+        """
+        bound_select_collection: SelectCollection = SelectCollection()
+
+        for table_name in select_collection:
+            sql, table_params = self.olap_select_builder.bind_parameters(select_collection.get_sql(table_name),
+                                                                         params)
+
+            bound_select_collection.add_table(table_name, sql, select_collection.get_not_selected_fields_no(table_name),
+                                              select_collection.get_has_group_by(table_name),
+                                              select_collection.get_joined_tables(table_name), table_params)
+
+        return bound_select_collection
+
+    def generate_select_collection(self, frontend_data: OlapFrontendToBackend, tables_collection: OlapTablesCollection,
+                                   add_order_by: bool = False) -> SelectCollection:
+        """
+        Same as self.select_data(), but without plan cache
+        :param frontend_data: OlapFilterFrontend with data from frontend
+        :param tables_collection: OlapTablesCollection from OlapStructureGenerator
+        :param add_order_by: add order by to fact query or not
+        :return: selects in form of SelectCollection.class
+        """
         has_fact_table: bool = self.fact_table_in_query(frontend_data, tables_collection)
 
         if has_fact_table:
@@ -636,20 +989,47 @@ class OlapService:
 
 
 
-    def select_filter_for_frontend(self, frontend_data: OlapFilterFrontend, tables_collection: OlapTablesCollection) \
-            -> SelectFilter:
+    def select_best_data(self, frontend_data: OlapFrontendToBackend, tables_collection: OlapTablesCollection,
+                         aggregate_navigator: OlapAggregateNavigator, add_order_by: bool = False) -> SelectCollection:
+        """
+        Same as self.select_data(), but returns only the cheapest query picked by aggregate_navigator
+        :param frontend_data: OlapFilterFrontend with data from frontend
+        :param tables_collection: OlapTablesCollection from OlapStructureGenerator
+        :param aggregate_navigator: OlapAggregateNavigator with statistics of tables_collection
+        :param add_order_by: add order by to fact query or not
+        :return: selects in form of SelectCollection.class with one table
+        """
+        select_collection: SelectCollection = self.select_data(frontend_data, tables_collection, add_order_by)
+
+        if len(select_collection) == 0:
+            raise OlapException(NO_FACT_TABLES)
+
+        return aggregate_navigator.get_best_select(select_collection)
+
+    def select_filter_for_frontend(self, frontend_data: OlapFilterFrontend, tables_collection: OlapTablesCollection,
+                                   aggregate_navigator: OlapAggregateNavigator | None = None) -> SelectFilter:
         """
         Starts all necessary functions to get select statement for frontend filters
+        Use SelectFilter.get_best_table() to get the smallest table
         :param frontend_data: OlapFilterFrontend with data from frontend
         :param tables_collection: OlapTablesCollection from OlapStructureGenerator
+        :param aggregate_navigator: OlapAggregateNavigator with statistics of tables_collection to estimate size of
+        tables. Tables are compared by number of fields if None
         :return: selects in form of SelectFilter.class
         """
+        if len(frontend_data.get_where()) > 0:
+            return self.generate_cascading_filter_select(frontend_data, tables_collection, aggregate_navigator)
+
         all_tables_with_field:  list[str] = self.get_tables_with_field(frontend_data.get_field_alias_name(),
                                                                        tables_collection)
         tables: list[TableForFilter] = self.get_tables_for_filter(frontend_data.get_field_alias_name(),
-                                                                  all_tables_with_field, tables_collection)
+                                                                  all_tables_with_field, tables_collection,
+                                                                  aggregate_navigator)
 
         select_filter: SelectFilter = self.generate_filter_select(tables, frontend_data.get_field_alias_name(),
-                                                                  frontend_data.get_select_type(), tables_collection)
+                                                                  frontend_data.get_select_type(), tables_collection,
+                                                                  frontend_data.get_page_size(),
+                                                                  frontend_data.get_prefix(),
+                                                                  frontend_data.get_after())
 
         return select_filter
@@ -0,0 +1,204 @@
+import os
+import time
+from typing import Callable
+
+import toml
+
+from comradewolf.universe.olap_structure_generator import OlapStructureGenerator
+from comradewolf.utils.olap_data_types import OlapTablesCollection, OlapTableStatistics
+
+ROW_COUNT_SQL = "SELECT COUNT(*) FROM {}"
+COLUMN_STATISTICS_SQL = "SELECT COUNT(DISTINCT {0}), MIN({0}), MAX({0}) FROM {1}"
+COLUMN_RANGE_SQL = "SELECT MIN({0}), MAX({0}) FROM {1}"
+SAMPLE_SQL = "SELECT {} FROM {} LIMIT {}"
+
+
+class OlapStatisticsCollector:
+    """
+    Collects table statistics for OlapTablesCollection through any DB-API 2.0 connection
+    Result is OlapTableStatistics that can be written to statistics.toml of OLAP structure folder
+
+    Collection is incremental: if previous statistics are given, only tables with row count changed more than
+    change_threshold since last full collection are sampled again. Row count, min and max values of other tables are
+    checked on every collection (checked_at), distinct counts and row width are taken from previous statistics
+    """
+
+    def __init__(self, connection, tables_collection: OlapTablesCollection, change_threshold: float = 0.1,
+                 sample_size: int = 1000, table_name_converter: Callable[[str], str] | None = None) -> None:
+        """
+        :param connection: DB-API 2.0 connection
+        :param tables_collection: OlapTablesCollection from OlapStructureGenerator
+        :param change_threshold: relative row count change to collect table again. 0.1 is 10%
+        :param sample_size: number of rows to estimate average row width
+        :param table_name_converter: converts db.schema.table to name used by connection.
+        For example, SQLite does not support database.schema.table
+        """
+        self.connection = connection
+        self.tables_collection = tables_collection
+        self.change_threshold = change_threshold
+        self.sample_size = sample_size
+
+        if table_name_converter is None:
+            table_name_converter = self.__same_table_name
+
+        self.table_name_converter = table_name_converter
+
+    @staticmethod
+    def __same_table_name(table_name: str) -> str:
+        return table_name
+
+    def collect(self, previous_statistics: OlapTableStatistics | None = None) -> OlapTableStatistics:
+        """
+        Collects statistics for all data and dimension tables
+        :param previous_statistics: statistics of previous collection
+        :return: OlapTableStatistics
+        """
+        table_statistics: OlapTableStatistics = OlapTableStatistics()
+
+        table_names: list[str] = self.tables_collection.get_data_table_names() + \
+            self.tables_collection.get_dimension_table_names()
+
+        for table_name in table_names:
+            row_count: int = self.get_row_count(table_name)
+
+            if (previous_statistics is not None) and \
+                    not self.is_changed(previous_statistics.get_collected_row_count(table_name), row_count):
+                self.check_table(table_statistics, previous_statistics, table_name, row_count)
+                continue
+
+            self.collect_table(table_statistics, table_name, row_count)
+
+        return table_statistics
+
+    def is_changed(self, previous_row_count: int | None, row_count: int) -> bool:
+        """
+        Checks if row count changed more than self.change_threshold
+        :param previous_row_count: row count from previous statistics or None
+        :param row_count: current row count
+        :return:
+        """
+        if previous_row_count is None:
+            return True
+
+        return abs(row_count - previous_row_count) > self.change_threshold * max(previous_row_count, 1)
+
+    def collect_table(self, table_statistics: OlapTableStatistics, table_name: str, row_count: int) -> None:
+        """
+        Collects statistics for one table and its columns
+        :param table_statistics: OlapTableStatistics to add table to
+        :param table_name: table name in style of db.schema.table
+        :param row_count: already known row count
+        :return:
+        """
+        field_names: list[str] = self.tables_collection.get_frontend_fields(table_name)
+        db_table_name: str = self.table_name_converter(table_name)
+
+        table_statistics.add_table(table_name, row_count, self.get_avg_row_width(db_table_name, field_names),
+                                   time.time())
+
+        for field_name in field_names:
+            ndv, min_value, max_value = self.__fetch_one(COLUMN_STATISTICS_SQL.format(field_name, db_table_name))
+            table_statistics.add_column(table_name, field_name, ndv, min_value, max_value)
+
+    def check_table(self, table_statistics: OlapTableStatistics, previous_statistics: OlapTableStatistics,
+                    table_name: str, row_count: int) -> None:
+        """
+        Updates row count, min and max values of table. Min and max are much cheaper than distinct count
+        Other statistics are taken from previous_statistics
+        :param table_statistics: OlapTableStatistics to add table to
+        :param previous_statistics: statistics of previous collection with table
+        :param table_name: table name in style of db.schema.table
+        :param row_count: already known row count
+        :return:
+        """
+        db_table_name: str = self.table_name_converter(table_name)
+
+        table_statistics.add_table(table_name, row_count, previous_statistics.get_avg_row_width(table_name),
+                                   previous_statistics.get_collected_at(table_name), time.time(),
+                                   previous_statistics.get_collected_row_count(table_name))
+
+        for field_name in self.tables_collection.get_frontend_fields(table_name):
+            min_value, max_value = self.__fetch_one(COLUMN_RANGE_SQL.format(field_name, db_table_name))
+            previous_column: dict | None = previous_statistics.get_column(table_name, field_name)
+            ndv: int | None = previous_column["ndv"] if previous_column is not None else None
+
+            table_statistics.add_column(table_name, field_name, ndv, min_value, max_value)
+
+    def get_row_count(self, table_name: str) -> int:
+        """
+        Returns row count of table
+        :param table_name: table name in style of db.schema.table
+        :return:
+        """
+        return self.__fetch_one(ROW_COUNT_SQL.format(self.table_name_converter(table_name)))[0]
+
+    def get_avg_row_width(self, db_table_name: str, field_names: list[str]) -> int | None:
+        """
+        Estimates average row width in bytes with sample of rows
+        Width of every value is width of its text representation
+        :param db_table_name: table name for connection
+        :param field_names: backend field names
+        :return: average width or None for empty table
+        """
+        cursor = self.connection.cursor()
+
+        try:
+            cursor.execute(SAMPLE_SQL.format(", ".join(field_names), db_table_name, self.sample_size))
+            rows: list = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        if len(rows) == 0:
+            return None
+
+        total_width: int = 0
+
+        for row in rows:
+            for value in row:
+                if value is not None:
+                    total_width += len(str(value).encode("utf-8"))
+
+        return round(total_width / len(rows))
+
+    def __fetch_one(self, sql: str) -> tuple:
+        """
+        Executes sql and returns first row
+        :param sql:
+        :return:
+        """
+        cursor = self.connection.cursor()
+
+        try:
+            cursor.execute(sql)
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def write_statistics(table_statistics: OlapTableStatistics, path_to_olap_structure: str) -> str:
+        """
+        Writes statistics to statistics.toml of OLAP structure folder
+        :param table_statistics: OlapTableStatistics
+        :param path_to_olap_structure: path to folder with toml structure
+        :return: path to statistics file
+        """
+        statistics_file_path: str = os.path.join(path_to_olap_structure, OlapStructureGenerator.STATISTICS_FILE_NAME)
+
+        with open(statistics_file_path, "w", encoding="utf-8") as statistics_file:
+            toml.dump(table_statistics.to_dict(), statistics_file)
+
+        return statistics_file_path
+
+    @staticmethod
+    def read_statistics(path_to_olap_structure: str) -> OlapTableStatistics | None:
+        """
+        Reads statistics from statistics.toml of OLAP structure folder
+        :param path_to_olap_structure: path to folder with toml structure
+        :return: OlapTableStatistics or None if there is no file
+        """
+        statistics_file_path: str = os.path.join(path_to_olap_structure, OlapStructureGenerator.STATISTICS_FILE_NAME)
+
+        if not os.path.isfile(statistics_file_path):
+            return None
+
+        return OlapTableStatistics.from_dict(toml.load(statistics_file_path))
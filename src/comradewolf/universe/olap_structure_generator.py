@@ -1,136 +1,474 @@
 import os
+import pickle
+import threading
+from typing import NamedTuple
 
 import toml
 
 from comradewolf.utils.enums_and_field_dicts import OlapFieldTypes, OlapCalculations
-from comradewolf.utils.olap_data_types import OlapTablesCollection, OlapDimensionTable, OlapDataTable, OlapFrontend
+from comradewolf.utils.exceptions import OlapCreationException
+from comradewolf.utils.olap_data_types import OlapTablesCollection, OlapDimensionTable, OlapDataTable, OlapFrontend, \
+    OlapTableStatistics
 from comradewolf.utils.utils import list_toml_files_in_directory, return_none_on_text, true_false_converter, \
-    return_bool_on_text
+    return_bool_on_text, map_in_processes, get_file_hash, combine_file_hashes
 
 
-class OlapStructureGenerator:
+def transform_calculation(following_calculation: str) -> str | None:
     """
-    Generates one structural environment for olap
+    Convert following_calculation to correct value
+    :param following_calculation:
+    :return:
     """
 
+    if following_calculation is None:
+        return None
+
+    if following_calculation.lower() == "none":
+        return None
+
+    possible_calculations: list[str] = [f.value for f in OlapCalculations]
+
+    if following_calculation.lower() not in possible_calculations:
+        raise ValueError(f"Invalid following_calculation: {following_calculation}")
+
+    return following_calculation.lower()
+
+
+def read_dimension_olap_table(dimension_file_path: str) -> OlapDimensionTable:
+    """
+    Import data from dimension toml file
+    Create OlapDimensionTable.class
+    :param dimension_file_path: link to dimension toml file
+    :return: OlapDimensionTable
+    """
+    dimension_from_toml: dict = toml.load(dimension_file_path)
+
+    table_name = "{}.{}.{}".format(dimension_from_toml["database"], dimension_from_toml["schema"],
+                                   dimension_from_toml["table"])
+
+    dimension_table: OlapDimensionTable = OlapDimensionTable(table_name)
+
+    for field in dimension_from_toml["fields"]:
+
+        use_sk_for_count: bool = False
+
+        if "use_sk_for_count" in dimension_from_toml["fields"][field]:
+            use_sk_for_count = return_bool_on_text(dimension_from_toml["fields"][field]["use_sk_for_count"])
+
+        dimension_table.add_field(field, dimension_from_toml["fields"][field]["field_type"],
+                                  return_none_on_text(dimension_from_toml["fields"][field]["alias"]),
+                                  dimension_from_toml["fields"][field]["data_type"],
+                                  return_none_on_text(dimension_from_toml["fields"][field]["front_name"]),
+                                  use_sk_for_count)
+
+    return dimension_table
+
+
+def read_data_olap_table(data_file_path: str) -> tuple[OlapDataTable, bool]:
+    """
+    Import data from data toml file
+    Create OlapDataTable.class
+    :param data_file_path: path to toml file with data table
+    :return: OlapDataTable and True if it is base table
+    """
+    data_from_toml: dict = toml.load(data_file_path)
+
+    table_name = "{}.{}.{}".format(data_from_toml["database"], data_from_toml["schema"],
+                                   data_from_toml["table"])
+
+    data_table: OlapDataTable = OlapDataTable(table_name)
+
+    for field in data_from_toml["fields"]:
+        data_table.add_field(field,
+                             return_none_on_text(data_from_toml["fields"][field]["alias"]),
+                             return_none_on_text(data_from_toml["fields"][field]["field_type"]),
+                             transform_calculation(data_from_toml["fields"][field]["calculation_type"]),
+                             transform_calculation(data_from_toml["fields"][field]["following_calculation"]),
+                             data_from_toml["fields"][field]["data_type"],
+                             return_none_on_text(data_from_toml["fields"][field]["front_name"])
+                             )
+
+    is_base_table: bool = False
+
+    if "base_table" in data_from_toml.keys():
+        if true_false_converter(data_from_toml["base_table"]) is True:
+            is_base_table = True
+
+    return data_table, is_base_table
+
+
+class OlapStructureState(NamedTuple):
+    """
+    Structure loaded by OlapStructureGenerator. Is replaced as a whole on reload, so all parts are always from the
+    same version of structure
+    """
     # Collection of all tables
     tables_collection: OlapTablesCollection
     # Main table
     main_data_table: OlapDataTable
     # List of fields to show on frontend
     frontend_fields: OlapFrontend
+    # Optional statistics of tables
+    table_statistics: OlapTableStatistics
+    # Increased on every reload with changes
+    structure_version: int
+
+
+class OlapStructureGenerator:
+    """
+    Generates one structural environment for olap
 
-    def __init__(self, path_to_olap_structure: str) -> None:
+    Loaded structure is kept in OlapStructureState. Use self.get_state() to get tables collection, frontend fields
+    and statistics of one version of structure while reload() runs in other thread
+    """
+
+    # Optional file with table statistics next to data and dimension folders
+    STATISTICS_FILE_NAME: str = r"statistics.toml"
+    # Version of snapshot format. Snapshots with other version are ignored
+    SNAPSHOT_VERSION: int = 5
+
+    def __init__(self, path_to_olap_structure: str, snapshot_path: str | None = None,
+                 workers: int | None = None) -> None:
         """
         Initializes OlapStructureGenerator
         :param path_to_olap_structure: Path to folder with toml structure
+        :param snapshot_path: Path to compiled snapshot of structure. If snapshot is fresh (toml files were not
+        changed), structure is loaded from it. Otherwise, structure is created from toml files and snapshot is written
+        :param workers: number of processes to parse toml files. None or 1 to parse in current process
         """
-        path_for_data_tables = os.path.join(path_to_olap_structure, r"data")
-        path_for_dimension_tables = os.path.join(path_to_olap_structure, r"dimension")
+        self.path_to_olap_structure: str = path_to_olap_structure
+        self.workers: int | None = workers
+
+        self.__reload_lock: threading.Lock = threading.Lock()
+        # {path_to_file: (mtime_ns, size, sha256 or None if not calculated yet)}
+        self.__file_states: dict[str, tuple[int, int, str | None]] = {}
+        # {path_to_file: table_name}
+        self.__file_tables: dict[str, str] = {}
+        # Path to file with base table
+        self.__base_table_file: str | None = None
+
+        dimension_files, data_files, statistics_file_path = self.__list_structure_files()
+
+        source_files: list = dimension_files + data_files
+        if os.path.isfile(statistics_file_path):
+            source_files.append(statistics_file_path)
+
+        self.source_hash: str | None = None
 
-        self.tables_collection: OlapTablesCollection = OlapTablesCollection()
+        for file in source_files:
+            file_stat: os.stat_result = os.stat(file)
+            file_hash: str | None = None
+            if snapshot_path is not None:
+                file_hash = get_file_hash(file)
+            self.__file_states[file] = (file_stat.st_mtime_ns, file_stat.st_size, file_hash)
 
-        for dimension_file in list_toml_files_in_directory(path_for_dimension_tables):
-            self.__import_dimension_olap_table(dimension_file)
+        if snapshot_path is not None:
+            self.source_hash = combine_file_hashes({file: self.__file_states[file][2] for file in source_files},
+                                                   path_to_olap_structure)
 
-        for data_file in list_toml_files_in_directory(path_for_data_tables):
-            self.__import_data_olap_table(data_file)
+            if self.__load_snapshot(snapshot_path, self.source_hash):
+                return
 
-        self.__generate_front_data()
+        tables_collection, main_data_table = self.__import_olap_tables(dimension_files, data_files, workers)
 
-    def __import_dimension_olap_table(self, dimension_file_path: str) -> None:
+        self.__state: OlapStructureState = OlapStructureState(
+            tables_collection, main_data_table, self.__generate_front_data(main_data_table, tables_collection),
+            self.__import_table_statistics(statistics_file_path), 0)
+
+        if snapshot_path is not None:
+            self.write_snapshot(snapshot_path)
+
+    def __list_structure_files(self) -> tuple[list, list, str]:
         """
-        Import data from dimension toml file
-        Create OlapDimensionTable.class
-        Add OlapDimensionTable to OlapTablesCollection
-        :param dimension_file_path: link to dimension toml file
-        :return: None
+        Lists toml files of structure
+        :return: dimension files, data files, path to statistics file (it may not exist)
+        """
+        path_for_data_tables = os.path.join(self.path_to_olap_structure, r"data")
+        path_for_dimension_tables = os.path.join(self.path_to_olap_structure, r"dimension")
+        statistics_file_path = os.path.join(self.path_to_olap_structure, self.STATISTICS_FILE_NAME)
+
+        return (list_toml_files_in_directory(path_for_dimension_tables),
+                list_toml_files_in_directory(path_for_data_tables),
+                statistics_file_path)
+
+    def write_snapshot(self, snapshot_path: str) -> None:
+        """
+        Compiles validated structure into snapshot file
+        File is replaced atomically, so other processes never read half-written snapshot
+        :param snapshot_path: path to snapshot file
+        :return:
         """
-        dimension_from_toml: dict = toml.load(dimension_file_path)
+        state: OlapStructureState = self.__state
 
-        table_name = "{}.{}.{}".format(dimension_from_toml["database"], dimension_from_toml["schema"],
-                                       dimension_from_toml["table"])
+        snapshot: dict = {
+            "version": self.SNAPSHOT_VERSION,
+            "source_hash": self.source_hash,
+            "tables_collection": state.tables_collection,
+            "main_data_table": state.main_data_table,
+            "frontend_fields": state.frontend_fields,
+            "table_statistics": state.table_statistics,
+            "file_tables": {self.__relative_path(file): self.__file_tables[file] for file in self.__file_tables},
+            "base_table_file": None if self.__base_table_file is None
+            else self.__relative_path(self.__base_table_file),
+        }
 
-        dimension_table: OlapDimensionTable = OlapDimensionTable(table_name)
+        temp_snapshot_path: str = f"{snapshot_path}.{os.getpid()}.tmp"
 
-        for field in dimension_from_toml["fields"]:
+        with open(temp_snapshot_path, "wb") as snapshot_file:
+            pickle.dump(snapshot, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
 
-            use_sk_for_count: bool = False
+        os.replace(temp_snapshot_path, snapshot_path)
 
-            if "use_sk_for_count" in dimension_from_toml["fields"][field]:
-                use_sk_for_count = return_bool_on_text(dimension_from_toml["fields"][field]["use_sk_for_count"])
+    def __load_snapshot(self, snapshot_path: str, source_hash: str) -> bool:
+        """
+        Loads structure from snapshot if it was compiled from the same toml files
+        Snapshot is a pickle file. Load only snapshots you have created yourself
+        :param snapshot_path: path to snapshot file
+        :param source_hash: hash of current toml files
+        :return: True if structure was loaded
+        """
+        if not os.path.isfile(snapshot_path):
+            return False
+
+        try:
+            with open(snapshot_path, "rb") as snapshot_file:
+                snapshot: dict = pickle.load(snapshot_file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+            return False
+
+        if not isinstance(snapshot, dict):
+            return False
 
-            dimension_table.add_field(field, dimension_from_toml["fields"][field]["field_type"],
-                                      return_none_on_text(dimension_from_toml["fields"][field]["alias"]),
-                                      dimension_from_toml["fields"][field]["data_type"],
-                                      return_none_on_text(dimension_from_toml["fields"][field]["front_name"]),
-                                      use_sk_for_count)
+        if (snapshot.get("version") != self.SNAPSHOT_VERSION) or (snapshot.get("source_hash") != source_hash):
+            return False
 
-        self.tables_collection.add_dimension_table(dimension_table)
+        self.__state = OlapStructureState(snapshot["tables_collection"], snapshot["main_data_table"],
+                                          snapshot["frontend_fields"], snapshot["table_statistics"], 0)
+        self.__file_tables = {os.path.join(self.path_to_olap_structure, file): snapshot["file_tables"][file]
+                              for file in snapshot["file_tables"]}
+        if snapshot["base_table_file"] is not None:
+            self.__base_table_file = os.path.join(self.path_to_olap_structure, snapshot["base_table_file"])
 
-    def __import_data_olap_table(self, data_file_path: str) -> None:
+        return True
+
+    def __relative_path(self, file: str) -> str:
+        return os.path.relpath(file, self.path_to_olap_structure)
+
+    def reload(self) -> bool:
         """
-        Import data from data toml file
-        Create OlapDataTable.class
-        Add OlapDataTable to OlapTablesCollection
-        :param data_file_path: path to toml file with dimension table
-        :return:
+        Re-imports only changed, added and removed files of data and dimension folders and statistics file
+        Files are checked by mtime and size first, then by content hash
+
+        New OlapTablesCollection is created from new tables and unchanged tables of current collection and replaces
+        current one only when everything was imported without errors. Requests that already got collection from
+        self.get_tables_collection() keep working with the old one
+
+        :return: True if structure was changed
         """
-        data_from_toml: dict = toml.load(data_file_path)
+        with self.__reload_lock:
+            dimension_files, data_files, statistics_file_path = self.__list_structure_files()
+
+            source_files: list = dimension_files + data_files
+            if os.path.isfile(statistics_file_path):
+                source_files.append(statistics_file_path)
+
+            file_states: dict[str, tuple[int, int, str | None]] = {}
+            changed_files: set[str] = set()
+
+            for file in source_files:
+                file_states[file], is_changed = self.__check_file(file)
+                if is_changed:
+                    changed_files.add(file)
+
+            removed_files: set[str] = set(self.__file_states.keys()) - set(file_states.keys())
+
+            if (len(changed_files) == 0) and (len(removed_files) == 0):
+                self.__file_states = file_states
+                return False
+
+            changed_dimension_files: list = [file for file in dimension_files if file in changed_files]
+            changed_data_files: list = [file for file in data_files if file in changed_files]
+
+            changed_dimension_tables: dict = dict(zip(changed_dimension_files,
+                                                      map_in_processes(read_dimension_olap_table,
+                                                                       changed_dimension_files, self.workers)))
+            changed_data_tables: dict = dict(zip(changed_data_files,
+                                                 map_in_processes(read_data_olap_table, changed_data_files,
+                                                                  self.workers)))
+
+            state: OlapStructureState = self.__state
+            tables_collection: OlapTablesCollection = OlapTablesCollection()
+            file_tables: dict[str, str] = {}
+            main_data_table: OlapDataTable | None = None
+            base_table_file: str | None = None
+
+            for file in dimension_files:
+                if file in changed_dimension_tables:
+                    dimension_table: OlapDimensionTable = changed_dimension_tables[file]
+                else:
+                    dimension_table = state.tables_collection["dimension_tables"][self.__file_tables[file]]
+
+                tables_collection.add_dimension_table(dimension_table)
+                file_tables[file] = dimension_table.get_name()
+
+            for file in data_files:
+                if file in changed_data_tables:
+                    data_table, is_base_table = changed_data_tables[file]
+                else:
+                    data_table = state.tables_collection["data_tables"][self.__file_tables[file]]
+                    is_base_table = file == self.__base_table_file
+
+                if is_base_table:
+                    main_data_table = data_table
+                    base_table_file = file
+
+                tables_collection.add_data_table(data_table)
+                file_tables[file] = data_table.get_name()
 
-        table_name = "{}.{}.{}".format(data_from_toml["database"], data_from_toml["schema"],
-                                       data_from_toml["table"])
+            table_statistics: OlapTableStatistics = state.table_statistics
 
-        data_table: OlapDataTable = OlapDataTable(table_name)
+            if (statistics_file_path in changed_files) or (statistics_file_path in removed_files):
+                table_statistics = self.__import_table_statistics(statistics_file_path)
 
-        for field in data_from_toml["fields"]:
-            data_table.add_field(field,
-                                 return_none_on_text(data_from_toml["fields"][field]["alias"]),
-                                 return_none_on_text(data_from_toml["fields"][field]["field_type"]),
-                                 self.__transform_calculation(data_from_toml["fields"][field]["calculation_type"]),
-                                 self.__transform_calculation(data_from_toml["fields"][field]["following_calculation"]),
-                                 data_from_toml["fields"][field]["data_type"],
-                                 return_none_on_text(data_from_toml["fields"][field]["front_name"])
-                                 )
+            frontend_fields: OlapFrontend = self.__generate_front_data(main_data_table, tables_collection)
 
-        if "base_table" in data_from_toml.keys():
-            if true_false_converter(data_from_toml["base_table"]) is True:
-                self.main_data_table = data_table
+            # One assignment, readers see old or new structure and never a mix of them
+            self.__state = OlapStructureState(tables_collection, main_data_table, frontend_fields, table_statistics,
+                                              state.structure_version + 1)
+            self.__file_states = file_states
+            self.__file_tables = file_tables
+            self.__base_table_file = base_table_file
 
-        self.tables_collection.add_data_table(data_table)
+            return True
 
-    def __generate_front_data(self) -> None:
+    def __check_file(self, file: str) -> tuple[tuple[int, int, str | None], bool]:
         """
-        Generates dictionary for frontend
-        :return:
+        Checks if file was changed since last import
+        :param file: path to file
+        :return: new state of file and True if content was changed
+        """
+        file_stat: os.stat_result = os.stat(file)
+        previous_state: tuple[int, int, str | None] | None = self.__file_states.get(file)
+
+        if (previous_state is not None) and (previous_state[0] == file_stat.st_mtime_ns) and \
+                (previous_state[1] == file_stat.st_size):
+            return previous_state, False
+
+        file_hash: str = get_file_hash(file)
+        file_state: tuple[int, int, str | None] = (file_stat.st_mtime_ns, file_stat.st_size, file_hash)
+
+        if (previous_state is not None) and (previous_state[2] == file_hash):
+            return file_state, False
+
+        return file_state, True
+
+    @staticmethod
+    def __import_table_statistics(statistics_file_path: str) -> OlapTableStatistics:
+        """
+        Import table statistics if file exists
+        :param statistics_file_path: path to statistics toml file
+        :return: OlapTableStatistics, empty if there is no file
+        """
+        if not os.path.isfile(statistics_file_path):
+            return OlapTableStatistics()
+
+        return OlapTableStatistics.from_dict(toml.load(statistics_file_path))
+
+    def __import_olap_tables(self, dimension_files: list, data_files: list, workers: int | None) \
+            -> tuple[OlapTablesCollection, OlapDataTable | None]:
+        """
+        Import all dimension and data tables into OlapTablesCollection
+        Files are parsed and validated in process pool if workers > 1, but tables are added in order of files,
+        so duplicates are found the same way as in one process
+        :param dimension_files: paths to dimension toml files
+        :param data_files: paths to data toml files
+        :param workers: number of processes. None or 1 to parse in current process
+        :return: OlapTablesCollection and base table
         """
+        tables_collection: OlapTablesCollection = OlapTablesCollection()
+        main_data_table: OlapDataTable | None = None
 
-        self.frontend_fields = OlapFrontend()
+        for file, dimension_table in zip(dimension_files,
+                                         map_in_processes(read_dimension_olap_table, dimension_files, workers)):
+            tables_collection.add_dimension_table(dimension_table)
+            self.__file_tables[file] = dimension_table.get_name()
 
-        table_name: str = self.main_data_table["table_name"]
+        for file, (data_table, is_base_table) in zip(data_files,
+                                                     map_in_processes(read_data_olap_table, data_files, workers)):
+            if is_base_table:
+                main_data_table = data_table
+                self.__base_table_file = file
 
-        for field in self.main_data_table["fields"]:
-            if self.main_data_table["fields"][field]["field_type"] != OlapFieldTypes.SERVICE_KEY.value:
-                field_type: str = self.main_data_table["fields"][field]["field_type"]
-                front_name: str = self.main_data_table["fields"][field]["front_name"]
-                data_type: str = self.main_data_table["fields"][field]["data_type"]
-                self.frontend_fields.add_field(field, field_type, front_name, data_type)
+            tables_collection.add_data_table(data_table)
+            self.__file_tables[file] = data_table.get_name()
 
-        for table in self.tables_collection["dimension_tables"]:
-            for field in self.tables_collection["dimension_tables"][table]["fields"]:
-                if self.tables_collection["dimension_tables"][table]["fields"][field]["field_type"] == \
+        return tables_collection, main_data_table
+
+    @staticmethod
+    def __generate_front_data(main_data_table: OlapDataTable | None, tables_collection: OlapTablesCollection) \
+            -> OlapFrontend:
+        """
+        Generates dictionary for frontend
+        :param main_data_table: base table
+        :param tables_collection: all tables
+        :return: OlapFrontend
+        """
+        if main_data_table is None:
+            raise OlapCreationException("No base table")
+
+        frontend_fields = OlapFrontend()
+
+        for field in main_data_table["fields"]:
+            if main_data_table["fields"][field]["field_type"] != OlapFieldTypes.SERVICE_KEY.value:
+                field_type: str = main_data_table["fields"][field]["field_type"]
+                front_name: str = main_data_table["fields"][field]["front_name"]
+                data_type: str = main_data_table["fields"][field]["data_type"]
+                frontend_fields.add_field(field, field_type, front_name, data_type)
+
+        for table in tables_collection["dimension_tables"]:
+            for field in tables_collection["dimension_tables"][table]["fields"]:
+                if tables_collection["dimension_tables"][table]["fields"][field]["field_type"] == \
                         OlapFieldTypes.DIMENSION.value:
-                    field_type = self.tables_collection["dimension_tables"][table]["fields"][field]["field_type"]
-                    front_name = self.tables_collection["dimension_tables"][table]["fields"][field]["front_name"]
-                    data_type: str = self.tables_collection["dimension_tables"][table]["fields"][field]["data_type"]
-                    self.frontend_fields.add_field(field, field_type, front_name, data_type)
+                    field_type = tables_collection["dimension_tables"][table]["fields"][field]["field_type"]
+                    front_name = tables_collection["dimension_tables"][table]["fields"][field]["front_name"]
+                    data_type: str = tables_collection["dimension_tables"][table]["fields"][field]["data_type"]
+                    frontend_fields.add_field(field, field_type, front_name, data_type)
+
+        return frontend_fields
+
+    def get_state(self) -> OlapStructureState:
+        """
+        Returns current structure. All parts of state are from the same version of structure
+        :return: OlapStructureState
+        """
+        return self.__state
+
+    @property
+    def tables_collection(self) -> OlapTablesCollection:
+        return self.__state.tables_collection
+
+    @property
+    def main_data_table(self) -> OlapDataTable:
+        return self.__state.main_data_table
+
+    @property
+    def frontend_fields(self) -> OlapFrontend:
+        return self.__state.frontend_fields
+
+    @property
+    def table_statistics(self) -> OlapTableStatistics:
+        return self.__state.table_statistics
+
+    @property
+    def structure_version(self) -> int:
+        return self.__state.structure_version
 
     def get_front_fields(self) -> OlapFrontend:
         """
         Returns the frontend fields
         :return:
         """
-        return self.frontend_fields
+        return self.__state.frontend_fields
 
     def get_dimension_field_aliases(self) -> list[str]:
         """
@@ -138,9 +476,10 @@ class OlapStructureGenerator:
         :return:
         """
         all_fields: list[str] = []
+        tables_collection: OlapTablesCollection = self.__state.tables_collection
 
-        for table in self.tables_collection["dimension_tables"]:
-            for field_alias in self.tables_collection["dimension_tables"][table]["fields"]:
+        for table in tables_collection["dimension_tables"]:
+            for field_alias in tables_collection["dimension_tables"][table]["fields"]:
                 if field_alias not in all_fields:
                     all_fields.append(field_alias)
 
@@ -148,17 +487,19 @@ class OlapStructureGenerator:
 
     def get_dimension_table_list(self) -> list[str]:
         """Returns a list of dimension table names"""
-        return self.tables_collection.get_dimension_table_names()
+        return self.__state.tables_collection.get_dimension_table_names()
 
     def get_all_tables(self) -> list[str]:
         """
         Returns all tables
         :return: list of all tables
         """
+        tables_collection: OlapTablesCollection = self.__state.tables_collection
+
         all_tables: list[str] = []
 
-        all_tables.extend(self.get_dimension_table_list())
-        all_tables.extend(self.get_data_tables())
+        all_tables.extend(tables_collection.get_dimension_table_names())
+        all_tables.extend(tables_collection.get_data_table_names())
 
         return all_tables
 
@@ -167,32 +508,18 @@ class OlapStructureGenerator:
         Returns fact tables
         :return:
         """
-        return list(self.tables_collection.get_data_table_names())
+        return list(self.__state.tables_collection.get_data_table_names())
 
-    @staticmethod
-    def __transform_calculation(following_calculation: str) -> str | None:
+    def get_tables_collection(self) -> OlapTablesCollection:
         """
-        Convert following_calculation to correct value
-        :param following_calculation:
+        Returns table collection
         :return:
         """
+        return self.__state.tables_collection
 
-        if following_calculation is None:
-            return None
-
-        if following_calculation.lower() == "none":
-            return None
-
-        possible_calculations: list[str] = [f.value for f in OlapCalculations]
-
-        if following_calculation.lower() not in possible_calculations:
-            raise ValueError(f"Invalid following_calculation: {following_calculation}")
-
-        return following_calculation.lower()
-
-    def get_tables_collection(self) -> OlapTablesCollection:
+    def get_table_statistics(self) -> OlapTableStatistics:
         """
-        Returns table collection
+        Returns table statistics
         :return:
         """
-        return self.tables_collection
+        return self.__state.table_statistics
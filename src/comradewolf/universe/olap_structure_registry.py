@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from comradewolf.universe.olap_structure_generator import OlapStructureGenerator
+from comradewolf.utils.exceptions import OlapException
+from comradewolf.utils.utils import get_deep_size
+
+
+class OlapStructureRegistry:
+    """
+    Registry of many OLAP structures (cubes) in one process
+
+    Cube is loaded on first use and kept in LRU. When approximate memory size of loaded cubes is bigger than
+    memory_budget, least recently used cubes are evicted. Cube that was just requested is never evicted
+    """
+
+    def __init__(self, memory_budget: int, snapshot_directory: str | None = None, workers: int | None = None) -> None:
+        """
+        :param memory_budget: approximate memory budget for loaded cubes in bytes
+        :param snapshot_directory: directory for snapshots of cubes. Makes loading after eviction faster
+        :param workers: number of processes to parse toml files of one cube
+        """
+        self.memory_budget = memory_budget
+        self.snapshot_directory = snapshot_directory
+        self.workers = workers
+
+        # {cube_name: path_to_olap_structure}
+        self.__cube_paths: dict[str, str] = {}
+        # {cube_name: (OlapStructureGenerator, size_in_bytes)}. Last item is the most recently used
+        self.__loaded_cubes: OrderedDict[str, tuple[OlapStructureGenerator, int]] = OrderedDict()
+        self.__loaded_size: int = 0
+
+        self.__lock: threading.Lock = threading.Lock()
+        # Separate locks to load cube only once when it is requested from many threads
+        self.__load_locks: dict[str, threading.Lock] = {}
+
+        self.__statistics: dict = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "load_time": 0.0,
+        }
+
+    def register(self, cube_name: str, path_to_olap_structure: str) -> None:
+        """
+        Registers cube. Cube is not loaded until self.get() is called
+        :param cube_name: name of cube
+        :param path_to_olap_structure: path to folder with toml structure
+        :return:
+        """
+        with self.__lock:
+            if cube_name in self.__cube_paths:
+                raise OlapException(f"Cube {cube_name} is already registered")
+
+            self.__cube_paths[cube_name] = path_to_olap_structure
+            self.__load_locks[cube_name] = threading.Lock()
+
+    def get(self, cube_name: str) -> OlapStructureGenerator:
+        """
+        Returns loaded cube. Loads cube if it is not loaded
+        :param cube_name: name of cube
+        :return: OlapStructureGenerator
+        """
+        with self.__lock:
+            if cube_name not in self.__cube_paths:
+                raise OlapException(f"Cube {cube_name} is not registered")
+
+            if cube_name in self.__loaded_cubes:
+                self.__statistics["hits"] += 1
+                self.__loaded_cubes.move_to_end(cube_name)
+                return self.__loaded_cubes[cube_name][0]
+
+            load_lock: threading.Lock = self.__load_locks[cube_name]
+
+        with load_lock:
+            # Cube could be loaded by other thread while we were waiting
+            with self.__lock:
+                if cube_name in self.__loaded_cubes:
+                    self.__statistics["hits"] += 1
+                    self.__loaded_cubes.move_to_end(cube_name)
+                    return self.__loaded_cubes[cube_name][0]
+
+                self.__statistics["misses"] += 1
+
+            start_time: float = time.perf_counter()
+            structure: OlapStructureGenerator = OlapStructureGenerator(self.__cube_paths[cube_name],
+                                                                       self.__get_snapshot_path(cube_name),
+                                                                       self.workers)
+            load_time: float = time.perf_counter() - start_time
+
+            size: int = get_deep_size(structure)
+
+            with self.__lock:
+                self.__statistics["load_time"] += load_time
+                self.__loaded_cubes[cube_name] = (structure, size)
+                self.__loaded_size += size
+                self.__evict()
+
+            return structure
+
+    def __get_snapshot_path(self, cube_name: str) -> str | None:
+        if self.snapshot_directory is None:
+            return None
+
+        return os.path.join(self.snapshot_directory, f"{cube_name}.snapshot")
+
+    def __evict(self) -> None:
+        """
+        Evicts least recently used cubes while loaded size is bigger than budget
+        Should be called under self.__lock
+        :return:
+        """
+        while (self.__loaded_size > self.memory_budget) and (len(self.__loaded_cubes) > 1):
+            cube_name, (_, size) = self.__loaded_cubes.popitem(last=False)
+            self.__loaded_size -= size
+            self.__statistics["evictions"] += 1
+
+    def evict(self, cube_name: str) -> None:
+        """
+        Evicts cube if it is loaded
+        :param cube_name: name of cube
+        :return:
+        """
+        with self.__lock:
+            if cube_name in self.__loaded_cubes:
+                self.__loaded_size -= self.__loaded_cubes.pop(cube_name)[1]
+                self.__statistics["evictions"] += 1
+
+    def is_loaded(self, cube_name: str) -> bool:
+        with self.__lock:
+            return cube_name in self.__loaded_cubes
+
+    def get_loaded_cubes(self) -> list[str]:
+        """
+        Returns loaded cubes from least to most recently used
+        :return:
+        """
+        with self.__lock:
+            return list(self.__loaded_cubes.keys())
+
+    def get_loaded_size(self) -> int:
+        with self.__lock:
+            return self.__loaded_size
+
+    def get_statistics(self) -> dict:
+        """
+        Returns counters of registry
+        :return: {"hits": int, "misses": int, "evictions": int, "load_time": seconds, "loaded_cubes": int,
+        "loaded_size": bytes}
+        """
+        with self.__lock:
+            statistics: dict = dict(self.__statistics)
+            statistics["loaded_cubes"] = len(self.__loaded_cubes)
+            statistics["loaded_size"] = self.__loaded_size
+            return statistics
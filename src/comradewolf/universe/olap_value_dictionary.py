@@ -0,0 +1,132 @@
+import mmap
+import os
+import struct
+import tempfile
+from typing import Iterable
+
+# Values number and offsets of values are little-endian unsigned 64-bit integers
+OFFSET_FORMAT = "<Q"
+OFFSET_SIZE = struct.calcsize(OFFSET_FORMAT)
+
+
+class OlapSortedValuesDictionary:
+    """
+    Sorted distinct values of one field in local file. File is memory-mapped, so only pages that are read are loaded
+    into memory. Used to search values by prefix without query to database
+
+    File structure:
+    [number of values][offset of value 0]...[offset of value n - 1][offset of end][utf-8 values one after another]
+
+    Values are sorted by code points, the same order as COLLATE "C" in database
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: file created with OlapSortedValuesDictionary.write()
+        """
+        self.path = path
+
+        with open(path, "rb") as dictionary_file:
+            self.__mmap: mmap.mmap = mmap.mmap(dictionary_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.__values_no: int = struct.unpack_from(OFFSET_FORMAT, self.__mmap, 0)[0]
+        self.__data_start: int = OFFSET_SIZE * (self.__values_no + 2)
+
+    @staticmethod
+    def write(path: str, values: Iterable) -> int:
+        """
+        Writes sorted distinct values to file. None values are skipped, other values are converted to str
+        File is replaced atomically
+        :param path: path to file
+        :param values: values of field, e.g. first column of rows of filter select
+        :return: number of values in file
+        """
+        sorted_values: list[bytes] = [value.encode("utf-8")
+                                      for value in sorted({str(value) for value in values if value is not None})]
+
+        offsets: list[int] = [0]
+        for value in sorted_values:
+            offsets.append(offsets[-1] + len(value))
+
+        directory: str = os.path.dirname(os.path.abspath(path))
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(file_descriptor, "wb") as temp_file:
+                temp_file.write(struct.pack(OFFSET_FORMAT, len(sorted_values)))
+                temp_file.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+                temp_file.writelines(sorted_values)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return len(sorted_values)
+
+    def __len__(self) -> int:
+        return self.__values_no
+
+    def get_value(self, index: int) -> str:
+        """
+        Returns value by its number in sorted order
+        :param index: from 0 to len(self) - 1
+        :return:
+        """
+        start, end = struct.unpack_from("<2Q", self.__mmap, OFFSET_SIZE * (index + 1))
+
+        return self.__mmap[self.__data_start + start:self.__data_start + end].decode("utf-8")
+
+    def __bisect(self, value: str, right: bool) -> int:
+        """
+        Binary search of value
+        :param value: searched value
+        :param right: return position after equal value
+        :return: position to insert value to keep order
+        """
+        low: int = 0
+        high: int = self.__values_no
+
+        while low < high:
+            middle: int = (low + high) // 2
+            middle_value: str = self.get_value(middle)
+
+            if (middle_value < value) or (right and middle_value == value):
+                low = middle + 1
+            else:
+                high = middle
+
+        return low
+
+    def search(self, prefix: str, page_size: int, after: str | None = None) -> list[str]:
+        """
+        Returns one page of values starting with prefix
+        :param prefix: search prefix
+        :param page_size: max number of values
+        :param after: last value of previous page or None for first page
+        :return: values in sorted order
+        """
+        position: int = self.__bisect(prefix, False)
+
+        if after is not None:
+            position = max(position, self.__bisect(after, True))
+
+        values: list[str] = []
+
+        while (position < self.__values_no) and (len(values) < page_size):
+            value: str = self.get_value(position)
+
+            if not value.startswith(prefix):
+                break
+
+            values.append(value)
+            position += 1
+
+        return values
+
+    def close(self) -> None:
+        """
+        Closes memory-mapped file
+        :return:
+        """
+        self.__mmap.close()
@@ -1,11 +1,48 @@
+import threading
 from collections import UserDict
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Callable
+
 from typing_extensions import Self
 
 from comradewolf.utils.exceptions import QueryBuilderException
-from comradewolf.utils.utils import singleton
+
+# Cost of one join by type of join. Used to find the shortest joins
+JOIN_WEIGHTS: dict[str, int] = {"left": 2, "right": 3, "inner": 1}
+
+
+def freeze_joins(joins):
+    """
+    Returns read-only copy of joins: dictionaries become MappingProxyType, lists become tuples
+    :param joins: joins of AllPossibleJoins or any part of them
+    :return:
+    """
+    if isinstance(joins, Mapping):
+        return MappingProxyType({key: freeze_joins(joins[key]) for key in joins})
+
+    if isinstance(joins, (list, tuple)):
+        return tuple(freeze_joins(value) for value in joins)
+
+    return joins
+
+
+def copy_joins(joins):
+    """
+    Returns mutable copy of joins made with freeze_joins(): MappingProxyType become dictionaries, tuples become lists
+    MappingProxyType can not be pickled, so joins are copied before they are written to file
+    :param joins: joins of AllPossibleJoins or any part of them
+    :return:
+    """
+    if isinstance(joins, Mapping):
+        return {key: copy_joins(joins[key]) for key in joins}
+
+    if isinstance(joins, (list, tuple)):
+        return [copy_joins(value) for value in joins]
+
+    return joins
 
 
-@singleton
 class AllPossibleJoins(UserDict):
     """
             All possible joins
@@ -31,8 +68,141 @@ class AllPossibleJoins(UserDict):
                             }
                     }
             }
+
+            In lazy mode (self.set_lazy()) joins of start table are computed on first request and kept in LRU of
+            start tables
+
+            Every structure has its own instance created by GenerateJoins. After self.freeze() joins can not be
+            changed, and instance can be read from many threads. Joins of start tables are read-only after
+            self.freeze() (see freeze_joins()), so joins returned by any method can not be changed too
     """
 
+    def __init__(self) -> None:
+        # Set before UserDict.__init__(), because it can call self.__setitem__()
+        self.__frozen: bool = False
+        super().__init__()
+        # Returns joins of start table or None if table has no joins. None if joins are not computed lazily
+        self.__find_joins: Callable[[str], dict | None] | None = None
+        # Max number of start tables in lazy mode. None for no limit
+        self.__max_start_tables: int | None = None
+        self.__lock: threading.Lock = threading.Lock()
+
+        self.__statistics: dict = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+        }
+
+    def freeze(self) -> None:
+        """
+        Forbids any changes of joins. Joins of lazy mode are still computed on request and are frozen too
+        :return:
+        """
+        with self.__lock:
+            for start_table in self.data:
+                self.data[start_table] = freeze_joins(self.data[start_table])
+
+            self.__frozen = True
+
+    def is_frozen(self) -> bool:
+        return self.__frozen
+
+    def __check_not_frozen(self) -> None:
+        if self.__frozen:
+            raise QueryBuilderException("Joins can not be changed after they were built")
+
+    def __setitem__(self, key, value) -> None:
+        self.__check_not_frozen()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key) -> None:
+        self.__check_not_frozen()
+        super().__delitem__(key)
+
+    def set_lazy(self, find_joins: Callable[[str], dict | None] | None, max_start_tables: int | None = None) -> None:
+        """
+        Turns on lazy mode. Turns it off if find_joins is None
+        :param find_joins: function(start_table) that returns joins of start table or None if table has no joins.
+        Can be called from many threads at the same time
+        :param max_start_tables: max number of start tables to keep joins for. Least recently used start tables are
+        evicted. None for no limit
+        :return:
+        """
+        self.__check_not_frozen()
+
+        if (max_start_tables is not None) and (max_start_tables < 1):
+            raise QueryBuilderException("max_start_tables should be at least 1")
+
+        with self.__lock:
+            self.__find_joins = find_joins
+            self.__max_start_tables = max_start_tables
+            self.__evict()
+
+    def __get_joins_of_start_table(self, start_table: str) -> Mapping | None:
+        """
+        Returns joins of start_table. Computes them in lazy mode
+        :param start_table:
+        :return: {end_table: complete_path_of_joins} or None if there are no joins of start_table
+        """
+        # Frozen joins that are not computed lazily are never changed and can be read without lock
+        if self.__frozen and (self.__find_joins is None):
+            return self.data.get(start_table)
+
+        with self.__lock:
+            if start_table in self.data:
+                if self.__find_joins is not None:
+                    self.__statistics["hits"] += 1
+                    # Most recently used start table goes to the end
+                    self.data[start_table] = self.data.pop(start_table)
+                return self.data[start_table]
+
+            find_joins: Callable[[str], dict | None] | None = self.__find_joins
+
+            if find_joins is None:
+                return None
+
+            self.__statistics["misses"] += 1
+
+        # Joins are computed without lock, so other threads are not blocked
+        joins_of_start_table: Mapping | None = find_joins(start_table)
+
+        if joins_of_start_table is None:
+            return None
+
+        if self.__frozen:
+            joins_of_start_table = freeze_joins(joins_of_start_table)
+
+        with self.__lock:
+            # Other thread could compute the same joins
+            if start_table not in self.data:
+                self.data[start_table] = joins_of_start_table
+                self.__evict()
+
+            return self.data.get(start_table, joins_of_start_table)
+
+    def __evict(self) -> None:
+        """
+        Evicts least recently used start tables while there are more than self.__max_start_tables
+        Should be called under self.__lock
+        :return:
+        """
+        if self.__max_start_tables is None:
+            return
+
+        while len(self.data) > self.__max_start_tables:
+            del self.data[next(iter(self.data))]
+            self.__statistics["evictions"] += 1
+
+    def get_statistics(self) -> dict:
+        """
+        Returns counters of lazy mode
+        :return: {"hits": int, "misses": int, "evictions": int, "start_tables": int}
+        """
+        with self.__lock:
+            statistics: dict = dict(self.__statistics)
+            statistics["start_tables"] = len(self.data)
+            return statistics
+
     def has_join(self, start_table: str, end_table: str) -> bool:
         """
         Checks if self.data has join between tables start_table and end_table
@@ -40,10 +210,12 @@ class AllPossibleJoins(UserDict):
         :param end_table:
         :return:
         """
-        if start_table not in self.data:
+        joins_of_start_table: Mapping | None = self.__get_joins_of_start_table(start_table)
+
+        if joins_of_start_table is None:
             return False
 
-        if end_table not in self.data[start_table]:
+        if end_table not in joins_of_start_table:
             return False
 
         return True
@@ -54,12 +226,10 @@ class AllPossibleJoins(UserDict):
         :param start_table:
         :return:
         """
-        if start_table not in self.data:
-            return False
-
-        return True
+        return self.__get_joins_of_start_table(start_table) is not None
 
     def all_joins_by_starting_table(self, join_dict: dict):
+        self.__check_not_frozen()
         self.data.update(join_dict)
 
     def add_join(self, start_table: str, end_table: str, complete_path_of_joins: dict) -> None:
@@ -70,25 +240,82 @@ class AllPossibleJoins(UserDict):
         :param complete_path_of_joins:
         :return:
         """
+        self.__check_not_frozen()
+
         if not self.has_join(start_table, end_table):
             self.data[start_table] = {}
             self.data[start_table][end_table] = complete_path_of_joins
 
-    def get_join(self, start_table: str, end_table: str) -> dict | bool:
+    def get_join(self, start_table: str, end_table: str) -> Mapping | bool:
         """
         Returns a join
         :param start_table:
         :param end_table:
         :return:
         """
-        if not self.has_join(start_table, end_table):
+        joins_of_start_table: Mapping | None = self.__get_joins_of_start_table(start_table)
+
+        if (joins_of_start_table is None) or (end_table not in joins_of_start_table):
             message: str = "Не найден join между таблицами"
             raise QueryBuilderException(message)
-        return self.data[start_table][end_table]
+        return joins_of_start_table[end_table]
+
+    def get_join_tree(self, from_table: str, end_tables: set[str] | list[str]) -> list[Mapping]:
+        """
+        Returns joins that connect from_table with all end_tables. Every table is joined only once
+        Approximate minimal Steiner tree: on every step end table with the cheapest path from any table already in
+        tree is added with all tables of this path
+        :param from_table: table in FROM of query
+        :param end_tables: tables that should be joined
+        :return: list of joins in order they should be written in query
+                 [{"table": table_name, "how": left/right/inner/outer, "on": {...}}, ...]
+        :raises QueryBuilderException: if there is no join to one of end_tables
+        """
+        tree_tables: list[str] = [from_table]
+        join_tree: list[Mapping] = []
+        not_joined_tables: set[str] = set(end_tables) - {from_table}
+
+        while len(not_joined_tables) > 0:
+            best_path: tuple | None = None
+
+            for end_table in sorted(not_joined_tables):
+                for tree_table in tree_tables:
+                    joins_of_tree_table: Mapping | None = self.__get_joins_of_start_table(tree_table)
+
+                    if (joins_of_tree_table is None) or (end_table not in joins_of_tree_table):
+                        continue
+
+                    path_of_joins: list[Mapping] = [joins_of_tree_table[end_table][join_number]
+                                                 for join_number in sorted(joins_of_tree_table[end_table])]
+                    cost: int = sum(JOIN_WEIGHTS[join["how"]] for join in path_of_joins)
+
+                    if (best_path is None) or (cost < best_path[0]):
+                        best_path = (cost, end_table, path_of_joins)
+
+            if best_path is None:
+                message: str = "Не найден join между таблицами"
+                raise QueryBuilderException(message)
+
+            _, end_table, path_of_joins = best_path
+
+            # Path can go through tables that are already joined. Only the rest of path is joined
+            first_new_join: int = 0
+
+            for join_number, join in enumerate(path_of_joins):
+                if join["table"] in tree_tables:
+                    first_new_join = join_number + 1
+
+            for join in path_of_joins[first_new_join:]:
+                tree_tables.append(join["table"])
+                join_tree.append(join)
+                not_joined_tables.discard(join["table"])
+
+        return join_tree
 
     def get_all_joins(self) -> Self:
         """
         Return all joins that were created
+        In lazy mode only joins of start tables in LRU are returned
         :return:
         """
         return self
@@ -34,12 +34,24 @@ class QueryGenerator:
     WHERE_K = "where"
 
     def __init__(self, tables_dict: AllTables, all_fields: AllFields, predefined_where: WhereFields,
-                 language_specific_builder: BaseCalculationBuilder):
+                 language_specific_builder: BaseCalculationBuilder, joins: AllPossibleJoins | None = None):
+        """
+        :param tables_dict: all tables from StructureGenerator.get_tables()
+        :param all_fields: all fields from StructureGenerator.get_fields()
+        :param predefined_where: where fields from StructureGenerator.get_where()
+        :param language_specific_builder: BaseCalculationBuilder for SQL dialect
+        :param joins: the shortest joins of the same structure from GenerateJoins.get_joins(). Is required, joins
+        are not shared between structures anymore
+        """
+        if joins is None:
+            raise QueryBuilderException("Не переданы соединения таблиц. Передайте "
+                                        "joins=GenerateJoins(StructureGenerator.get_joins(), "
+                                        "StructureGenerator.get_tables()).get_joins()")
 
         # All tables
         self.tables_dict = tables_dict
-        # ShortestDistance is singleton
-        self.joins: AllPossibleJoins = AllPossibleJoins()
+        # Joins of this structure only
+        self.joins: AllPossibleJoins = joins
 
         self.all_fields = all_fields
 
@@ -261,12 +273,10 @@ class QueryGenerator:
 
         query += from_query
 
-        for end_table in join_tables:
-            for key in self.joins.get_join(from_table, end_table).keys():
-                join_temp = self.joins.get_join(from_table, end_table)[key]
-
-                query += "\n{} join {} \n on {}".format(join_temp["how"], end_table,
-                                                        join_on_to_string(join_temp["on"]))
+        # One join tree for all tables, so tables on the way to many tables are joined only once
+        for join_temp in self.joins.get_join_tree(from_table, join_tables):
+            query += "\n{} join {} \n on {}".format(join_temp["how"], join_temp["table"],
+                                                    join_on_to_string(join_temp["on"]))
 
         if len(where) > 0:
             query += where_query + where
@@ -1,7 +1,7 @@
 from comradewolf.utils.data_types import WhereFields, AllFields, AllTables, AllJoins, FactTableJoins
 from comradewolf.utils.enums_and_field_dicts import ImportTypes, WhereFieldsProperties
 from comradewolf.utils.utils import gather_data_from_toml_files_into_big_dictionary, list_toml_files_in_directory, \
-    true_false_converter
+    true_false_converter, hash_files
 
 
 class StructureGenerator:
@@ -24,13 +24,15 @@ class StructureGenerator:
     # Table name structure database.scheme.table.field_name
     FIELD_NAME: str = "{}.{}.{}.{}"
 
-    def __init__(self, tables_folder_link: str, joins_folder_link: str, filters_folder_link: str) -> None:
+    def __init__(self, tables_folder_link: str, joins_folder_link: str, filters_folder_link: str,
+                 workers: int | None = None) -> None:
         """
         Gets data from all toml files
         Checks for duplicates and other errors
         :param tables_folder_link: link to folder with .toml files, containing table references
         :param filters_folder_link: link to folder with .toml files, containing filters references
         :param joins_folder_link: link to folder with .toml files, containing joins references
+        :param workers: number of processes to parse toml files. None or 1 to parse in current process
         """
 
         self.__all_tables_short = AllTables()
@@ -40,11 +42,16 @@ class StructureGenerator:
         self.__fact_joins = FactTableJoins()
 
         toml_tables: dict = gather_data_from_toml_files_into_big_dictionary(
-            list_toml_files_in_directory(tables_folder_link), ImportTypes.TABLE.value)
-        toml_joins_dict: dict = gather_data_from_toml_files_into_big_dictionary(
-            list_toml_files_in_directory(joins_folder_link), ImportTypes.JOINS.value)
+            list_toml_files_in_directory(tables_folder_link), ImportTypes.TABLE.value, workers)
+        join_files: list = list_toml_files_in_directory(joins_folder_link)
+        toml_joins_dict: dict = gather_data_from_toml_files_into_big_dictionary(join_files, ImportTypes.JOINS.value,
+                                                                                workers)
+        # Key for cache of GenerateJoins. Is computed on first self.get_joins_hash()
+        self.__join_files: list = join_files
+        self.__joins_folder_link: str = joins_folder_link
+        self.__joins_hash: str | None = None
         toml_filters_dict: dict = gather_data_from_toml_files_into_big_dictionary(
-            list_toml_files_in_directory(filters_folder_link), ImportTypes.FILTERS.value)
+            list_toml_files_in_directory(filters_folder_link), ImportTypes.FILTERS.value, workers)
 
         self.__generate_short_tables(toml_tables)
         self.__create_all_fields(toml_tables)
@@ -192,6 +199,18 @@ class StructureGenerator:
         """
         return self.__joins_by_table
 
+    def get_joins_hash(self) -> str:
+        """
+        Returns content hash of joins toml files
+        Should be used as source_hash of GenerateJoins cache. Files are hashed on first call only, so structures
+        without cache do not read join files twice
+        :return: sha256 hex digest
+        """
+        if self.__joins_hash is None:
+            self.__joins_hash = hash_files(self.__join_files, self.__joins_folder_link)
+
+        return self.__joins_hash
+
     def get_where(self) -> WhereFields:
         """
         Returns pre-defined where fields
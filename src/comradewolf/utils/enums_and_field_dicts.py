@@ -161,3 +161,4 @@ class FilterTypes(enum.Enum):
     """
     MAX_MIN = "max_min"
     ALL = "all"
+    PREFIX = "prefix"
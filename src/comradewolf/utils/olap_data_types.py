@@ -1,4 +1,8 @@
+import hashlib
+import json
+import sys
 from collections import UserDict
+from collections.abc import Mapping, MutableMapping
 
 from docutils.nodes import table, field_name
 
@@ -13,8 +17,118 @@ NO_FRONT_NAME_ERROR = r"Front name should be specified only when field_type is d
 
 SERVICE_KEY_EXISTS_ERROR_MESSAGE = r"Service key already exists"
 
+# Number of values on one page of prefix filter if frontend has not sent page_size
+DEFAULT_FILTER_PAGE_SIZE = 50
 
-class OlapDataTable(UserDict):
+
+def intern_string(value: str | None) -> str | None:
+    """
+    Interns string, so equal names and aliases in all tables are one object in memory
+    :param value: string or None
+    :return:
+    """
+    if value is None:
+        return None
+
+    return sys.intern(value)
+
+
+class OlapField(Mapping):
+    """
+    Frozen field of OLAP table
+    Values are kept in __slots__, but can be read as dictionary: field["field_name"]
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *values) -> None:
+        for slot, value in zip(self.__slots__, values):
+            if isinstance(value, str):
+                value = sys.intern(value)
+            object.__setattr__(self, slot, value)
+
+    def __setattr__(self, key, value) -> None:
+        raise OlapException(f"{type(self).__name__} is frozen")
+
+    def __delattr__(self, item) -> None:
+        raise OlapException(f"{type(self).__name__} is frozen")
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())})"
+
+
+class OlapDataField(OlapField):
+    """
+    Field of OlapDataTable
+    """
+
+    __slots__ = ("field_name", "field_type", "calculation_type", "following_calculation", "front_name", "data_type")
+
+    def __init__(self, field_name: str, field_type: str, calculation_type: str | None,
+                 following_calculation: str | None, front_name: str | None, data_type: str) -> None:
+        super().__init__(field_name, field_type, calculation_type, following_calculation, front_name, data_type)
+
+
+class OlapDimensionField(OlapField):
+    """
+    Field of OlapDimensionTable
+    """
+
+    __slots__ = ("field_name", "field_type", "front_name", "use_sk_for_count", "data_type")
+
+    def __init__(self, field_name: str, field_type: str, front_name: str | None, use_sk_for_count: bool,
+                 data_type: str) -> None:
+        super().__init__(field_name, field_type, front_name, use_sk_for_count, data_type)
+
+
+class OlapSlottedDict(MutableMapping):
+    """
+    Dictionary in self.data like UserDict, but without __dict__ of instance
+    Is used for tables, so every table keeps only self.data and attributes from __slots__ of subclass
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: dict) -> None:
+        self.data = data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value) -> None:
+        self.data[key] = value
+
+    def __delitem__(self, key) -> None:
+        del self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __contains__(self, key) -> bool:
+        return key in self.data
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.data!r})"
+
+
+class OlapDataTable(OlapSlottedDict):
     """
     Table created for OLAP
     Should represent types of fields (which calculations could be performed or were performed)
@@ -23,7 +137,7 @@ class OlapDataTable(UserDict):
     {
             table_name: table_name,
             fields: {
-                alias_name:
+                alias_name: OlapDataField
                     {
                         field_type: field_type
                         field_name: "field_name",
@@ -34,14 +148,28 @@ class OlapDataTable(UserDict):
                 }
         }
 
+    Is frozen when added to OlapTablesCollection, fields can not be added after that
 
     """
 
+    __slots__ = ("__frozen",)
+
     def __init__(self, table_name: str) -> None:
         """
         :param table_name: table name with in style of db.schema.table
         """
-        super().__init__({"table_name": table_name, "fields": {}})
+        super().__init__({"table_name": intern_string(table_name), "fields": {}})
+        self.__frozen: bool = False
+
+    def freeze(self) -> None:
+        """
+        Forbids self.add_field(). Is called by OlapTablesCollection, as it indexes fields of table once
+        :return:
+        """
+        self.__frozen = True
+
+    def is_frozen(self) -> bool:
+        return self.__frozen
 
     def add_field(self, field_name: str, alias_name: str, field_type: str, calculation_type: str | None,
                   following_calculation: str | None, data_type: str, front_name: str | None = None) \
@@ -57,6 +185,8 @@ class OlapDataTable(UserDict):
         :param front_name:
         :return:
         """
+        if self.__frozen:
+            raise OlapException(f"{type(self).__name__} {self.get_name()} is frozen")
 
         self.__check_field_type(field_type)
         self.__check_calculation_type(calculation_type)
@@ -67,14 +197,8 @@ class OlapDataTable(UserDict):
         if calculation_type is None:
             self.__check_front_name(field_type, front_name)
 
-        self.data["fields"][alias_name] = {
-            "field_name": field_name,
-            "field_type": field_type,
-            "calculation_type": calculation_type,
-            "following_calculation": following_calculation,
-            "front_name": front_name,
-            "data_type": data_type,
-        }
+        self.data["fields"][intern_string(alias_name)] = OlapDataField(field_name, field_type, calculation_type,
+                                                                      following_calculation, front_name, data_type)
 
     @staticmethod
     def __check_field_type(field_type) -> None:
@@ -147,14 +271,14 @@ class OlapDataTable(UserDict):
         return self.data["table_name"]
 
 
-class OlapDimensionTable(UserDict):
+class OlapDimensionTable(OlapSlottedDict):
     """
     Dimensions for OLAPDataTable
 
     {
             table_name: table_name,
             fields: {
-                alias_name:
+                alias_name: OlapDimensionField
                     {
                         "field_name": field_name,
                         "field_type": field_type,
@@ -163,13 +287,28 @@ class OlapDimensionTable(UserDict):
                 }
         }
 
+    Is frozen when added to OlapTablesCollection, fields can not be added after that
+
     """
 
+    __slots__ = ("__frozen",)
+
     def __init__(self, table_name: str) -> None:
         """
         :param table_name: table name with in style of db.schema.table
         """
-        super().__init__({"table_name": table_name, "fields": {}})
+        super().__init__({"table_name": intern_string(table_name), "fields": {}})
+        self.__frozen: bool = False
+
+    def freeze(self) -> None:
+        """
+        Forbids self.add_field(). Is called by OlapTablesCollection, as it indexes fields of table once
+        :return:
+        """
+        self.__frozen = True
+
+    def is_frozen(self) -> bool:
+        return self.__frozen
 
     def add_field(self, field_name: str, field_type: str, alias_name: str, data_type: str,
                   front_name: str | None = None, use_sk_for_count: bool = False) -> None:
@@ -183,19 +322,16 @@ class OlapDimensionTable(UserDict):
         :param alias_name: will be used to join tables
         :return:
         """
+        if self.__frozen:
+            raise OlapException(f"{type(self).__name__} {self.get_name()} is frozen")
 
         self.__check_dimension_field_types(field_type)
 
         if (field_type == OlapFieldTypes.DIMENSION.value) & (front_name is None):
             raise OlapCreationException(NO_FRONT_NAME_ERROR)
 
-        self.data["fields"][alias_name] = {
-            "field_name": field_name,
-            "field_type": field_type,
-            "front_name": front_name,
-            "use_sk_for_count": use_sk_for_count,
-            "data_type": data_type,
-        }
+        self.data["fields"][intern_string(alias_name)] = OlapDimensionField(field_name, field_type, front_name,
+                                                                           use_sk_for_count, data_type)
 
     def __check_dimension_field_types(self, field_type) -> None:
         """
@@ -212,7 +348,7 @@ class OlapDimensionTable(UserDict):
 
         if field_type == OlapFieldTypes.SERVICE_KEY.value:
             for field_name in self.data["fields"]:
-                if self.data["fields"][field_name]["field_type"] == OlapFieldTypes.SERVICE_KEY.value:
+                if self.data["fields"][field_name].field_type == OlapFieldTypes.SERVICE_KEY.value:
                     raise OlapCreationException(SERVICE_KEY_EXISTS_ERROR_MESSAGE)
 
     def get_field_names(self) -> list[str]:
@@ -239,13 +375,13 @@ class OlapDimensionTable(UserDict):
         :return:
         """
         for field in self.data["fields"]:
-            if self.data["fields"][field]["field_type"] == OlapFieldTypes.SERVICE_KEY.value:
+            if self.data["fields"][field].field_type == OlapFieldTypes.SERVICE_KEY.value:
                 return field
 
         raise OlapCreationException("Service key is not defined")
 
 
-class OlapTablesCollection(UserDict):
+class OlapTablesCollection(OlapSlottedDict):
     """
     Contains all data about OLAP tables
 
@@ -266,9 +402,24 @@ class OlapTablesCollection(UserDict):
         }
     """
 
+    __slots__ = ("__dimension_alias_index", "__data_alias_index", "__data_calculation_index",
+                 "__data_calculation_mask")
+
     def __init__(self):
         super().__init__({"data_tables": {}, "dimension_tables": {}})
 
+        # Lookup indexes. Filled in add_data_table and add_dimension_table, tables are frozen there, so fields can
+        # not be added after indexing
+        # {alias: [dimension_table_name, service_key_alias]}
+        self.__dimension_alias_index: dict[str, list[str]] = {}
+        # {alias: [data_table_name, ...]}
+        self.__data_alias_index: dict[str, list[str]] = {}
+        # {(alias, calculation): {data_table_name, ...}}
+        self.__data_calculation_index: dict[tuple[str, str | None], set[str]] = {}
+        # Bitsets of data tables. Bit number is position of data table in self.data["data_tables"]
+        # {(alias, calculation): int_bitmask}
+        self.__data_calculation_mask: dict[tuple[str, str | None], int] = {}
+
     def add_data_table(self, data_table: OlapDataTable) -> None:
         """
         Inserts data table
@@ -279,8 +430,11 @@ class OlapTablesCollection(UserDict):
         if data_table.get_name() in self.data["data_tables"].keys():
             raise OlapTableExists(data_table.get_name(), "data_tables")
 
+        data_table.freeze()
         self.data["data_tables"][data_table.get_name()] = data_table
 
+        self.__index_data_table(data_table)
+
     def add_dimension_table(self, dimension_table: OlapDimensionTable) -> None:
         """
         Inserts data table
@@ -291,8 +445,42 @@ class OlapTablesCollection(UserDict):
         if dimension_table.get_name() in self.data["dimension_tables"].keys():
             raise OlapTableExists(dimension_table.get_name(), "dimension_tables")
 
+        dimension_table.freeze()
         self.data["dimension_tables"][dimension_table.get_name()] = dimension_table
 
+        self.__index_dimension_table(dimension_table)
+
+    def __index_data_table(self, data_table: OlapDataTable) -> None:
+        """
+        Adds fields of data table to alias and (alias, calculation) indexes
+        :param data_table: OLAPDataTable
+        :return: None
+        """
+        table_name: str = data_table.get_name()
+        table_bit: int = 1 << (len(self.data["data_tables"]) - 1)
+
+        for field_alias in data_table["fields"]:
+            calculation: str | None = data_table["fields"][field_alias].calculation_type
+
+            self.__data_alias_index.setdefault(field_alias, []).append(table_name)
+            self.__data_calculation_index.setdefault((field_alias, calculation), set()).add(table_name)
+            self.__data_calculation_mask[(field_alias, calculation)] = \
+                self.__data_calculation_mask.get((field_alias, calculation), 0) | table_bit
+
+    def __index_dimension_table(self, dimension_table: OlapDimensionTable) -> None:
+        """
+        Adds fields of dimension table to alias index
+        First dimension table with alias wins
+        :param dimension_table: OLAPDimensionTable
+        :return: None
+        """
+        table_name: str = dimension_table.get_name()
+        service_key_name: str = dimension_table.get_service_key()
+
+        for field_alias in dimension_table.get_fields():
+            if field_alias not in self.__dimension_alias_index:
+                self.__dimension_alias_index[field_alias] = [table_name, service_key_name]
+
     def get_data_table_names(self) -> list[str]:
         """Returns list of data tables"""
         return list(self.data["data_tables"].keys())
@@ -312,26 +500,10 @@ class OlapTablesCollection(UserDict):
         :return: dictionary with structure [table_name, service_key_name]
         """
 
-        for table_name in self.get_dimension_table_names():
-
-            dimension_table: OlapDimensionTable = self.data["dimension_tables"][table_name]
-
-            has_field: bool
-            service_key_name: str = dimension_table.get_service_key()
-
-            for field in dimension_table.get_fields():
-
-                has_field = False
-
-                if field == field_alias_name:
-                    has_field = True
-
-                if has_field:
-                    dimension_table_for_return: list = [table_name, service_key_name]
-
-                    return dimension_table_for_return
+        if field_alias_name not in self.__dimension_alias_index:
+            return None
 
-        return None
+        return list(self.__dimension_alias_index[field_alias_name])
 
     def is_field_in_data_table(self, field_alias_name: str, table_name: str, calculation: str | None = None) -> bool:
         """
@@ -341,17 +513,47 @@ class OlapTablesCollection(UserDict):
         :param table_name:
         :return:
         """
-        has_field: bool = False
+        if calculation is not None:
+            field_alias_name = create_field_with_calculation(field_alias_name, calculation)
 
+        return table_name in self.__data_calculation_index.get((field_alias_name, calculation), ())
+
+    def get_data_tables_mask(self, field_alias_name: str, calculation: str | None = None) -> int:
+        """
+        Returns bitmask of data tables that have field with calculation
+        Same rules as in self.is_field_in_data_table()
+        :param field_alias_name: alias_name
+        :param calculation:
+        :return: bitmask where bit number is position of data table in self.get_data_table_names()
+        """
         if calculation is not None:
-            field_alias_name = f"{field_alias_name}__{calculation}"
+            field_alias_name = create_field_with_calculation(field_alias_name, calculation)
 
-        if field_alias_name in self.data["data_tables"][table_name]["fields"]:
+        return self.__data_calculation_mask.get((field_alias_name, calculation), 0)
 
-            if calculation == self.data["data_tables"][table_name]["fields"][field_alias_name]["calculation_type"]:
-                has_field = True
+    def get_all_data_tables_mask(self) -> int:
+        """
+        Returns bitmask with all data tables
+        :return:
+        """
+        return (1 << len(self.data["data_tables"])) - 1
+
+    def get_data_table_names_by_mask(self, mask: int) -> list[str]:
+        """
+        Returns data table names for bitmask in order of insertion
+        :param mask: bitmask from self.get_data_tables_mask()
+        :return:
+        """
+        table_names: list[str] = []
+
+        for table_name in self.data["data_tables"]:
+            if mask == 0:
+                break
+            if mask & 1:
+                table_names.append(table_name)
+            mask >>= 1
 
-        return has_field
+        return table_names
 
     def get_dimension_table_service_key(self, table_name: str) -> str:
         """
@@ -376,7 +578,7 @@ class OlapTablesCollection(UserDict):
         :return:
         """
 
-        return self.data["dimension_tables"][table_name]["fields"][field_name_alias]["use_sk_for_count"]
+        return self.data["dimension_tables"][table_name]["fields"][field_name_alias].use_sk_for_count
 
     def get_data_table_calculation(self, table_name: str, field_name_alias: str) -> str | None:
         """
@@ -409,7 +611,7 @@ class OlapTablesCollection(UserDict):
 
         field_name_alias = create_field_with_calculation(field_name_alias, calculation)
 
-        return self.data["data_tables"][table_name]["fields"][field_name_alias]["following_calculation"]
+        return self.data["data_tables"][table_name]["fields"][field_name_alias].following_calculation
 
     def get_fact_tables_collection(self) -> dict:
         """
@@ -428,11 +630,11 @@ class OlapTablesCollection(UserDict):
 
         if table_name in self.get_fact_tables_collection().keys():
             if alias_backend_name in self.data["data_tables"][table_name]["fields"]:
-                return self.data["data_tables"][table_name]["fields"][alias_backend_name]["field_name"]
+                return self.data["data_tables"][table_name]["fields"][alias_backend_name].field_name
 
         if table_name in self.get_dimension_table_names():
             if alias_backend_name in self.data["dimension_tables"][table_name]["fields"]:
-                return self.data["dimension_tables"][table_name]["fields"][alias_backend_name]["field_name"]
+                return self.data["dimension_tables"][table_name]["fields"][alias_backend_name].field_name
 
         return None
 
@@ -442,13 +644,13 @@ class OlapTablesCollection(UserDict):
 
         if table_name in self.get_fact_tables_collection().keys():
             for field in self.get_fact_tables_collection()[table_name]["fields"]:
-                frontend_fields.append(self.data["data_tables"][table_name]["fields"][field]["field_name"])
+                frontend_fields.append(self.data["data_tables"][table_name]["fields"][field].field_name)
 
             return frontend_fields
 
         if table_name in self.get_dimension_table_names():
             for field in self.data["dimension_tables"][table_name]["fields"]:
-                frontend_fields.append(self.data["dimension_tables"][table_name]["fields"][field]["field_name"])
+                frontend_fields.append(self.data["dimension_tables"][table_name]["fields"][field].field_name)
 
             return frontend_fields
 
@@ -468,16 +670,10 @@ class OlapTablesCollection(UserDict):
         :param alias_field_name:
         :return:
         """
-        table_names: list[str] = []
-
-        for table_name in self.get_data_table_names():
-            if alias_field_name in self.data["data_tables"][table_name]["fields"]:
-                table_names.append(table_name)
-
-        if len(table_names) == 0:
+        if alias_field_name not in self.__data_alias_index:
             return None
 
-        return table_names
+        return list(self.__data_alias_index[alias_field_name])
 
     def get_number_of_fields(self, table_name: str) -> int:
         if table_name in self.get_data_table_names():
@@ -488,6 +684,22 @@ class OlapTablesCollection(UserDict):
 
         raise OlapException(f"No table {table_name}")
 
+    def get_content_hash(self) -> str:
+        """
+        Returns hash of all tables and fields. Collections built from the same structure have the same hash
+        :return: sha256 hex digest
+        """
+        def to_json(value):
+            if isinstance(value, Mapping):
+                return dict(value)
+            if isinstance(value, (set, frozenset)):
+                return sorted(value, key=repr)
+            return repr(value)
+
+        content: str = json.dumps(self.data, sort_keys=True, default=to_json)
+
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
 
 class OlapFrontend(UserDict):
     """
@@ -611,6 +823,22 @@ class OlapFrontendToBackend(UserDict):
         """
         return self.data["WHERE"]
 
+    def add_params(self, params: list) -> None:
+        """
+        Adds bind parameters of where fields
+        Only for parameterized OlapSelectBuilder
+        :param params: list of parameters. Index in list is in parameter marker of where condition
+        :return: None
+        """
+        self.data.setdefault("PARAMS", []).extend(params)
+
+    def get_params(self) -> list:
+        """
+        Returns list of bind parameters
+        :return:
+        """
+        return self.data.get("PARAMS", [])
+
 
 class ShortTablesCollectionForSelect(UserDict):
     """
@@ -811,13 +1039,17 @@ class ShortTablesCollectionForSelect(UserDict):
         """
         return self.data[table_name]["all_selects"]
 
-    def generate_complete_structure(self, fact_tables: dict) -> None:
+    def generate_complete_structure(self, fact_tables: dict, table_names: list[str] | None = None) -> None:
         """
         Generates base for all tables for select
         :param fact_tables: 
+        :param table_names: if set, only these tables from fact_tables are created
         :return: 
         """
-        for fact_table_name in fact_tables:
+        if table_names is None:
+            table_names = list(fact_tables.keys())
+
+        for fact_table_name in table_names:
             self.create_basic_structure(fact_table_name, fact_tables[fact_table_name])
 
     def get_aggregations_without_join(self, table_name: str):
@@ -873,19 +1105,23 @@ class TableForFilter(UserDict):
     """
     Structure to create select for filters
     """
-    def __init__(self, table_name: str, field_alias_name: str, is_distinct: bool, number_of_select_fields: int):
+    def __init__(self, table_name: str, field_alias_name: str, is_distinct: bool, number_of_select_fields: int,
+                 size_estimate: float | None = None):
         """
 
         :param table_name:
         :param field_alias_name:
         :param is_distinct:
         :param number_of_select_fields:
+        :param size_estimate: estimated bytes to scan table (OlapAggregateNavigator.get_table_cost()). None if no
+        statistics
         """
         structure = {
             "table_name": table_name,
             "field_alias": field_alias_name,
             "is_distinct": is_distinct,
             "fields_number": number_of_select_fields,
+            "size_estimate": size_estimate,
         }
         super().__init__(structure)
 
@@ -895,6 +1131,9 @@ class TableForFilter(UserDict):
     def get_number_of_fields(self):
         return self.data["fields_number"]
 
+    def get_size_estimate(self) -> float | None:
+        return self.data["size_estimate"]
+
 
 
 class OlapFilterFrontend(UserDict):
@@ -916,8 +1155,20 @@ class OlapFilterFrontend(UserDict):
 
         if select_type not in all_select_types:
             raise OlapException("No valid FilterTypes in frontend")
-        
-        super().__init__({"field_alias": field_name, "select_type": select_type})
+
+        prefix: str | None = frontend_data["SELECT_DISTINCT"].get("prefix")
+
+        if (select_type == FilterTypes.PREFIX.value) and not isinstance(prefix, str):
+            raise OlapException("Prefix filter needs prefix string in frontend")
+
+        page_size: int | None = frontend_data["SELECT_DISTINCT"].get("page_size")
+
+        if select_type == FilterTypes.PREFIX.value and page_size is None:
+            page_size = DEFAULT_FILTER_PAGE_SIZE
+
+        super().__init__({"field_alias": field_name, "select_type": select_type, "prefix": prefix,
+                          "page_size": page_size, "after": frontend_data["SELECT_DISTINCT"].get("after"),
+                          "WHERE": [], "PARAMS": []})
 
     def get_select_type(self):
         return self.data["select_type"]
@@ -925,6 +1176,37 @@ class OlapFilterFrontend(UserDict):
     def get_field_alias_name(self):
         return self.data["field_alias"]
 
+    def get_prefix(self) -> str | None:
+        return self.data["prefix"]
+
+    def get_page_size(self) -> int | None:
+        return self.data["page_size"]
+
+    def get_after(self) -> str | None:
+        """
+        Last value of previous page for keyset pagination
+        :return:
+        """
+        return self.data["after"]
+
+    def add_where(self, where: list, params: list | None = None) -> None:
+        """
+        Adds where of other filters, e.g. OlapFrontendToBackend.get_where()
+        :param where: where fields created by OlapPromptConverterService
+        :param params: bind parameters of where. Only for parameterized OlapSelectBuilder
+        :return: None
+        """
+        self.data["WHERE"].extend(where)
+
+        if params is not None:
+            self.data["PARAMS"].extend(params)
+
+    def get_where(self) -> list:
+        return self.data["WHERE"]
+
+    def get_params(self) -> list:
+        return self.data["PARAMS"]
+
 
 class SelectFilter(UserDict):
     """
@@ -933,30 +1215,56 @@ class SelectFilter(UserDict):
     }
         "table_name": {
             "sql": SQL_STRING,
-            "fields_no": number of fields in table
+            "fields_no": number of fields in table,
+            "params": [bind_parameter, ...], # in order of placeholders in sql
+            "size_estimate": estimated bytes to scan | None, # None if no statistics
         }
     }
     """
 
-    def add_table(self, table_name: str, sql: str, field_no: int) -> None:
+    def add_table(self, table_name: str, sql: str, field_no: int, params: list | None = None,
+                  size_estimate: float | None = None) -> None:
         """
         Adds table to structure
         :param table_name:
         :param sql:
         :param field_no:
+        :param params: bind parameters of sql
+        :param size_estimate: estimated bytes to scan table. None if no statistics
         :return:
         """
         self.data[table_name] = {
             "sql": sql,
             "all_fields": field_no,
+            "params": params if params is not None else [],
+            "size_estimate": size_estimate,
         }
 
     def get_sql(self, table_name: str) -> str:
         return self.data[table_name]["sql"]
 
+    def get_params(self, table_name: str) -> list:
+        return self.data[table_name]["params"]
+
     def get_not_selected_fields(self, table_name: str) -> int:
         return self.data[table_name]["all_fields"]
 
+    def get_size_estimate(self, table_name: str) -> float | None:
+        return self.data[table_name]["size_estimate"]
+
+    def get_best_table(self) -> str:
+        """
+        Returns table with the smallest size estimate
+        Tables without estimate go after tables with estimate and are ranked by number of fields
+        :return: table name
+        """
+        if len(self.data) == 0:
+            raise OlapException("No tables in select filter")
+
+        return min(self.data, key=lambda table: (self.get_size_estimate(table) is None,
+                                                 self.get_size_estimate(table) or 0.0,
+                                                 self.get_not_selected_fields(table), table))
+
 
 
 class SelectCollection(UserDict):
@@ -969,18 +1277,32 @@ class SelectCollection(UserDict):
             "sql": sql_query
             "not_selected_fields_no": int_not_selected_fields,
             "has_group_by": bool,
+            "joined_tables": [joined_table_name, ...],
+            "params": [bind_parameter, ...], # in order of placeholders in sql
         }
     }
 
     """
 
-    def add_table(self, table_name: str, sql_query: str, not_selected_fields_no: int, has_group_by: bool) -> None:
+    def add_table(self, table_name: str, sql_query: str, not_selected_fields_no: int, has_group_by: bool,
+                  joined_tables: list[str] | None = None, params: list | None = None) -> None:
+        if joined_tables is None:
+            joined_tables = []
+
+        if params is None:
+            params = []
+
         self.data[table_name] = {
             "sql": sql_query,
             "not_selected_fields_no": not_selected_fields_no,
             "has_group_by": has_group_by,
+            "joined_tables": joined_tables,
+            "params": params,
         }
 
+    def get_joined_tables(self, table_name) -> list[str]:
+        return self.data[table_name]["joined_tables"]
+
     def get_sql(self, table_name) -> str:
         return self.data[table_name]["sql"]
 
@@ -989,3 +1311,286 @@ class SelectCollection(UserDict):
 
     def get_has_group_by(self, table_name) -> bool:
         return self.data[table_name]["has_group_by"]
+
+    def get_params(self, table_name) -> list:
+        return self.data[table_name]["params"]
+
+
+class MergedSelectCollection(UserDict):
+    """
+    Queries for many requests. Requests with the same table, joins and where are merged into one query with
+    GROUP BY GROUPING SETS
+
+    Structure:
+    {
+        "queries": [
+            {
+                "table_name": table_name,
+                "sql": sql_query,
+                "params": [bind_parameter, ...],
+                "grouping_column": alias of GROUPING() column or None if query is not merged,
+            },
+        ],
+        "requests": [ # in order of requests
+            {
+                "query": index of query in "queries",
+                "grouping_id": value of grouping column for rows of request or None for all rows,
+                "fields": [alias, ...] or None for all columns,
+            },
+        ]
+    }
+    """
+
+    def __init__(self) -> None:
+        super().__init__({"queries": [], "requests": []})
+
+    def add_query(self, table_name: str, sql_query: str, params: list | None = None,
+                  grouping_column: str | None = None) -> int:
+        """
+        Adds query
+        :param table_name: table name in FROM
+        :param sql_query: SQL
+        :param params: bind parameters
+        :param grouping_column: alias of GROUPING() column
+        :return: index of query
+        """
+        if params is None:
+            params = []
+
+        self.data["queries"].append({
+            "table_name": table_name,
+            "sql": sql_query,
+            "params": params,
+            "grouping_column": grouping_column,
+        })
+
+        return len(self.data["queries"]) - 1
+
+    def add_request(self, query_index: int, grouping_id: int | None = None, fields: list[str] | None = None) -> None:
+        """
+        Adds request. Requests should be added in order
+        :param query_index: index from self.add_query()
+        :param grouping_id: value of grouping column for rows of request
+        :param fields: aliases of request
+        :return:
+        """
+        self.data["requests"].append({
+            "query": query_index,
+            "grouping_id": grouping_id,
+            "fields": fields,
+        })
+
+    def get_queries(self) -> list[dict]:
+        return self.data["queries"]
+
+    def get_query_index(self, request_index: int) -> int:
+        return self.data["requests"][request_index]["query"]
+
+    def get_sql(self, query_index: int) -> str:
+        return self.data["queries"][query_index]["sql"]
+
+    def get_params(self, query_index: int) -> list:
+        return self.data["queries"][query_index]["params"]
+
+    def demultiplex(self, request_index: int, rows: list[dict]) -> list[dict]:
+        """
+        Returns rows of request from rows of its query
+        :param request_index: index of request
+        :param rows: rows of query as {column_alias: value}
+        :return: rows with fields of request only
+        """
+        request: dict = self.data["requests"][request_index]
+        grouping_column: str | None = self.data["queries"][request["query"]]["grouping_column"]
+
+        if (request["grouping_id"] is not None) and (grouping_column is not None):
+            rows = [row for row in rows if row[grouping_column] == request["grouping_id"]]
+
+        if request["fields"] is None:
+            return list(rows)
+
+        return [{field: row[field] for field in request["fields"]} for row in rows]
+
+
+class OlapTableStatistics(UserDict):
+    """
+    Statistics of tables for cost-based decisions
+    Comes from statistics.toml in OLAP structure folder
+
+    Structure:
+    {
+        "table_name": {
+            "row_count": int, # row count at checked_at
+            "avg_row_width": int | None, # bytes
+            "collected_at": float | None, # unix timestamp of full collection (ndv and row width)
+            "checked_at": float | None, # unix timestamp of last check of row count, min and max of columns
+            "collected_row_count": int | None, # row count at collected_at
+            "columns": {
+                "field_name": {
+                    "ndv": int | None, # number of distinct values
+                    "min_value": min_value | None,
+                    "max_value": max_value | None,
+                },
+            },
+        },
+    }
+    """
+
+    # Version of statistics file format
+    VERSION: int = 1
+
+    def add_table(self, table_name: str, row_count: int, avg_row_width: int | None = None,
+                  collected_at: float | None = None, checked_at: float | None = None,
+                  collected_row_count: int | None = None) -> None:
+        """
+        Adds or replaces table statistics
+        :param table_name: table name in style of db.schema.table
+        :param row_count: number of rows
+        :param avg_row_width: average row width in bytes
+        :param collected_at: unix timestamp of collection
+        :param checked_at: unix timestamp of last check of row count, min and max values. collected_at if None
+        :param collected_row_count: row count at collected_at. row_count if None
+        :return:
+        """
+        columns: dict = {}
+
+        if table_name in self.data:
+            columns = self.data[table_name]["columns"]
+
+        self.data[table_name] = {
+            "row_count": row_count,
+            "avg_row_width": avg_row_width,
+            "collected_at": collected_at,
+            "checked_at": checked_at,
+            "collected_row_count": collected_row_count,
+            "columns": columns,
+        }
+
+    def add_column(self, table_name: str, field_name: str, ndv: int | None = None, min_value=None,
+                   max_value=None) -> None:
+        """
+        Adds column statistics to existing table
+        :param table_name: table name in style of db.schema.table
+        :param field_name: backend field name
+        :param ndv: number of distinct values
+        :param min_value:
+        :param max_value:
+        :return:
+        """
+        if table_name not in self.data:
+            raise OlapException(f"No statistics for table {table_name}")
+
+        self.data[table_name]["columns"][field_name] = {
+            "ndv": ndv,
+            "min_value": min_value,
+            "max_value": max_value,
+        }
+
+    def has_table(self, table_name: str) -> bool:
+        return table_name in self.data
+
+    def get_row_count(self, table_name: str) -> int | None:
+        if table_name not in self.data:
+            return None
+        return self.data[table_name]["row_count"]
+
+    def get_avg_row_width(self, table_name: str) -> int | None:
+        if table_name not in self.data:
+            return None
+        return self.data[table_name]["avg_row_width"]
+
+    def get_collected_at(self, table_name: str) -> float | None:
+        if table_name not in self.data:
+            return None
+        return self.data[table_name]["collected_at"]
+
+    def get_checked_at(self, table_name: str) -> float | None:
+        """
+        Returns time when row count, min and max values of table were checked last time
+        :param table_name: table name in style of db.schema.table
+        :return: unix timestamp or None
+        """
+        if table_name not in self.data:
+            return None
+
+        if self.data[table_name]["checked_at"] is not None:
+            return self.data[table_name]["checked_at"]
+
+        return self.data[table_name]["collected_at"]
+
+    def get_collected_row_count(self, table_name: str) -> int | None:
+        """
+        Returns row count of table at full collection of statistics
+        :param table_name: table name in style of db.schema.table
+        :return:
+        """
+        if table_name not in self.data:
+            return None
+
+        if self.data[table_name]["collected_row_count"] is not None:
+            return self.data[table_name]["collected_row_count"]
+
+        return self.data[table_name]["row_count"]
+
+    def get_column(self, table_name: str, field_name: str) -> dict | None:
+        if table_name not in self.data:
+            return None
+        return self.data[table_name]["columns"].get(field_name)
+
+    def to_dict(self) -> dict:
+        """
+        Returns dictionary ready to be written to statistics toml
+        None values are skipped, toml has no null
+        :return:
+        """
+        tables: dict = {}
+
+        for table_name in self.data:
+            table: dict = {"row_count": self.data[table_name]["row_count"]}
+
+            if self.data[table_name]["avg_row_width"] is not None:
+                table["avg_row_width"] = self.data[table_name]["avg_row_width"]
+
+            for key in ["collected_at", "checked_at", "collected_row_count"]:
+                if self.data[table_name][key] is not None:
+                    table[key] = self.data[table_name][key]
+
+            table["columns"] = {}
+
+            for field_name in self.data[table_name]["columns"]:
+                column: dict = self.data[table_name]["columns"][field_name]
+                table["columns"][field_name] = {key: column[key] for key in column if column[key] is not None}
+
+            tables[table_name] = table
+
+        return {"version": self.VERSION, "tables": tables}
+
+    @classmethod
+    def from_dict(cls, statistics: dict) -> "OlapTableStatistics":
+        """
+        Creates statistics from dictionary loaded from statistics toml
+        :param statistics: dictionary with structure of self.to_dict()
+        :return: OlapTableStatistics
+        """
+        if statistics.get("version") != cls.VERSION:
+            raise OlapException(f"Statistics version {statistics.get('version')} is not supported. "
+                                f"Should be {cls.VERSION}")
+
+        table_statistics: OlapTableStatistics = cls()
+
+        tables: dict = statistics.get("tables", {})
+
+        for table_name in tables:
+            table_statistics.add_table(table_name, tables[table_name]["row_count"],
+                                       tables[table_name].get("avg_row_width"),
+                                       tables[table_name].get("collected_at"),
+                                       tables[table_name].get("checked_at"),
+                                       tables[table_name].get("collected_row_count"))
+
+            columns: dict = tables[table_name].get("columns", {})
+
+            for field_name in columns:
+                table_statistics.add_column(table_name, field_name, columns[field_name].get("ndv"),
+                                            columns[field_name].get("min_value"),
+                                            columns[field_name].get("max_value"))
+
+        return table_statistics
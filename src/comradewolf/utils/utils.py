@@ -1,6 +1,10 @@
+import hashlib
 import os
+import sys
 import warnings
 from collections import UserDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
 
 import toml
 
@@ -98,6 +102,91 @@ def list_toml_files_in_directory(directory: str) -> list:
     return all_files
 
 
+def get_file_hash(file: str) -> str:
+    """
+    Returns content hash of one file
+    :param file: path to file
+    :return: sha256 hex digest
+    """
+    with open(file, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def combine_file_hashes(file_hashes: dict[str, str], base_directory: str) -> str:
+    """
+    Returns one hash for hashes of many files
+    Files are sorted by path relative to base_directory, so order of dictionary does not matter
+    :param file_hashes: {path_to_file: hash from get_file_hash()}
+    :param base_directory: directory to make paths relative. Moving of whole directory does not change hash
+    :return: sha256 hex digest
+    """
+    content_hash = hashlib.sha256()
+
+    relative_files: list[tuple[str, str]] = sorted(
+        (os.path.relpath(file, base_directory).replace(os.sep, "/"), file) for file in file_hashes)
+
+    for relative_path, file in relative_files:
+        content_hash.update(relative_path.encode("utf-8"))
+        content_hash.update(b"\0")
+        content_hash.update(bytes.fromhex(file_hashes[file]))
+
+    return content_hash.hexdigest()
+
+
+def hash_files(list_of_files: list, base_directory: str) -> str:
+    """
+    Returns content hash of files
+    :param list_of_files: list with paths to files
+    :param base_directory: directory to make paths relative. Moving of whole directory does not change hash
+    :return: sha256 hex digest
+    """
+    return combine_file_hashes({file: get_file_hash(file) for file in list_of_files}, base_directory)
+
+
+def get_deep_size(value) -> int:
+    """
+    Returns approximate memory size of object with all objects inside
+    Walks through dictionaries, lists, tuples, sets and attributes of objects. Every object is counted once
+    :param value: any object
+    :return: size in bytes
+    """
+    seen: set[int] = set()
+    objects_to_check: list = [value]
+    size: int = 0
+
+    while len(objects_to_check) > 0:
+        current = objects_to_check.pop()
+
+        if id(current) in seen:
+            continue
+
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+
+        if isinstance(current, (str, bytes, int, float, bool, type(None))):
+            continue
+
+        if isinstance(current, dict):
+            objects_to_check.extend(current.keys())
+            objects_to_check.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            objects_to_check.extend(current)
+
+        if hasattr(current, "__dict__"):
+            objects_to_check.append(vars(current))
+
+        # Slots of all parent classes, private slots have mangled names
+        for current_class in type(current).__mro__:
+            slots = current_class.__dict__.get("__slots__", ())
+            for slot in (slots,) if isinstance(slots, str) else slots:
+                if slot.startswith("__") and not slot.endswith("__"):
+                    slot = f"_{current_class.__name__.lstrip('_')}{slot}"
+                if hasattr(current, slot):
+                    objects_to_check.append(getattr(current, slot))
+
+    return size
+
+
 def true_false_converter(tf: str) -> bool:
     """
     Converter to return true or false from string
@@ -109,12 +198,57 @@ def true_false_converter(tf: str) -> bool:
     return False
 
 
+def plain_dictionary(value):
+    """
+    Converts dictionaries (toml inline tables too) to builtin dict recursively
+    toml inline tables are local classes and can not be passed between processes
+    :param value: any value from toml
+    :return: value with builtin dict and list only
+    """
+    if isinstance(value, dict):
+        return {key: plain_dictionary(value[key]) for key in value}
+
+    if isinstance(value, list):
+        return [plain_dictionary(item) for item in value]
+
+    return value
+
+
+def load_toml_file(file: str) -> dict:
+    """
+    Loads toml file into builtin dict
+    :param file: path to toml file
+    :return: dictionary from file
+    """
+    return plain_dictionary(toml.load(file))
+
+
+def map_in_processes(function: Callable, items: list, workers: int | None = None) -> list:
+    """
+    Applies function to every item in process pool
+    Order of results is the same as order of items, so results can be merged deterministically
+    :param function: function that can be pickled (defined on module level)
+    :param items: list of arguments
+    :param workers: number of processes. None or 1 to apply function in current process
+    :return: list of results
+    """
+    if (workers is None) or (workers <= 1) or (len(items) <= 1):
+        return [function(item) for item in items]
+
+    workers = min(workers, len(items))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, items, chunksize=max(1, len(items) // (workers * 4))))
+
+
 def gather_data_from_toml_files_into_big_dictionary(list_of_files: list,
-                                                    check_for_duplicate_key: str) -> dict:
+                                                    check_for_duplicate_key: str,
+                                                    workers: int | None = None) -> dict:
     """
     Gathers data from toml files and check for duplicates and mandatory fields
     :param list_of_files: list with paths to toml files and one of ImportTypes.values
     :param check_for_duplicate_key: name of key to check for duplicates. So we would not have two same tables
+    :param workers: number of processes to parse toml files. None or 1 to parse in current process
     :return: dictionary from all files
     """
 
@@ -126,8 +260,9 @@ def gather_data_from_toml_files_into_big_dictionary(list_of_files: list,
 
     result: dict = {}
 
-    for file in list_of_files:
-        temp_toml: dict = toml.load(file)
+    all_toml: list[dict] = map_in_processes(load_toml_file, list_of_files, workers)
+
+    for file, temp_toml in zip(list_of_files, all_toml):
 
         non_duplicate_key = temp_toml[check_for_duplicate_key]
 
@@ -245,6 +380,33 @@ def create_field_with_calculation(field: str, calculation: str) -> str:
     return f"{field}__{calculation}"
 
 
+def get_prefix_successor(prefix: str) -> str | None:
+    """
+    Returns the smallest string that is bigger than all strings starting with prefix (by code points)
+    :param prefix: search prefix
+    :return: successor or None if there is no successor (empty prefix or only max code points)
+    """
+    characters: list[str] = list(prefix)
+
+    while len(characters) > 0:
+        code_point: int = ord(characters.pop())
+
+        if code_point == sys.maxunicode:
+            continue
+
+        code_point += 1
+
+        # Surrogates can not be encoded
+        if 0xD800 <= code_point <= 0xDFFF:
+            code_point = 0xE000
+
+        characters.append(chr(code_point))
+
+        return "".join(characters)
+
+    return None
+
+
 def get_calculation_from_field_name(field_name: str) -> tuple[str, str | None]:
     """
 
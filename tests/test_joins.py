@@ -1,6 +1,13 @@
+import threading
+
+import pytest
+
+from comradewolf.universe import structure_generator
 from comradewolf.universe.joins_generator import GenerateJoins
-from comradewolf.universe.possible_joins import AllPossibleJoins
+from comradewolf.universe.possible_joins import AllPossibleJoins, copy_joins
 from comradewolf.universe.structure_generator import StructureGenerator
+from comradewolf.utils.data_types import AllJoins
+from comradewolf.utils.exceptions import QueryBuilderException
 from tests.constants_for_testing import get_tables_folder, get_joins_folder, get_standard_filters_folder
 
 
@@ -10,9 +17,8 @@ def test_joins():
         get_joins_folder(),
         get_standard_filters_folder()
     )
-    GenerateJoins(table_structure.get_joins(), table_structure.get_tables())
-    possible_joins = AllPossibleJoins()
-    joins: AllPossibleJoins = possible_joins.get_all_joins()
+    generate_joins = GenerateJoins(table_structure.get_joins(), table_structure.get_tables())
+    joins: AllPossibleJoins = generate_joins.get_joins().get_all_joins()
 
     assert len(joins.keys()) == 2
     assert "query_builder.public.fact_sales" in joins.keys()
@@ -28,3 +34,177 @@ def test_joins():
 
     assert joins.has_table_with_joins("query_builder.public.fact_sales") is True
     assert joins.has_table_with_joins("no_table") is False
+
+
+def test_joins_through_many_tables():
+    on = {"between_tables": ["="], "first_table_on": ["id"], "second_table_on": ["id"]}
+    direct_joins = {
+        "snowflake.fact": {"snowflake.dim_a": {"how": "right", "on": on},
+                           "snowflake.dim_b": {"how": "inner", "on": on}},
+        "snowflake.dim_b": {"snowflake.dim_a": {"how": "inner", "on": on},
+                            "snowflake.dim_c": {"how": "left", "on": on}},
+    }
+    joins: AllPossibleJoins = GenerateJoins(direct_joins, ["snowflake.fact", "snowflake.dim_a", "snowflake.dim_b",
+                                                           "snowflake.dim_c"]).get_joins()
+
+    # Two inner joins are cheaper than one right join
+    assert [join["table"] for join in joins.get_join("snowflake.fact", "snowflake.dim_a").values()] == \
+           ["snowflake.dim_b", "snowflake.dim_a"]
+    # Table without own joins is reached through other table
+    assert copy_joins(joins.get_join("snowflake.fact", "snowflake.dim_c")[1]) == {"table": "snowflake.dim_c",
+                                                                                  "how": "left", "on": on}
+    assert not joins.has_join("snowflake.dim_b", "snowflake.fact")
+
+
+def test_frozen_joins_are_read_only(tmp_path):
+    on = {"between_tables": ["="], "first_table_on": ["id"], "second_table_on": ["id"]}
+    direct_joins = {"snowflake.fact": {"snowflake.dim_b": {"how": "inner", "on": on}},
+                    "snowflake.dim_b": {"snowflake.dim_c": {"how": "left", "on": on}}}
+    all_tables = ["snowflake.fact", "snowflake.dim_b", "snowflake.dim_c"]
+
+    for lazy in [False, True]:
+        generate_joins = GenerateJoins(direct_joins, all_tables, lazy=lazy)
+        joins: AllPossibleJoins = generate_joins.get_joins()
+
+        join = joins.get_join("snowflake.fact", "snowflake.dim_c")
+        with pytest.raises(TypeError):
+            join[1]["how"] = "inner"
+        with pytest.raises(TypeError):
+            join[0]["on"]["first_table_on"][0] = "other_id"
+        with pytest.raises(TypeError):
+            joins.get_join_tree("snowflake.fact", ["snowflake.dim_c"])[0]["table"] = "other"
+        with pytest.raises(TypeError):
+            joins.data["snowflake.fact"]["snowflake.dim_b"] = {}
+
+        assert joins.get_join("snowflake.fact", "snowflake.dim_c")[1]["how"] == "left"
+
+        # Frozen joins are copied before they are pickled
+        generate_joins.write_cache(str(tmp_path / "joins.cache"), "hash")
+
+
+def test_joins_cache(tmp_path):
+    cache_path = str(tmp_path / "joins.cache")
+    table_structure = StructureGenerator(
+        get_tables_folder(),
+        get_joins_folder(),
+        get_standard_filters_folder()
+    )
+    computed_joins: dict = dict(GenerateJoins(table_structure.get_joins(), table_structure.get_tables(), cache_path,
+                                              table_structure.get_joins_hash()).get_joins())
+
+    # Joins are loaded from cache without direct joins
+    joins: AllPossibleJoins = GenerateJoins(AllJoins(), table_structure.get_tables(), cache_path,
+                                            table_structure.get_joins_hash()).get_joins()
+    assert dict(joins) == computed_joins
+
+    # Cache of other joins is ignored
+    joins = GenerateJoins(AllJoins(), table_structure.get_tables(), cache_path, "other_hash").get_joins()
+    assert len(joins) == 0
+
+    joins = GenerateJoins(table_structure.get_joins(), table_structure.get_tables(), workers=2).get_joins()
+    assert dict(joins) == computed_joins
+
+
+def test_lazy_joins():
+    table_structure = StructureGenerator(
+        get_tables_folder(),
+        get_joins_folder(),
+        get_standard_filters_folder()
+    )
+    generate_joins = GenerateJoins(table_structure.get_joins(), table_structure.get_tables(), lazy=True,
+                                   max_start_tables=1)
+    joins: AllPossibleJoins = generate_joins.get_joins()
+
+    assert len(joins) == 0
+
+    assert generate_joins.return_join("query_builder.public.fact_sales", "query_builder.public.dim_item")
+    assert joins.has_join("query_builder.public.fact_sales", "query_builder.public.dim_calendar")
+    assert list(joins.keys()) == ["query_builder.public.fact_sales"]
+
+    assert joins.has_table_with_joins("query_builder.public.fact_stock")
+    # The least recently used start table is evicted
+    assert list(joins.keys()) == ["query_builder.public.fact_stock"]
+    assert not joins.has_table_with_joins("no_table")
+
+    assert joins.get_statistics() == {"hits": 1, "misses": 3, "evictions": 1, "start_tables": 1}
+
+
+def test_join_tree():
+    on = {"between_tables": ["="], "first_table_on": ["id"], "second_table_on": ["id"]}
+    direct_joins = {
+        "tree.fact": {"tree.dim_store": {"how": "inner", "on": on},
+                      "tree.dim_country": {"how": "right", "on": on}},
+        "tree.dim_store": {"tree.dim_city": {"how": "left", "on": on}},
+        "tree.dim_city": {"tree.dim_region": {"how": "inner", "on": on},
+                          "tree.dim_country": {"how": "inner", "on": on}},
+    }
+    joins: AllPossibleJoins = GenerateJoins(direct_joins, list(direct_joins.keys()) +
+                                            ["tree.dim_region", "tree.dim_country"]).get_joins()
+
+    # Country is joined to city that is already joined instead of the shortest join from fact
+    join_tree: list[dict] = joins.get_join_tree("tree.fact", {"tree.dim_city", "tree.dim_country"})
+    assert [join["table"] for join in join_tree] == ["tree.dim_store", "tree.dim_city", "tree.dim_country"]
+    assert join_tree[2]["how"] == "inner"
+
+    # Every table is joined once
+    join_tree = joins.get_join_tree("tree.fact", {"tree.dim_city", "tree.dim_region", "tree.dim_country"})
+    assert [join["table"] for join in join_tree] == ["tree.dim_store", "tree.dim_city", "tree.dim_country",
+                                                    "tree.dim_region"]
+
+    assert joins.get_join_tree("tree.fact", ["tree.fact"]) == []
+
+
+def test_joins_of_many_structures():
+    on = {"between_tables": ["="], "first_table_on": ["id"], "second_table_on": ["id"]}
+    table_structure = StructureGenerator(
+        get_tables_folder(),
+        get_joins_folder(),
+        get_standard_filters_folder()
+    )
+    joins: AllPossibleJoins = GenerateJoins(table_structure.get_joins(), table_structure.get_tables()).get_joins()
+    other_joins: AllPossibleJoins = GenerateJoins({"other.fact": {"other.dim": {"how": "inner", "on": on}}},
+                                                  ["other.fact", "other.dim"], lazy=True).get_joins()
+
+    # Joins of structures are not mixed
+    assert not joins.has_table_with_joins("other.fact")
+    assert not other_joins.has_table_with_joins("query_builder.public.fact_sales")
+
+    with pytest.raises(QueryBuilderException):
+        joins.all_joins_by_starting_table({"other.fact": {}})
+
+    with pytest.raises(QueryBuilderException):
+        del joins["query_builder.public.fact_sales"]
+
+    results: list[bool] = []
+
+    def read_joins() -> None:
+        for _ in range(100):
+            results.append(joins.has_join("query_builder.public.fact_sales", "query_builder.public.dim_item") and
+                           other_joins.has_join("other.fact", "other.dim"))
+
+    threads: list[threading.Thread] = [threading.Thread(target=read_joins) for _ in range(4)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert all(results) and len(results) == 400
+
+
+def test_joins_hash_is_lazy(monkeypatch):
+    hashed_folders: list = []
+
+    def counting_hash_files(files: list, folder: str) -> str:
+        hashed_folders.append(folder)
+        return "hash"
+
+    monkeypatch.setattr(structure_generator, "hash_files", counting_hash_files)
+
+    table_structure = StructureGenerator(get_tables_folder(), get_joins_folder(), get_standard_filters_folder())
+    assert hashed_folders == []
+
+    assert table_structure.get_joins_hash() == "hash"
+    assert table_structure.get_joins_hash() == "hash"
+    assert hashed_folders == [get_joins_folder()]
@@ -3,3 +3,14 @@ one_bk_no_calc_max_min = {'SELECT_DISTINCT': {'field_name': 'game_name', 'type':
 
 year_field = {'SELECT_DISTINCT': {'field_name': 'year', 'type': 'all'}}
 year_field_max_min = {'SELECT_DISTINCT': {'field_name': 'year', 'type': 'max_min'}}
+
+game_name_prefix = {'SELECT_DISTINCT': {'field_name': 'game_name', 'type': 'prefix', 'prefix': "Assassin's",
+                                        'page_size': 20}}
+game_name_prefix_next_page = {'SELECT_DISTINCT': {'field_name': 'game_name', 'type': 'prefix', 'prefix': 'Ha',
+                                                  'after': 'Half-Life'}}
+
+yearmonth_max_min_by_year = {'SELECT_DISTINCT': {'field_name': 'yearmonth', 'type': 'max_min'},
+                             'WHERE': [{'field_name': 'year', 'where': '=', 'condition': 2020},
+                                       {'field_name': 'yearmonth', 'where': '>', 'condition': 202001}]}
+year_by_platform = {'SELECT_DISTINCT': {'field_name': 'year', 'type': 'all'},
+                    'WHERE': [{'field_name': 'platform_name', 'where': '=', 'condition': 'PC'}]}
@@ -0,0 +1,56 @@
+from comradewolf.universe.olap_aggregate_navigator import OlapAggregateNavigator
+from comradewolf.universe.olap_language_select_builders import OlapPostgresSelectBuilder
+from comradewolf.universe.olap_prompt_converter_service import OlapPromptConverterService
+from comradewolf.universe.olap_service import OlapService
+from comradewolf.universe.olap_structure_generator import OlapStructureGenerator
+from comradewolf.utils.olap_data_types import OlapFrontendToBackend, OlapFrontend, OlapTableStatistics, \
+    SelectCollection
+from tests.constants_for_testing import get_olap_games_folder
+from tests.test_olap.test_frontend_data import group_by_read_no_where
+
+G_BY_Y_YM = "olap_test.games_olap.g_by_y_ym"
+BASE_SALES = "olap_test.games_olap.base_sales"
+
+olap_structure_generator: OlapStructureGenerator = OlapStructureGenerator(get_olap_games_folder())
+olap_select_builder = OlapPostgresSelectBuilder()
+olap_service: OlapService = OlapService(olap_select_builder)
+olap_prompt_service: OlapPromptConverterService = OlapPromptConverterService(olap_select_builder)
+frontend_all_items_view: OlapFrontend = olap_structure_generator.frontend_fields
+
+
+def test_statistics_loaded() -> None:
+    table_statistics: OlapTableStatistics = olap_structure_generator.get_table_statistics()
+
+    assert table_statistics.get_row_count(BASE_SALES) == 10000000
+    assert table_statistics.get_avg_row_width(G_BY_Y_YM) == 48
+    assert table_statistics.get_column("olap_test.games_olap.dim_game", "game_name_f")["ndv"] == 50000
+    assert table_statistics.get_row_count("no_table") is None
+
+    assert OlapTableStatistics.from_dict(table_statistics.to_dict()) == table_statistics
+
+
+def test_select_best_data() -> None:
+    frontend_to_backend_type: OlapFrontendToBackend = olap_prompt_service.create_frontend_to_backend(
+        group_by_read_no_where, frontend_all_items_view)
+
+    navigator = OlapAggregateNavigator(olap_structure_generator.get_table_statistics())
+
+    s = olap_service.select_best_data(frontend_to_backend_type, olap_structure_generator.get_tables_collection(),
+                                      navigator)
+
+    assert len(s) == 1
+    assert G_BY_Y_YM in s
+    assert "FROM olap_test.games_olap.g_by_y_ym" in s.get_sql(G_BY_Y_YM)
+
+
+def test_rank_tables_without_statistics() -> None:
+    select_collection = SelectCollection()
+    select_collection.add_table("no_stats_wide", "SELECT 1", 5, True)
+    select_collection.add_table("no_stats_narrow", "SELECT 1", 1, True)
+    select_collection.add_table(BASE_SALES, "SELECT 1", 9, True)
+    select_collection.add_table(G_BY_Y_YM, "SELECT 1", 9, True, ["olap_test.games_olap.dim_game"])
+
+    navigator = OlapAggregateNavigator(olap_structure_generator.get_table_statistics())
+
+    assert navigator.get_query_cost(select_collection, G_BY_Y_YM) == 12000 * 48 + 50000 * 64
+    assert navigator.rank_tables(select_collection) == [G_BY_Y_YM, BASE_SALES, "no_stats_narrow", "no_stats_wide"]
@@ -0,0 +1,59 @@
+from comradewolf.universe.olap_language_select_builders import OlapPostgresSelectBuilder
+from comradewolf.universe.olap_prompt_converter_service import OlapPromptConverterService
+from comradewolf.universe.olap_service import OlapService
+from comradewolf.universe.olap_structure_generator import OlapStructureGenerator
+from comradewolf.utils.olap_data_types import OlapFilterFrontend, SelectFilter
+from tests.constants_for_testing import get_olap_games_folder
+from tests.test_olap.filter_type_data import yearmonth_max_min_by_year, year_by_platform
+
+olap_structure_generator: OlapStructureGenerator = OlapStructureGenerator(get_olap_games_folder())
+
+
+def test_cascading_filter_uses_aggregates() -> None:
+    select_builder = OlapPostgresSelectBuilder()
+    olap_service: OlapService = OlapService(select_builder)
+    olap_prompt_service = OlapPromptConverterService(select_builder)
+
+    frontend_data: OlapFilterFrontend = olap_prompt_service.create_filter_frontend(
+        yearmonth_max_min_by_year, olap_structure_generator.frontend_fields)
+
+    select_filter: SelectFilter = olap_service.select_filter_for_frontend(
+        frontend_data, olap_structure_generator.get_tables_collection())
+
+    assert set(select_filter.keys()) == {"olap_test.games_olap.g_by_y_ym", "olap_test.games_olap.g_by_y_ym_p",
+                                         "olap_test.games_olap.base_sales"}
+
+    sql: str = select_filter.get_sql("olap_test.games_olap.g_by_y_ym")
+    assert sql.startswith('SELECT MIN("yearmonth") as min_value, MAX("yearmonth") as max_value FROM (')
+    assert "g_by_y_ym.year_f = 2020" in sql
+    # Where of filter field itself is not used
+    assert "202001" not in sql
+    assert len(frontend_data.get_where()) == 2
+
+    # The smallest table
+    assert min(select_filter, key=select_filter.get_not_selected_fields) == "olap_test.games_olap.g_by_y_ym"
+
+    # Without where filter select is made from table itself
+    select_filter = olap_service.select_filter_for_frontend(OlapFilterFrontend(yearmonth_max_min_by_year),
+                                                            olap_structure_generator.get_tables_collection())
+
+    for table_name in select_filter:
+        assert select_filter.get_sql(table_name).endswith(f"FROM {table_name}")
+
+
+def test_cascading_filter_parameterized() -> None:
+    select_builder = OlapPostgresSelectBuilder(parameterized=True)
+    olap_service: OlapService = OlapService(select_builder)
+    olap_prompt_service = OlapPromptConverterService(select_builder)
+
+    frontend_data: OlapFilterFrontend = olap_prompt_service.create_filter_frontend(
+        year_by_platform, olap_structure_generator.frontend_fields)
+
+    select_filter: SelectFilter = olap_service.select_filter_for_frontend(
+        frontend_data, olap_structure_generator.get_tables_collection())
+
+    for table_name in select_filter:
+        sql: str = select_filter.get_sql(table_name)
+        assert sql.startswith('SELECT DISTINCT "year" FROM (')
+        assert "platform_name_f = %s" in sql
+        assert select_filter.get_params(table_name) == ["PC"]
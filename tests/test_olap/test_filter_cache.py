@@ -0,0 +1,216 @@
+import os
+import shutil
+import time
+
+from comradewolf.universe.olap_filter_cache import OlapFilterValuesCache
+from comradewolf.universe.olap_language_select_builders import OlapPostgresSelectBuilder
+from comradewolf.universe.olap_service import OlapService
+from comradewolf.universe.olap_structure_generator import OlapStructureGenerator
+from comradewolf.utils.olap_data_types import OlapFilterFrontend, OlapTablesCollection, OlapTableStatistics
+from tests.constants_for_testing import get_olap_games_folder
+from tests.test_olap.filter_type_data import one_bk_no_calc, year_field_max_min
+
+olap_structure_generator: OlapStructureGenerator = OlapStructureGenerator(get_olap_games_folder())
+olap_service: OlapService = OlapService(OlapPostgresSelectBuilder())
+
+
+class CountingExecutor:
+    def __init__(self) -> None:
+        self.queries: list[str] = []
+        self.params: list[list] = []
+
+    def __call__(self, sql: str, params: list) -> list:
+        self.queries.append(sql)
+        self.params.append(params)
+        return [(len(self.queries),)]
+
+
+def test_filter_values_cache() -> None:
+    execute = CountingExecutor()
+    filter_cache: OlapFilterValuesCache = OlapFilterValuesCache(olap_service, execute)
+    tables_collection: OlapTablesCollection = olap_structure_generator.get_tables_collection()
+
+    assert filter_cache.get_values(OlapFilterFrontend(one_bk_no_calc), tables_collection) == [(1,)]
+    assert filter_cache.get_values(OlapFilterFrontend(one_bk_no_calc), tables_collection) == [(1,)]
+    assert "SELECT DISTINCT" in execute.queries[0]
+    assert execute.params[0] == []
+
+    filter_cache.get_values(OlapFilterFrontend(year_field_max_min), tables_collection)
+    # The smallest table with year
+    assert "olap_test.games_olap.g_by_y" in execute.queries[1]
+    assert len(execute.queries) == 2
+
+    filter_cache.refresh()
+    assert len(execute.queries) == 4
+    assert filter_cache.get_values(OlapFilterFrontend(one_bk_no_calc), tables_collection) != [(1,)]
+
+    filter_cache.start_background_refresh(0.01)
+    time.sleep(0.1)
+    filter_cache.stop_background_refresh()
+    assert filter_cache.get_statistics()["refreshes"] > 1
+
+    statistics = filter_cache.get_statistics()
+    assert statistics["hits"] == 2
+    assert statistics["misses"] == 2
+    assert statistics["size"] == 2
+
+
+def test_filter_values_precompute(tmp_path) -> None:
+    tables_collection: OlapTablesCollection = olap_structure_generator.get_tables_collection()
+    values_path: str = str(tmp_path / "filter_values.pickle")
+
+    execute = CountingExecutor()
+    filter_cache: OlapFilterValuesCache = OlapFilterValuesCache(olap_service, execute)
+
+    assert filter_cache.precompute(tables_collection, olap_structure_generator.get_table_statistics(), 100) == []
+    assert filter_cache.precompute(tables_collection, olap_structure_generator.get_table_statistics(),
+                                   100000) == ["game_name"]
+
+    filter_cache.write_values(values_path, olap_structure_generator.source_hash)
+
+    other_execute = CountingExecutor()
+    other_filter_cache: OlapFilterValuesCache = OlapFilterValuesCache(olap_service, other_execute)
+    other_filter_cache.load_or_precompute(values_path, tables_collection,
+                                          olap_structure_generator.get_table_statistics(), 100000,
+                                          olap_structure_generator.source_hash)
+
+    assert other_filter_cache.get_values(OlapFilterFrontend(one_bk_no_calc), tables_collection) == [(1,)]
+    assert len(other_execute.queries) == 0
+
+    # Other structure
+    assert not other_filter_cache.read_values(values_path, tables_collection, "other_hash")
+    # Other tables without source hash
+    filter_cache.write_values(values_path)
+    assert other_filter_cache.read_values(values_path, tables_collection)
+    other_tables_collection: OlapTablesCollection = OlapStructureGenerator(
+        get_olap_games_folder()).get_tables_collection()
+    assert other_filter_cache.read_values(values_path, other_tables_collection)
+    del other_tables_collection["dimension_tables"]["olap_test.games_olap.dim_game"]
+    assert not other_filter_cache.read_values(values_path, other_tables_collection)
+
+
+def test_filter_max_min_from_statistics() -> None:
+    tables_collection: OlapTablesCollection = olap_structure_generator.get_tables_collection()
+
+    table_statistics = OlapTableStatistics()
+    table_statistics.add_table("olap_test.games_olap.base_sales", 10000000, 96, time.time())
+    table_statistics.add_column("olap_test.games_olap.base_sales", "year_f", 30, 1995, 2024)
+    table_statistics.add_table("olap_test.games_olap.g_by_y", 20, 40, time.time() - 3600)
+    table_statistics.add_column("olap_test.games_olap.g_by_y", "year_f", 20, 2000, 2025)
+
+    row_counts: dict = {"olap_test.games_olap.base_sales": 10000000, "olap_test.games_olap.g_by_y": 20}
+
+    execute = CountingExecutor()
+    filter_cache: OlapFilterValuesCache = OlapFilterValuesCache(olap_service, execute,
+                                                                table_statistics=table_statistics,
+                                                                max_statistics_age=60,
+                                                                get_row_count=row_counts.get)
+
+    assert filter_cache.get_values(OlapFilterFrontend(year_field_max_min), tables_collection) == [(1995, 2024)]
+    assert len(execute.queries) == 0
+    assert filter_cache.get_statistics()["statistics_hits"] == 1
+
+    # Stale statistics are used without max_statistics_age
+    filter_cache.max_statistics_age = None
+    assert filter_cache.get_values(OlapFilterFrontend(year_field_max_min), tables_collection) == [(1995, 2025)]
+
+    # Table was loaded after statistics were checked, select from the smallest table
+    loaded_cache: OlapFilterValuesCache = OlapFilterValuesCache(olap_service, execute,
+                                                                table_statistics=table_statistics,
+                                                                max_statistics_age=60,
+                                                                get_loaded_at=lambda table_name: time.time())
+    loaded_cache.get_values(OlapFilterFrontend(year_field_max_min), tables_collection)
+    assert len(execute.queries) == 1
+    assert "FROM olap_test.games_olap.g_by_y" in execute.queries[0]
+
+    # Row count was changed since statistics were checked
+    row_counts["olap_test.games_olap.base_sales"] = 10000001
+    filter_cache.max_statistics_age = 60
+    assert filter_cache.get_max_min_from_statistics("year", tables_collection) is None
+
+    # No fresh statistics
+    row_counts["olap_test.games_olap.base_sales"] = 10000000
+    filter_cache.max_statistics_age = 0
+    assert filter_cache.get_max_min_from_statistics("year", tables_collection) is None
+
+
+def test_filter_values_key() -> None:
+    execute = CountingExecutor()
+    filter_cache: OlapFilterValuesCache = OlapFilterValuesCache(olap_service, execute)
+    tables_collection: OlapTablesCollection = olap_structure_generator.get_tables_collection()
+
+    small_page: dict = {"SELECT_DISTINCT": {"field_name": "game_name", "type": "all", "page_size": 10}}
+    big_page: dict = {"SELECT_DISTINCT": {"field_name": "game_name", "type": "all", "page_size": 20}}
+
+    filter_cache.get_values(OlapFilterFrontend(small_page), tables_collection)
+    filter_cache.get_values(OlapFilterFrontend(big_page), tables_collection)
+    filter_cache.get_values(OlapFilterFrontend(big_page), tables_collection)
+
+    assert len(execute.queries) == 2
+    assert execute.queries[0] != execute.queries[1]
+
+    # Refresh loads the same selects
+    filter_cache.refresh()
+    assert execute.queries[2:] == execute.queries[:2]
+
+
+def test_filter_values_refresh_failure() -> None:
+    def failing_execute(sql: str, params: list) -> list:
+        raise ConnectionError("Database is not available")
+
+    filter_cache: OlapFilterValuesCache = OlapFilterValuesCache(olap_service, CountingExecutor())
+    tables_collection: OlapTablesCollection = olap_structure_generator.get_tables_collection()
+    filter_cache.get_values(OlapFilterFrontend(one_bk_no_calc), tables_collection)
+
+    filter_cache.execute = failing_execute
+    filter_cache.start_background_refresh(0.01)
+    time.sleep(0.1)
+
+    # Thread keeps running after failure
+    assert filter_cache.get_statistics()["refresh_failures"] > 1
+    filter_cache.stop_background_refresh()
+
+
+def test_filter_max_min_stale_statistics_by_default() -> None:
+    tables_collection: OlapTablesCollection = olap_structure_generator.get_tables_collection()
+
+    # Statistics older than a day, statistics without collected_at and statistics without check of table are not
+    # used by default
+    table_statistics = OlapTableStatistics()
+    table_statistics.add_table("olap_test.games_olap.base_sales", 10000000, 96, time.time() - 2 * 24 * 3600)
+    table_statistics.add_column("olap_test.games_olap.base_sales", "year_f", 30, 1995, 2024)
+    table_statistics.add_table("olap_test.games_olap.g_by_y", 20, 40)
+    table_statistics.add_column("olap_test.games_olap.g_by_y", "year_f", 20, 2000, 2025)
+
+    execute = CountingExecutor()
+    filter_cache: OlapFilterValuesCache = OlapFilterValuesCache(olap_service, execute,
+                                                                table_statistics=table_statistics)
+
+    filter_cache.get_values(OlapFilterFrontend(year_field_max_min), tables_collection)
+    assert len(execute.queries) == 1
+    assert filter_cache.get_statistics()["statistics_hits"] == 0
+
+
+def test_filter_values_refresh_after_reload(tmp_path) -> None:
+    structure_folder = str(tmp_path / "olap_games")
+    shutil.copytree(get_olap_games_folder(), structure_folder)
+    generator: OlapStructureGenerator = OlapStructureGenerator(structure_folder)
+
+    execute = CountingExecutor()
+    filter_cache: OlapFilterValuesCache = OlapFilterValuesCache(olap_service, execute, structure_generator=generator)
+    filter_cache.get_values(OlapFilterFrontend(one_bk_no_calc), generator.get_tables_collection())
+
+    dim_game_file = os.path.join(structure_folder, "dimension", "dim_game.toml")
+    with open(dim_game_file, "r", encoding="utf-8") as f:
+        dim_game = f.read()
+    with open(dim_game_file, "w", encoding="utf-8") as f:
+        f.write(dim_game.replace('front_name="Game Name"', 'front_name="Name of the game"'))
+
+    assert generator.reload() is True
+
+    # Values are loaded for new collection, so requests with it are served from cache
+    filter_cache.refresh()
+    assert len(execute.queries) == 2
+    filter_cache.get_values(OlapFilterFrontend(one_bk_no_calc), generator.get_tables_collection())
+    assert len(execute.queries) == 2
+    assert filter_cache.get_statistics()["hits"] == 1
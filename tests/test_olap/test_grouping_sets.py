@@ -0,0 +1,47 @@
+from comradewolf.universe.olap_language_select_builders import OlapPostgresSelectBuilder
+from comradewolf.universe.olap_prompt_converter_service import OlapPromptConverterService
+from comradewolf.universe.olap_service import OlapService
+from comradewolf.universe.olap_structure_generator import OlapStructureGenerator
+from comradewolf.utils.olap_data_types import MergedSelectCollection
+from tests.constants_for_testing import get_olap_games_folder
+from tests.test_olap.test_frontend_data import base_table_with_and_agg_with_join, group_by_read_no_where
+
+olap_structure_generator: OlapStructureGenerator = OlapStructureGenerator(get_olap_games_folder())
+olap_select_builder = OlapPostgresSelectBuilder()
+olap_service: OlapService = OlapService(olap_select_builder)
+olap_prompt_service: OlapPromptConverterService = OlapPromptConverterService(olap_select_builder)
+
+pcs_by_publisher: dict = {'SELECT': [{'field_name': 'publisher_name'}],
+                          'CALCULATION': [{'field_name': 'pcs', 'calculation': 'sum'}],
+                          'WHERE': []}
+
+
+def test_grouping_sets() -> None:
+    requests = [olap_prompt_service.create_frontend_to_backend(frontend_data, olap_structure_generator.frontend_fields)
+                for frontend_data in [pcs_by_publisher, group_by_read_no_where, base_table_with_and_agg_with_join]]
+
+    merged_select_collection: MergedSelectCollection = olap_service.select_data_grouping_sets(
+        requests, olap_structure_generator.get_tables_collection())
+
+    assert len(merged_select_collection.get_queries()) == 2
+
+    merged_query_index: int = merged_select_collection.get_query_index(0)
+    assert merged_select_collection.get_query_index(2) == merged_query_index
+    assert merged_select_collection.get_query_index(1) != merged_query_index
+
+    sql: str = merged_select_collection.get_sql(merged_query_index)
+    assert "GROUP BY GROUPING SETS" in sql
+    assert "(dim_publisher.publisher_name_field_f)" in sql
+    assert "(g_by_y_p.year_f)" in sql
+    assert 'GROUPING(dim_publisher.publisher_name_field_f, g_by_y_p.year_f) as "grouping_id"' in sql
+
+    rows: list[dict] = [
+        {"pcs__sum": 10, "publisher_name": "A", "year": None, "sales_rub__sum": 1, "publisher_name__count": 2,
+         "grouping_id": 1},
+        {"pcs__sum": 20, "publisher_name": None, "year": 2024, "sales_rub__sum": 3, "publisher_name__count": 4,
+         "grouping_id": 2},
+    ]
+
+    assert merged_select_collection.demultiplex(0, rows) == [{"pcs__sum": 10, "publisher_name": "A"}]
+    assert merged_select_collection.demultiplex(2, rows) == [{"year": 2024, "sales_rub__sum": 3, "pcs__sum": 20,
+                                                              "publisher_name__count": 4}]
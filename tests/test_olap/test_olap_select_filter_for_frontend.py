@@ -1,8 +1,9 @@
+from comradewolf.universe.olap_aggregate_navigator import OlapAggregateNavigator
 from comradewolf.universe.olap_language_select_builders import OlapPostgresSelectBuilder
 from comradewolf.universe.olap_prompt_converter_service import OlapPromptConverterService
 from comradewolf.universe.olap_service import OlapService
 from comradewolf.universe.olap_structure_generator import OlapStructureGenerator
-from comradewolf.utils.olap_data_types import OlapFrontend, OlapFilterFrontend
+from comradewolf.utils.olap_data_types import OlapFrontend, OlapFilterFrontend, OlapTableStatistics
 from tests.constants_for_testing import get_olap_games_folder
 from tests.test_olap.filter_type_data import one_bk_no_calc, one_bk_no_calc_max_min, year_field, year_field_max_min
 
@@ -65,6 +66,28 @@ def test_year_field() -> None:
         assert key in s.get_sql(key)
         assert "year_f" in s.get_sql(key)
 
+def test_year_field_by_row_count() -> None:
+    front_to_back = OlapFilterFrontend(year_field)
+
+    # The narrowest table has the most rows
+    table_statistics = OlapTableStatistics()
+    table_statistics.add_table("olap_test.games_olap.g_by_y", 1000000, 40)
+    table_statistics.add_table("olap_test.games_olap.g_by_y_ym_p", 100, 56)
+    navigator = OlapAggregateNavigator(table_statistics)
+
+    s = olap_service.select_filter_for_frontend(front_to_back, olap_structure_generator.get_tables_collection(),
+                                                navigator)
+
+    assert s.get_best_table() == "olap_test.games_olap.g_by_y_ym_p"
+    assert s.get_size_estimate("olap_test.games_olap.g_by_y_ym_p") == 5600.0
+    assert s.get_size_estimate("olap_test.games_olap.base_sales") is None
+
+    # Without statistics table with the least number of fields is used
+    s = olap_service.select_filter_for_frontend(front_to_back, olap_structure_generator.get_tables_collection())
+
+    assert s.get_best_table() == "olap_test.games_olap.g_by_y"
+    assert s.get_size_estimate("olap_test.games_olap.g_by_y") is None
+
 if __name__ == "__main__":
     test_one_bk_no_calc()
     test_one_bk_no_calc_max_min()
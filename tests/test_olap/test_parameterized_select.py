@@ -0,0 +1,60 @@
+import copy
+
+from comradewolf.universe.olap_language_select_builders import OlapPostgresSelectBuilder
+from comradewolf.universe.olap_plan_cache import OlapPlanCache
+from comradewolf.universe.olap_prompt_converter_service import OlapPromptConverterService
+from comradewolf.universe.olap_service import OlapService
+from comradewolf.universe.olap_structure_generator import OlapStructureGenerator
+from comradewolf.utils.olap_data_types import OlapFrontendToBackend, SelectCollection
+from tests.constants_for_testing import get_olap_games_folder
+from tests.test_olap.test_frontend_data import base_table_with_join_wth_where, where_in_string
+
+BASE_SALES = "olap_test.games_olap.base_sales"
+
+olap_structure_generator: OlapStructureGenerator = OlapStructureGenerator(get_olap_games_folder())
+olap_select_builder = OlapPostgresSelectBuilder(parameterized=True)
+olap_prompt_service: OlapPromptConverterService = OlapPromptConverterService(olap_select_builder)
+frontend_all_items_view = olap_structure_generator.frontend_fields
+
+
+def test_parameterized_where() -> None:
+    frontend_to_backend_type: OlapFrontendToBackend = olap_prompt_service.create_frontend_to_backend(
+        copy.deepcopy(where_in_string), frontend_all_items_view)
+
+    assert frontend_to_backend_type.get_params() == ["Uno", "Dos"]
+    assert frontend_to_backend_type["WHERE"][0]["params"] == ["Uno", "Dos"]
+
+    sql, params = olap_select_builder.bind_parameters(frontend_to_backend_type["WHERE"][0]["condition"],
+                                                      frontend_to_backend_type.get_params())
+
+    assert sql == "(%s,%s)"
+    assert params == ["Uno", "Dos"]
+
+
+def test_parameterized_select_data() -> None:
+    olap_service: OlapService = OlapService(olap_select_builder, OlapPlanCache())
+
+    for condition in ["2024-01-01", "2020-02-02"]:
+        frontend_data: dict = copy.deepcopy(base_table_with_join_wth_where)
+        frontend_data["WHERE"][0]["condition"] = condition
+
+        frontend_to_backend_type: OlapFrontendToBackend = olap_prompt_service.create_frontend_to_backend(
+            frontend_data, frontend_all_items_view)
+
+        select_collection: SelectCollection = olap_service.select_data(frontend_to_backend_type,
+                                                                       olap_structure_generator.get_tables_collection())
+
+        sql: str = select_collection.get_sql(BASE_SALES)
+        params: list = select_collection.get_params(BASE_SALES)
+
+        assert condition not in sql
+        assert "1000" not in sql
+        assert "The Best Game" not in sql
+        assert "\x01" not in sql
+        assert sql.count("%s") == len(params) == 3
+        assert sorted(params) == sorted([condition, "1000", "The Best Game"])
+
+        for table_name in select_collection:
+            assert select_collection.get_sql(table_name).count("%s") == len(select_collection.get_params(table_name))
+
+    assert olap_service.plan_cache.get_statistics()["hits"] == 1
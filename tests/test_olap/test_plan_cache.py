@@ -0,0 +1,155 @@
+import copy
+
+from comradewolf.universe.olap_language_select_builders import OlapPostgresSelectBuilder
+from comradewolf.universe.olap_plan_cache import OlapPlanCache
+from comradewolf.universe.olap_prompt_converter_service import OlapPromptConverterService
+from comradewolf.universe.olap_service import OlapService
+from comradewolf.universe.olap_structure_generator import OlapStructureGenerator
+from comradewolf.utils.olap_data_types import OlapFrontendToBackend, SelectCollection, OlapTablesCollection
+from tests.constants_for_testing import get_olap_games_folder
+from tests.test_olap import test_frontend_data
+from tests.test_olap.test_frontend_data import base_table_with_no_join_wht_where
+
+olap_structure_generator: OlapStructureGenerator = OlapStructureGenerator(get_olap_games_folder())
+olap_select_builder = OlapPostgresSelectBuilder()
+olap_service: OlapService = OlapService(olap_select_builder)
+olap_prompt_service: OlapPromptConverterService = OlapPromptConverterService(olap_select_builder)
+
+
+def create_request(frontend_data: dict) -> OlapFrontendToBackend:
+    return olap_prompt_service.create_frontend_to_backend(copy.deepcopy(frontend_data),
+                                                          olap_structure_generator.frontend_fields)
+
+
+def get_all_sql(select_collection: SelectCollection) -> dict:
+    return {table: select_collection.get_sql(table) for table in select_collection}
+
+
+def test_plan_cache_same_selects() -> None:
+    cached_olap_service: OlapService = OlapService(olap_select_builder, OlapPlanCache())
+    tables_collection: OlapTablesCollection = olap_structure_generator.get_tables_collection()
+
+    for name in dir(test_frontend_data):
+        frontend_data = getattr(test_frontend_data, name)
+        if not (isinstance(frontend_data, dict) and "SELECT" in frontend_data):
+            continue
+
+        try:
+            expected = olap_service.generate_select_collection(create_request(frontend_data), tables_collection, False)
+        except Exception as error:
+            expected = type(error)
+
+        for _ in range(2):
+            try:
+                result = cached_olap_service.select_data(create_request(frontend_data), tables_collection)
+            except Exception as error:
+                assert expected is type(error)
+                continue
+
+            assert get_all_sql(result) == get_all_sql(expected), name
+            for table in expected:
+                assert result.get_has_group_by(table) == expected.get_has_group_by(table)
+                assert result.get_not_selected_fields_no(table) == expected.get_not_selected_fields_no(table)
+                assert result.get_joined_tables(table) == expected.get_joined_tables(table)
+
+
+def test_plan_cache_rebinds_literals() -> None:
+    plan_cache: OlapPlanCache = OlapPlanCache(max_size=1)
+    cached_olap_service: OlapService = OlapService(olap_select_builder, plan_cache)
+    tables_collection: OlapTablesCollection = olap_structure_generator.get_tables_collection()
+
+    cached_olap_service.select_data(create_request(base_table_with_no_join_wht_where), tables_collection)
+
+    other_literals: dict = copy.deepcopy(base_table_with_no_join_wht_where)
+    other_literals["WHERE"][0]["condition"] = "2020-05-05"
+    other_literals["WHERE"][1]["condition"] = "77"
+
+    result = cached_olap_service.select_data(create_request(other_literals), tables_collection)
+    expected = olap_service.generate_select_collection(create_request(other_literals), tables_collection, False)
+
+    assert plan_cache.get_statistics()["hits"] == 1
+    assert plan_cache.get_statistics()["misses"] == 1
+    assert get_all_sql(result) == get_all_sql(expected)
+    for table in result:
+        assert "'2020-05-05'" in result.get_sql(table)
+        assert "2024-01-01" not in result.get_sql(table)
+
+    # New shape evicts old one
+    other_operator: dict = copy.deepcopy(base_table_with_no_join_wht_where)
+    other_operator["WHERE"][1]["where"] = "<"
+    cached_olap_service.select_data(create_request(other_operator), tables_collection)
+
+    assert plan_cache.get_statistics()["evictions"] == 1
+    assert plan_cache.get_statistics()["size"] == 1
+
+    # Reloaded structure has new collection
+    reloaded_generator: OlapStructureGenerator = OlapStructureGenerator(get_olap_games_folder())
+    cached_olap_service.select_data(create_request(other_operator), reloaded_generator.get_tables_collection())
+
+    assert plan_cache.get_statistics()["misses"] == 3
+
+    plan_cache.invalidate()
+    assert plan_cache.get_statistics()["size"] == 0
+
+
+def test_plan_cache_keeps_order() -> None:
+    plan_cache: OlapPlanCache = OlapPlanCache()
+    cached_olap_service: OlapService = OlapService(olap_select_builder, plan_cache)
+    tables_collection: OlapTablesCollection = olap_structure_generator.get_tables_collection()
+
+    reversed_order: dict = copy.deepcopy(base_table_with_no_join_wht_where)
+    reversed_order["SELECT"].reverse()
+    reversed_order["WHERE"].reverse()
+
+    for frontend_data in [base_table_with_no_join_wht_where, reversed_order]:
+        for add_order_by in [False, True]:
+            result = cached_olap_service.select_data(create_request(frontend_data), tables_collection, add_order_by)
+            expected = olap_service.generate_select_collection(create_request(frontend_data), tables_collection,
+                                                               add_order_by)
+
+            assert get_all_sql(result) == get_all_sql(expected)
+
+    # Other order of select or where is other shape
+    assert plan_cache.get_statistics()["misses"] == 4
+    assert plan_cache.get_statistics()["hits"] == 0
+
+
+def assert_same_select_collection(result: SelectCollection, expected: SelectCollection) -> None:
+    assert get_all_sql(result) == get_all_sql(expected)
+    for table in expected:
+        assert result.get_has_group_by(table) == expected.get_has_group_by(table)
+        assert result.get_not_selected_fields_no(table) == expected.get_not_selected_fields_no(table)
+        assert result.get_joined_tables(table) == expected.get_joined_tables(table)
+
+
+def test_select_data_many() -> None:
+    tables_collection: OlapTablesCollection = olap_structure_generator.get_tables_collection()
+
+    other_literals: dict = copy.deepcopy(base_table_with_no_join_wht_where)
+    other_literals["WHERE"][1]["condition"] = "77"
+
+    reversed_order: dict = copy.deepcopy(base_table_with_no_join_wht_where)
+    reversed_order["SELECT"].reverse()
+    reversed_order["WHERE"].reverse()
+
+    frontend_data_list: list[dict] = [base_table_with_no_join_wht_where, test_frontend_data.group_by_read_no_where,
+                                      other_literals, reversed_order, base_table_with_no_join_wht_where]
+
+    plan_cache: OlapPlanCache = OlapPlanCache()
+    cached_olap_service: OlapService = OlapService(olap_select_builder, plan_cache)
+
+    for current_olap_service in [olap_service, cached_olap_service]:
+        for add_order_by in [False, True]:
+            results = current_olap_service.select_data_many([create_request(frontend_data)
+                                                             for frontend_data in frontend_data_list],
+                                                            tables_collection, add_order_by)
+
+            assert len(results) == len(frontend_data_list)
+
+            for frontend_data, result in zip(frontend_data_list, results):
+                expected = olap_service.select_data(create_request(frontend_data), tables_collection, add_order_by)
+                assert_same_select_collection(result, expected)
+
+    # Three shapes for each add_order_by were planned once
+    assert plan_cache.get_statistics()["misses"] == 6
+    assert plan_cache.get_statistics()["hits"] == 0
@@ -0,0 +1,83 @@
+import pytest
+
+from comradewolf.universe.olap_filter_cache import OlapFilterValuesCache
+from comradewolf.universe.olap_language_select_builders import OlapPostgresSelectBuilder
+from comradewolf.universe.olap_service import OlapService
+from comradewolf.universe.olap_structure_generator import OlapStructureGenerator
+from comradewolf.universe.olap_value_dictionary import OlapSortedValuesDictionary
+from comradewolf.utils.exceptions import OlapException
+from comradewolf.utils.olap_data_types import OlapFilterFrontend, DEFAULT_FILTER_PAGE_SIZE
+from comradewolf.utils.utils import get_prefix_successor
+from tests.constants_for_testing import get_olap_games_folder
+from tests.test_olap.filter_type_data import game_name_prefix, game_name_prefix_next_page
+
+olap_structure_generator: OlapStructureGenerator = OlapStructureGenerator(get_olap_games_folder())
+olap_service: OlapService = OlapService(OlapPostgresSelectBuilder())
+
+
+def test_prefix_successor() -> None:
+    assert get_prefix_successor("abc") == "abd"
+    assert get_prefix_successor("az\U0010FFFF") == "a{"
+    assert get_prefix_successor("") is None
+    assert get_prefix_successor("\U0010FFFF") is None
+
+
+def test_prefix_filter() -> None:
+    select_filter = olap_service.select_filter_for_frontend(OlapFilterFrontend(game_name_prefix),
+                                                            olap_structure_generator.get_tables_collection())
+
+    assert len(select_filter) == 1
+
+    for table_name in select_filter:
+        sql: str = select_filter.get_sql(table_name)
+        assert "game_name_f >= 'Assassin''s'" in sql
+        assert "game_name_f < 'Assassin''t'" in sql
+        assert "ORDER BY game_name_f" in sql
+        assert sql.endswith("LIMIT 20")
+        assert select_filter.get_params(table_name) == []
+
+    frontend_data = OlapFilterFrontend(game_name_prefix_next_page)
+    assert frontend_data.get_page_size() == DEFAULT_FILTER_PAGE_SIZE
+
+    parameterized_service: OlapService = OlapService(OlapPostgresSelectBuilder(parameterized=True))
+    select_filter = parameterized_service.select_filter_for_frontend(frontend_data,
+                                                                     olap_structure_generator.get_tables_collection())
+
+    for table_name in select_filter:
+        sql: str = select_filter.get_sql(table_name)
+        assert "game_name_f >= %s" in sql
+        assert "game_name_f > %s" in sql
+        assert select_filter.get_params(table_name) == ["Ha", "Hb", "Half-Life"]
+
+    with pytest.raises(OlapException):
+        OlapFilterFrontend({'SELECT_DISTINCT': {'field_name': 'game_name', 'type': 'prefix'}})
+
+
+def test_sorted_values_dictionary(tmp_path) -> None:
+    dictionary_path: str = str(tmp_path / "game_name.values")
+    values: list = ["Half-Life 2", "Hades", "Half-Life", "Halo", "Doom", None, "Hades", "Hitman"]
+
+    assert OlapSortedValuesDictionary.write(dictionary_path, values) == 6
+
+    value_dictionary = OlapSortedValuesDictionary(dictionary_path)
+
+    assert len(value_dictionary) == 6
+    assert value_dictionary.search("Ha", 2) == ["Hades", "Half-Life"]
+    assert value_dictionary.search("Ha", 2, "Half-Life") == ["Half-Life 2", "Halo"]
+    assert value_dictionary.search("Ha", 10, "Halo") == []
+    assert value_dictionary.search("", 2) == ["Doom", "Hades"]
+    assert value_dictionary.search("X", 2) == []
+
+    executed: list[str] = []
+    filter_cache = OlapFilterValuesCache(olap_service, lambda sql, params: executed.append(sql) or [])
+    tables_collection = olap_structure_generator.get_tables_collection()
+
+    filter_cache.get_values(OlapFilterFrontend(game_name_prefix_next_page), tables_collection)
+    assert len(executed) == 1
+
+    filter_cache.add_value_dictionary("game_name", value_dictionary)
+    assert filter_cache.get_values(OlapFilterFrontend(game_name_prefix_next_page), tables_collection) == \
+           [("Half-Life 2",), ("Halo",)]
+    assert len(executed) == 1
+
+    value_dictionary.close()
@@ -0,0 +1,130 @@
+from comradewolf.universe.olap_result_cache import OlapResultCache, OlapMemoryResultCacheBackend, \
+    OlapDiskResultCacheBackend
+from comradewolf.utils.olap_data_types import SelectCollection
+
+BASE_SALES = "olap_test.games_olap.base_sales"
+DIM_GAME = "olap_test.games_olap.dim_game"
+
+
+class CountingExecutor:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, sql: str, params: list) -> list:
+        self.calls += 1
+        return [(sql, tuple(params), self.calls)]
+
+
+def check_result_cache(result_cache: OlapResultCache) -> None:
+    execute = CountingExecutor()
+
+    select_collection: SelectCollection = SelectCollection()
+    select_collection.add_table(BASE_SALES, "SELECT 1", 0, False, [DIM_GAME], ["a"])
+
+    first_rows = result_cache.get_or_execute_select(select_collection, BASE_SALES, execute)
+    assert result_cache.get_or_execute_select(select_collection, BASE_SALES, execute) == first_rows
+    assert execute.calls == 1
+
+    # Other parameters
+    result_cache.get_or_execute("SELECT 1", ["b"], [BASE_SALES, DIM_GAME], execute)
+    assert execute.calls == 2
+
+    # Joined table was refreshed
+    result_cache.invalidate_table(DIM_GAME)
+    assert result_cache.get("SELECT 1", ["a"], [BASE_SALES, DIM_GAME]) is None
+    result_cache.get_or_execute_select(select_collection, BASE_SALES, execute)
+    assert execute.calls == 3
+
+    result_cache.set_data_version(BASE_SALES, "2024-06-01")
+    result_cache.get_or_execute_select(select_collection, BASE_SALES, execute)
+    assert execute.calls == 4
+
+    # Expired
+    result_cache.set("SELECT 2", [], [BASE_SALES], [1], ttl=-1)
+    assert result_cache.get("SELECT 2", [], [BASE_SALES]) is None
+
+    statistics = result_cache.get_statistics()
+    assert statistics["hits"] == 1
+    assert statistics["expired"] == 1
+    # Two results of dim_game and one result of old data version of base_sales
+    assert statistics["invalidations"] == 3
+
+
+class CountingBackend(OlapMemoryResultCacheBackend):
+    def __init__(self) -> None:
+        super().__init__()
+        self.gets = 0
+
+    def get(self, key: str) -> dict | None:
+        self.gets += 1
+        return super().get(key)
+
+
+def test_memory_result_cache() -> None:
+    check_result_cache(OlapResultCache(OlapMemoryResultCacheBackend()))
+
+    backend: OlapMemoryResultCacheBackend = OlapMemoryResultCacheBackend(max_size=1)
+    result_cache: OlapResultCache = OlapResultCache(backend, ttl=60)
+    result_cache.set("SELECT 1", [], [BASE_SALES], [1])
+    result_cache.set("SELECT 2", [], [BASE_SALES], [2])
+
+    assert len(backend.keys()) == 1
+    assert result_cache.get("SELECT 2", [], [BASE_SALES]) == [2]
+
+    # Changes of returned rows do not change cache
+    result_cache.get("SELECT 2", [], [BASE_SALES]).append(3)
+    assert result_cache.get("SELECT 2", [], [BASE_SALES]) == [2]
+
+
+def test_disk_result_cache(tmp_path) -> None:
+    check_result_cache(OlapResultCache(OlapDiskResultCacheBackend(str(tmp_path / "cache"))))
+
+    # Results are shared through directory
+    OlapResultCache(OlapDiskResultCacheBackend(str(tmp_path / "shared"))).set("SELECT 1", [], [BASE_SALES], [1])
+    assert OlapResultCache(OlapDiskResultCacheBackend(str(tmp_path / "shared"))) \
+        .get("SELECT 1", [], [BASE_SALES]) == [1]
+
+    # Invalidation in one process is seen by other processes
+    other_result_cache: OlapResultCache = OlapResultCache(OlapDiskResultCacheBackend(str(tmp_path / "shared")))
+    OlapResultCache(OlapDiskResultCacheBackend(str(tmp_path / "shared"))).invalidate_table(BASE_SALES)
+    assert other_result_cache.get("SELECT 1", [], [BASE_SALES]) is None
+
+    other_result_cache.set("SELECT 1", [], [BASE_SALES], [1])
+    OlapResultCache(OlapDiskResultCacheBackend(str(tmp_path / "shared"))).set_data_version(BASE_SALES, "2024-06-01")
+    assert other_result_cache.get("SELECT 1", [], [BASE_SALES]) is None
+
+    backend: OlapDiskResultCacheBackend = OlapDiskResultCacheBackend(str(tmp_path / "limited"), max_size=2)
+    result_cache: OlapResultCache = OlapResultCache(backend)
+    for query_no in range(4):
+        result_cache.set(f"SELECT {query_no}", [], [BASE_SALES], [query_no])
+
+    assert len(backend.keys()) == 2
+
+    # Scan of directory removes files till low watermark
+    limited_backend: OlapDiskResultCacheBackend = OlapDiskResultCacheBackend(str(tmp_path / "limited_20"), 20)
+    for query_no in range(21):
+        OlapResultCache(limited_backend).set(f"SELECT {query_no}", [], [BASE_SALES], [query_no])
+
+    assert len(limited_backend.keys()) == 18
+
+
+def test_result_cache_invalidation_without_reading() -> None:
+    backend: CountingBackend = CountingBackend()
+    result_cache: OlapResultCache = OlapResultCache(backend)
+
+    for query_no in range(10):
+        result_cache.set(f"SELECT {query_no}", [], [BASE_SALES, DIM_GAME] if query_no % 2 == 0 else [BASE_SALES],
+                         [query_no])
+
+    result_cache.invalidate_table(DIM_GAME)
+
+    assert backend.gets == 0
+    assert len(backend.keys()) == 5
+    assert result_cache.get_statistics()["invalidations"] == 5
+
+    # Keys deleted with dim_game are deleted from index of base_sales too
+    result_cache.set_data_version(BASE_SALES, "2024-06-01")
+
+    assert backend.gets == 0
+    assert len(backend.keys()) == 0
+    assert result_cache.get_statistics()["invalidations"] == 10
@@ -0,0 +1,93 @@
+from comradewolf.universe.olap_rollup_cache import OlapRollupCache
+from comradewolf.utils.olap_data_types import OlapFrontendToBackend, OlapTablesCollection
+
+tables_collection: OlapTablesCollection = OlapTablesCollection()
+
+rows_by_year_month: list[dict] = [
+    {"year": 2023, "yearmonth": 202301, "pcs__sum": 10, "price__max": 5.5, "price__min": 1.0, "pcs__count": 2},
+    {"year": 2023, "yearmonth": 202302, "pcs__sum": 20, "price__max": 7.0, "price__min": 2.0, "pcs__count": 3},
+    {"year": 2024, "yearmonth": 202401, "pcs__sum": 5, "price__max": 3.0, "price__min": 0.5, "pcs__count": 1},
+]
+
+
+def create_request(select: list[str], calculations: list[tuple[str, str]], where: list | None = None) \
+        -> OlapFrontendToBackend:
+    frontend_to_backend: OlapFrontendToBackend = OlapFrontendToBackend()
+    frontend_to_backend.add_select([{"field_name": field} for field in select])
+    frontend_to_backend.add_calculation([{"field_name": field, "calculation": calculation}
+                                         for field, calculation in calculations])
+    frontend_to_backend.add_where(where or [])
+    return frontend_to_backend
+
+
+def test_rollup_cache() -> None:
+    for use_numpy in [True, False]:
+        rollup_cache: OlapRollupCache = OlapRollupCache(use_numpy=use_numpy)
+        fine_request = create_request(["year", "yearmonth"], [("pcs", "sum"), ("price", "max"), ("price", "min"),
+                                                              ("pcs", "count")])
+        rollup_cache.put(fine_request, tables_collection, rows_by_year_month)
+
+        assert rollup_cache.get(fine_request, tables_collection) is rows_by_year_month
+
+        by_year = rollup_cache.get(create_request(["year"], [("pcs", "sum"), ("price", "max"), ("pcs", "count")]),
+                                   tables_collection)
+        assert by_year == [{"year": 2023, "pcs__sum": 30, "price__max": 7.0, "pcs__count": 5},
+                           {"year": 2024, "pcs__sum": 5, "price__max": 3.0, "pcs__count": 1}]
+
+        total = rollup_cache.get(create_request([], [("price", "min")]), tables_collection)
+        assert total == [{"price__min": 0.5}]
+
+        # Not mergeable, other where, other structure
+        assert rollup_cache.get(create_request(["year"], [("price", "avg")]), tables_collection) is None
+        assert rollup_cache.get(create_request(["year"], [("pcs", "sum")],
+                                               [{"field_name": "year", "where": ">", "condition": "2023"}]),
+                                tables_collection) is None
+        assert rollup_cache.get(create_request(["year"], [("pcs", "sum")]), OlapTablesCollection()) is None
+
+        statistics = rollup_cache.get_statistics()
+        assert statistics["hits"] == 1
+        assert statistics["rollups"] == 2
+        assert statistics["misses"] == 3
+
+
+def test_rollup_with_nulls() -> None:
+    rollup_cache: OlapRollupCache = OlapRollupCache()
+    rows = [{"year": 2023, "pcs__sum": None}, {"year": 2023, "pcs__sum": 4}, {"year": None, "pcs__sum": None}]
+
+    assert rollup_cache.rollup(rows, ["year"], [("pcs", "sum")]) == [{"year": 2023, "pcs__sum": 4},
+                                                                      {"year": None, "pcs__sum": None}]
+
+
+def test_rollup_numpy_same_as_python() -> None:
+    rows = [{"year": 2023, "platform": "PC", "pcs__sum": 1, "price__max": 2.5},
+            {"year": 2024, "platform": None, "pcs__sum": 2, "price__max": 1.0},
+            {"year": 2023, "platform": "PC", "pcs__sum": 3, "price__max": None},
+            {"year": 2022, "platform": "PS", "pcs__sum": 4, "price__max": 4.0},
+            {"year": 2024, "platform": None, "pcs__sum": 5, "price__max": 0.5}]
+    calculations = [("pcs", "sum"), ("price", "max")]
+
+    for group_by in [["year", "platform"], ["platform"], ["year"], []]:
+        assert OlapRollupCache(use_numpy=True).rollup(rows, group_by, calculations) == \
+               OlapRollupCache(use_numpy=False).rollup(rows, group_by, calculations)
+
+    assert [row["year"] for row in OlapRollupCache().rollup(rows, ["year"], calculations)] == [2023, 2024, 2022]
+
+
+def test_rollup_without_overflow() -> None:
+    # Every value fits into int64, but sum does not
+    big_value: int = 2 ** 62
+    rows = [{"year": 2023, "pcs__sum": big_value}, {"year": 2023, "pcs__sum": big_value},
+            {"year": 2024, "pcs__sum": 1}]
+
+    assert OlapRollupCache().rollup(rows, ["year"], [("pcs", "sum")]) == [{"year": 2023, "pcs__sum": 2 ** 63},
+                                                                           {"year": 2024, "pcs__sum": 1}]
+
+
+def test_rollup_of_empty_rows() -> None:
+    for use_numpy in [True, False]:
+        rollup_cache: OlapRollupCache = OlapRollupCache(use_numpy=use_numpy)
+
+        # As select without group by
+        assert rollup_cache.rollup([], [], [("pcs", "sum"), ("pcs", "count")]) == [{"pcs__sum": None,
+                                                                                    "pcs__count": 0}]
+        assert rollup_cache.rollup([], ["year"], [("pcs", "sum")]) == []
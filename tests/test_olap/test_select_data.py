@@ -185,6 +185,22 @@ def test_base_table_with_join_no_where_order_by() -> None:
 
     assert len(s) == 1
 
+
+def test_candidate_data_tables() -> None:
+    # Pre-filter should keep every table that survives full check
+    frontend_to_backend_type: OlapFrontendToBackend = olap_prompt_service.create_frontend_to_backend(
+        group_by_read_no_where, frontend_all_items_view)
+
+    candidates = olap_service.get_candidate_data_tables(frontend_to_backend_type,
+                                                        olap_structure_generator.get_tables_collection())
+
+    s = olap_service.select_data(frontend_to_backend_type, olap_structure_generator.get_tables_collection())
+
+    assert len(candidates) < len(olap_structure_generator.get_data_tables())
+    for table_name in s:
+        assert table_name in candidates
+
+
 if __name__ == "__main__":
     # test_should_be_only_base_table_no_group_by()
     # test_base_table_with_join_no_where()
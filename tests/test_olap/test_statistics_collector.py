@@ -0,0 +1,99 @@
+import shutil
+import sqlite3
+
+from comradewolf.universe.olap_statistics_collector import OlapStatisticsCollector
+from comradewolf.universe.olap_structure_generator import OlapStructureGenerator
+from comradewolf.utils.olap_data_types import OlapTableStatistics
+from tests.constants_for_testing import get_olap_sales_folder
+
+RECIEPTS = "sales.sales.reciepts"
+DIM_CALENDAR = "sales.sales.dim_calendar"
+
+olap_structure_generator: OlapStructureGenerator = OlapStructureGenerator(get_olap_sales_folder())
+
+
+def short_table_name(table_name: str) -> str:
+    return table_name.split(".")[-1]
+
+
+def create_connection() -> sqlite3.Connection:
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE reciepts (sk_date INTEGER, reciept_no_f INTEGER, sku_f INTEGER, pcs_f INTEGER, "
+                       "rub_f INTEGER)")
+    connection.execute("CREATE TABLE date_sku (sk_date_f INTEGER, sku_f INTEGER, pcs_f INTEGER, rub_f INTEGER)")
+    connection.execute("CREATE TABLE dim_calendar (sk_date INTEGER, date_f TEXT, month_f INTEGER, year_f INTEGER, "
+                       "week_f INTEGER)")
+
+    for i in range(100):
+        connection.execute("INSERT INTO reciepts VALUES (?, ?, ?, ?, ?)", (i % 10, i, i % 7, 1, 100 + i))
+
+    for i in range(10):
+        connection.execute("INSERT INTO dim_calendar VALUES (?, ?, ?, ?, ?)", (i, f"2024-01-{i + 1:02d}", 1, 2024, 1))
+
+    return connection
+
+
+def test_collect_statistics(tmp_path) -> None:
+    connection = create_connection()
+    collector = OlapStatisticsCollector(connection, olap_structure_generator.get_tables_collection(),
+                                        table_name_converter=short_table_name)
+
+    table_statistics: OlapTableStatistics = collector.collect()
+
+    assert table_statistics.get_row_count(RECIEPTS) == 100
+    assert table_statistics.get_row_count("sales.sales.date_sku") == 0
+    assert table_statistics.get_avg_row_width("sales.sales.date_sku") is None
+    assert table_statistics.get_avg_row_width(RECIEPTS) > 0
+    assert table_statistics.get_column(RECIEPTS, "sku_f") == {"ndv": 7, "min_value": 0, "max_value": 6}
+    assert table_statistics.get_column(DIM_CALENDAR, "date_f")["max_value"] == "2024-01-10"
+
+    # Statistics file is loaded by OlapStructureGenerator
+    structure_folder = tmp_path / "olap_sales"
+    shutil.copytree(get_olap_sales_folder(), structure_folder)
+    collector.write_statistics(table_statistics, str(structure_folder))
+
+    loaded_generator = OlapStructureGenerator(str(structure_folder))
+    assert loaded_generator.get_table_statistics().get_row_count(RECIEPTS) == 100
+    assert loaded_generator.get_table_statistics().get_column(RECIEPTS, "sku_f")["ndv"] == 7
+
+
+def test_collect_statistics_incremental() -> None:
+    connection = create_connection()
+    collector = OlapStatisticsCollector(connection, olap_structure_generator.get_tables_collection(),
+                                        change_threshold=0.1, table_name_converter=short_table_name)
+
+    previous_statistics: OlapTableStatistics = collector.collect()
+
+    # 5% change. Table should not be collected again
+    for i in range(5):
+        connection.execute("INSERT INTO reciepts VALUES (?, ?, ?, ?, ?)", (1, 1000 + i, 100, 1, 1))
+
+    table_statistics = collector.collect(previous_statistics)
+
+    assert table_statistics.get_collected_at(RECIEPTS) == previous_statistics.get_collected_at(RECIEPTS)
+    assert table_statistics.get_collected_row_count(RECIEPTS) == 100
+    # Row count, min and max are checked on every collection, distinct count is kept
+    assert table_statistics.get_row_count(RECIEPTS) == 105
+    assert table_statistics.get_checked_at(RECIEPTS) > previous_statistics.get_checked_at(RECIEPTS)
+    assert table_statistics.get_column(RECIEPTS, "sku_f") == {"ndv": 7, "min_value": 0, "max_value": 100}
+
+    # Small changes are summed up since full collection
+    for i in range(6):
+        connection.execute("INSERT INTO reciepts VALUES (?, ?, ?, ?, ?)", (1, 3000 + i, 100, 1, 1))
+
+    checked_statistics = collector.collect(table_statistics)
+    assert checked_statistics.get_collected_at(RECIEPTS) > previous_statistics.get_collected_at(RECIEPTS)
+    assert checked_statistics.get_column(RECIEPTS, "sku_f")["ndv"] == 8
+
+    for i in range(6):
+        connection.execute("DELETE FROM reciepts WHERE reciept_no_f = ?", (3000 + i,))
+
+    # 15% change. Table should be collected again
+    for i in range(10):
+        connection.execute("INSERT INTO reciepts VALUES (?, ?, ?, ?, ?)", (1, 2000 + i, 100, 1, 1))
+
+    table_statistics = collector.collect(previous_statistics)
+
+    assert table_statistics.get_row_count(RECIEPTS) == 115
+    assert table_statistics.get_column(RECIEPTS, "sku_f")["max_value"] == 100
+    assert table_statistics.get_row_count(DIM_CALENDAR) == 10
@@ -0,0 +1,48 @@
+import pytest
+
+from comradewolf.universe.olap_structure_registry import OlapStructureRegistry
+from comradewolf.utils.exceptions import OlapException
+from tests.constants_for_testing import get_olap_games_folder, get_olap_sales_folder
+
+
+def test_registry_lazy_load_and_hits() -> None:
+    registry = OlapStructureRegistry(memory_budget=10 ** 9)
+    registry.register("games", get_olap_games_folder())
+    registry.register("sales", get_olap_sales_folder())
+
+    assert registry.get_loaded_cubes() == []
+
+    games = registry.get("games")
+    assert registry.get("games") is games
+    registry.get("sales")
+
+    statistics = registry.get_statistics()
+    assert statistics["misses"] == 2
+    assert statistics["hits"] == 1
+    assert statistics["evictions"] == 0
+    assert statistics["loaded_cubes"] == 2
+    assert statistics["loaded_size"] > 0
+    assert statistics["load_time"] > 0
+
+    with pytest.raises(OlapException):
+        registry.get("no_cube")
+
+    with pytest.raises(OlapException):
+        registry.register("games", get_olap_games_folder())
+
+
+def test_registry_evicts_least_recently_used(tmp_path) -> None:
+    registry = OlapStructureRegistry(memory_budget=1, snapshot_directory=str(tmp_path))
+    registry.register("games", get_olap_games_folder())
+    registry.register("sales", get_olap_sales_folder())
+
+    registry.get("games")
+    registry.get("sales")
+
+    # Budget is too small for two cubes, but requested cube stays
+    assert registry.get_loaded_cubes() == ["sales"]
+    assert registry.get_statistics()["evictions"] == 1
+
+    registry.get("games")
+    assert registry.get_loaded_cubes() == ["games"]
+    assert (tmp_path / "games.snapshot").exists()
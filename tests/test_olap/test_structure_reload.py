@@ -0,0 +1,82 @@
+import os
+import shutil
+
+import pytest
+
+from comradewolf.universe.olap_structure_generator import OlapStructureGenerator
+from comradewolf.utils.exceptions import OlapTableExists
+from tests.constants_for_testing import get_olap_games_folder
+
+DIM_GAME = "olap_test.games_olap.dim_game"
+G_BY_Y = "olap_test.games_olap.g_by_y"
+BASE_SALES = "olap_test.games_olap.base_sales"
+
+
+def create_generator(tmp_path) -> tuple[OlapStructureGenerator, str]:
+    structure_folder = str(tmp_path / "olap_games")
+    shutil.copytree(get_olap_games_folder(), structure_folder)
+    return OlapStructureGenerator(structure_folder), structure_folder
+
+
+def test_reload_without_changes(tmp_path) -> None:
+    generator, structure_folder = create_generator(tmp_path)
+    tables_collection = generator.get_tables_collection()
+
+    assert generator.reload() is False
+    assert generator.get_tables_collection() is tables_collection
+    assert generator.structure_version == 0
+
+
+def test_reload_changed_and_removed_files(tmp_path) -> None:
+    generator, structure_folder = create_generator(tmp_path)
+    old_tables_collection = generator.get_tables_collection()
+    old_state = generator.get_state()
+
+    dim_game_file = os.path.join(structure_folder, "dimension", "dim_game.toml")
+    with open(dim_game_file, "r", encoding="utf-8") as f:
+        dim_game = f.read()
+    with open(dim_game_file, "w", encoding="utf-8") as f:
+        f.write(dim_game.replace('front_name="Game Name"', 'front_name="Name of the game"'))
+
+    os.remove(os.path.join(structure_folder, "data", "gby.toml"))
+
+    assert generator.reload() is True
+    assert generator.structure_version == 1
+
+    # State is replaced as a whole, old state is not changed
+    state = generator.get_state()
+    assert old_state.structure_version == 0
+    assert old_state.tables_collection is old_tables_collection
+    assert old_state.frontend_fields.get_front_name("game_name") == "Game Name"
+    assert state.tables_collection is generator.get_tables_collection()
+    assert state.frontend_fields is generator.get_front_fields()
+
+    new_tables_collection = generator.get_tables_collection()
+
+    # Old collection is not changed
+    assert G_BY_Y in old_tables_collection.get_data_table_names()
+    assert old_tables_collection["dimension_tables"][DIM_GAME]["fields"]["game_name"]["front_name"] == "Game Name"
+
+    assert G_BY_Y not in new_tables_collection.get_data_table_names()
+    assert new_tables_collection["dimension_tables"][DIM_GAME]["fields"]["game_name"]["front_name"] == \
+           "Name of the game"
+    assert generator.get_front_fields().get_front_name("game_name") == "Name of the game"
+
+    # Unchanged tables are reused
+    assert new_tables_collection["data_tables"][BASE_SALES] is old_tables_collection["data_tables"][BASE_SALES]
+    assert new_tables_collection.get_data_tables_with_field("year") == \
+           [table for table in old_tables_collection.get_data_tables_with_field("year") if table != G_BY_Y]
+
+
+def test_reload_error_keeps_structure(tmp_path) -> None:
+    generator, structure_folder = create_generator(tmp_path)
+    tables_collection = generator.get_tables_collection()
+
+    shutil.copy(os.path.join(structure_folder, "data", "gby.toml"),
+                os.path.join(structure_folder, "data", "gby_copy.toml"))
+
+    with pytest.raises(OlapTableExists):
+        generator.reload()
+
+    assert generator.get_tables_collection() is tables_collection
+    assert generator.structure_version == 0
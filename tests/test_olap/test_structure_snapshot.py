@@ -0,0 +1,57 @@
+import shutil
+
+from comradewolf.universe.olap_structure_generator import OlapStructureGenerator
+from tests.constants_for_testing import get_olap_games_folder
+
+BASE_SALES = "olap_test.games_olap.base_sales"
+
+
+def test_snapshot_is_written_and_loaded(tmp_path) -> None:
+    snapshot_path = str(tmp_path / "olap_games.snapshot")
+
+    compiled = OlapStructureGenerator(get_olap_games_folder(), snapshot_path)
+    loaded = OlapStructureGenerator(get_olap_games_folder(), snapshot_path)
+
+    assert compiled.source_hash == loaded.source_hash
+    assert loaded.get_tables_collection() == compiled.get_tables_collection()
+    assert loaded.get_front_fields() == compiled.get_front_fields()
+    assert loaded.get_table_statistics() == compiled.get_table_statistics()
+    assert loaded.get_tables_collection().get_data_tables_with_field("year") == \
+           compiled.get_tables_collection().get_data_tables_with_field("year")
+
+
+def test_snapshot_is_rebuilt_on_change(tmp_path) -> None:
+    structure_folder = tmp_path / "olap_games"
+    shutil.copytree(get_olap_games_folder(), structure_folder)
+    snapshot_path = str(tmp_path / "olap_games.snapshot")
+
+    compiled = OlapStructureGenerator(str(structure_folder), snapshot_path)
+
+    statistics_file = structure_folder / OlapStructureGenerator.STATISTICS_FILE_NAME
+    statistics_file.write_text(statistics_file.read_text().replace("row_count = 10000000", "row_count = 5"))
+
+    rebuilt = OlapStructureGenerator(str(structure_folder), snapshot_path)
+
+    assert rebuilt.source_hash != compiled.source_hash
+    assert rebuilt.get_table_statistics().get_row_count(BASE_SALES) == 5
+    assert OlapStructureGenerator(str(structure_folder), snapshot_path).get_table_statistics() \
+               .get_row_count(BASE_SALES) == 5
+
+
+def test_broken_snapshot_is_ignored(tmp_path) -> None:
+    snapshot_path = tmp_path / "olap_games.snapshot"
+    snapshot_path.write_bytes(b"not a snapshot")
+
+    generator = OlapStructureGenerator(get_olap_games_folder(), str(snapshot_path))
+
+    assert BASE_SALES in generator.get_data_tables()
+
+
+def test_parallel_import() -> None:
+    sequential = OlapStructureGenerator(get_olap_games_folder())
+    parallel = OlapStructureGenerator(get_olap_games_folder(), workers=2)
+
+    assert parallel.get_tables_collection() == sequential.get_tables_collection()
+    assert parallel.get_data_tables() == sequential.get_data_tables()
+    assert parallel.get_front_fields() == sequential.get_front_fields()
+    assert parallel.main_data_table == sequential.main_data_table
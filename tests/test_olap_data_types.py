@@ -1,8 +1,10 @@
+import pickle
+
 import pytest
 
-from comradewolf.utils.exceptions import OlapCreationException
+from comradewolf.utils.exceptions import OlapCreationException, OlapTableExists, OlapException
 from comradewolf.utils.olap_data_types import OlapDataTable, OlapDimensionTable, SERVICE_KEY_EXISTS_ERROR_MESSAGE, \
-    NO_FRONT_NAME_ERROR, ERROR_FOLLOWING_CALC_SPECIFIED_WITHOUT_CALC
+    NO_FRONT_NAME_ERROR, ERROR_FOLLOWING_CALC_SPECIFIED_WITHOUT_CALC, OlapTablesCollection, OlapDataField
 
 
 def test_data_dimension_table() -> None:
@@ -238,3 +240,100 @@ def test_data_table() -> None:
                               fields["test_field_3"]["front_name"])
 
     assert len(data_olap_table["fields"]) == 3
+
+
+def test_tables_collection_lookups() -> None:
+    """
+    Tests alias lookups of OlapTablesCollection
+    :return:
+    """
+    dimension_table: OlapDimensionTable = OlapDimensionTable("db.schema.dim_game")
+    dimension_table.add_field("sk_id_game_f", "service_key", "sk_id_game", "number")
+    dimension_table.add_field("game_name_f", "dimension", "game_name", "text", "Game Name")
+
+    data_table: OlapDataTable = OlapDataTable("db.schema.sales")
+    data_table.add_field("sk_id_game_f", "sk_id_game", "service_key", None, None, "number")
+    data_table.add_field("pcs_f", "pcs", "value", "sum", "sum", "number", "Pieces")
+
+    tables_collection: OlapTablesCollection = OlapTablesCollection()
+    tables_collection.add_dimension_table(dimension_table)
+    tables_collection.add_data_table(data_table)
+
+    assert tables_collection.get_dimension_table_with_field("game_name") == ["db.schema.dim_game", "sk_id_game"]
+    assert tables_collection.get_dimension_table_with_field("pcs") is None
+
+    assert tables_collection.get_data_tables_with_field("pcs__sum") == ["db.schema.sales"]
+    assert tables_collection.get_data_tables_with_field("pcs") is None
+
+    assert tables_collection.is_field_in_data_table("sk_id_game", "db.schema.sales") is True
+    assert tables_collection.is_field_in_data_table("pcs", "db.schema.sales", "sum") is True
+    assert tables_collection.is_field_in_data_table("pcs", "db.schema.sales") is False
+    assert tables_collection.is_field_in_data_table("pcs", "db.schema.sales", "avg") is False
+
+    with pytest.raises(OlapTableExists):
+        tables_collection.add_data_table(data_table)
+
+    # Tables are frozen in collection, so index never misses fields
+    assert data_table.is_frozen() and dimension_table.is_frozen()
+
+    with pytest.raises(OlapException):
+        data_table.add_field("rub_f", "rub", "value", "sum", "sum", "number", "Rubles")
+
+    with pytest.raises(OlapException):
+        dimension_table.add_field("game_genre_f", "dimension", "game_genre", "text", "Genre")
+
+
+def test_frozen_fields() -> None:
+    """
+    Tests that fields are frozen and can be read as dictionaries
+    :return:
+    """
+    data_table: OlapDataTable = OlapDataTable("db.schema.sales")
+    data_table.add_field("pcs_f", "pcs", "value", "sum", "sum", "number", "Pieces")
+
+    field: OlapDataField = data_table["fields"]["pcs__sum"]
+
+    assert isinstance(field, OlapDataField)
+    assert field["field_name"] == field.field_name == "pcs_f"
+    assert field == {"field_name": "pcs_f", "field_type": "value", "calculation_type": "sum",
+                     "following_calculation": "sum", "front_name": "Pieces", "data_type": "number"}
+    assert "front_name" in field
+    assert field.get("no_key") is None
+
+    with pytest.raises(KeyError):
+        _ = field["no_key"]
+
+    with pytest.raises(OlapException):
+        field.field_name = "other_f"
+
+    assert not hasattr(field, "__dict__")
+    assert pickle.loads(pickle.dumps(field)) == field
+
+
+def test_slotted_tables() -> None:
+    """
+    Tests that tables and collection have no __dict__ and work as dictionaries
+    :return:
+    """
+    data_table: OlapDataTable = OlapDataTable("db.schema.sales")
+    data_table.add_field("pcs_f", "pcs", "value", "sum", "sum", "number", "Pieces")
+    dimension_table: OlapDimensionTable = OlapDimensionTable("db.schema.dim_item")
+    dimension_table.add_field("sk_item_id", "service_key", "sk_item_id", "number")
+
+    tables_collection: OlapTablesCollection = OlapTablesCollection()
+    tables_collection.add_data_table(data_table)
+    tables_collection.add_dimension_table(dimension_table)
+
+    for value in [data_table, dimension_table, tables_collection]:
+        assert not hasattr(value, "__dict__")
+
+    assert data_table["table_name"] == "db.schema.sales"
+    assert "fields" in dimension_table
+    assert set(tables_collection.keys()) == {"data_tables", "dimension_tables"}
+
+    copied_collection: OlapTablesCollection = pickle.loads(pickle.dumps(tables_collection))
+    assert copied_collection == tables_collection
+    assert copied_collection["data_tables"]["db.schema.sales"].is_frozen()
+    assert copied_collection.get_data_tables_mask("pcs", "sum") == tables_collection.get_data_tables_mask("pcs", "sum")
+    assert copied_collection.get_dimension_table_with_field("sk_item_id") == \
+           tables_collection.get_dimension_table_with_field("sk_item_id")
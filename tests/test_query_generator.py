@@ -1,8 +1,10 @@
+import pytest
+
 from comradewolf.universe.frontend_backend_converter import FrontendBackendConverter
 from comradewolf.universe.joins_generator import GenerateJoins
-from comradewolf.universe.possible_joins import AllPossibleJoins
 from comradewolf.universe.query_generator import QueryGenerator
 from comradewolf.universe.structure_generator import StructureGenerator
+from comradewolf.utils.exceptions import QueryBuilderException
 from comradewolf.utils.language_specific_builders import PostgresCalculationBuilder
 from tests.constants_for_testing import get_tables_folder, get_joins_folder, get_standard_filters_folder
 
@@ -18,10 +20,9 @@ def create_generator():
                                          table_structure.get_tables(),
                                          table_structure.get_where(),
                                          postgres_builder)
+    generate_joins = GenerateJoins(table_structure.get_joins(), table_structure.get_tables())
     query_generator = QueryGenerator(table_structure.get_tables(), table_structure.get_fields(),
-                                     table_structure.get_where(), postgres_builder)
-    GenerateJoins(table_structure.get_joins(), table_structure.get_tables())
-    AllPossibleJoins()
+                                     table_structure.get_where(), postgres_builder, joins=generate_joins.get_joins())
     return converter, query_generator
 
 
@@ -148,3 +149,11 @@ def test_multiple_fact_tables():
     assert "cte_1.week_no = main_cte.week_no" in big_select
 
     assert "coalesce(" in big_select
+
+
+def test_query_generator_without_joins():
+    table_structure = StructureGenerator(get_tables_folder(), get_joins_folder(), get_standard_filters_folder())
+
+    with pytest.raises(QueryBuilderException):
+        QueryGenerator(table_structure.get_tables(), table_structure.get_fields(), table_structure.get_where(),
+                       PostgresCalculationBuilder())
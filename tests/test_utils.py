@@ -52,6 +52,21 @@ def test_gather_data_from_toml_files_into_big_dictionary_should_raise_exception(
     assert "дубликат" in raised.__str__()
 
 
+def test_gather_data_from_toml_files_into_big_dictionary_in_processes():
+    """
+    Parallel import should give the same result and find duplicates
+    :return:
+    """
+    list_of_files_in_folder: list = list_toml_files_in_directory(get_tables_folder())
+
+    assert gather_data_from_toml_files_into_big_dictionary(list_of_files_in_folder, ImportTypes.TABLE.value, 2) == \
+           gather_data_from_toml_files_into_big_dictionary(list_of_files_in_folder, ImportTypes.TABLE.value)
+
+    with pytest.raises(RepeatingTableException):
+        gather_data_from_toml_files_into_big_dictionary(list_toml_files_in_directory(get_repeated_tables_folder()),
+                                                        ImportTypes.TABLE.value, 2)
+
+
 def test_gather_data_from_toml_files_into_big_dictionary_should_raise_exception_unknown_type():
     """
     Should raise RepeatingTableException